@@ -0,0 +1,81 @@
+"""
+Benchmark do caminho de cálculo da captura (PaymentService.calculate + cache_data),
+sem banco: throughput e pico de memória transitória por chamada (tracemalloc).
+
+Uso: python -m benchmarks.bench_capture_calculation --iterations 20000 --repeat 25
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+from decimal import Decimal
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "src.settings")
+django.setup()
+
+from injector import Injector  # noqa: E402
+
+from src.billing.di import BillingModule  # noqa: E402
+from src.billing.services.payment_service import PaymentService  # noqa: E402
+
+PAYLOAD = {
+    "amount": Decimal("297.00"),
+    "currency": "BRL",
+    "payment_method": "card",
+    "installments": 3,
+    "splits": [
+        {"recipient_id": "producer_1", "role": "producer", "percent": Decimal("50.00")},
+        {"recipient_id": "affiliate_9", "role": "affiliate", "percent": Decimal("33.33")},
+        {"recipient_id": "coproducer_2", "role": "coproducer", "percent": Decimal("16.67")},
+    ],
+}
+
+
+def capture_path(service: PaymentService) -> dict:
+    """Cálculo + serialização para o cache de idempotência (o que a captura faz fora do banco)."""
+    result = service.calculate(PAYLOAD)
+    return {
+        "gross_amount": str(result["gross_amount"]),
+        "platform_fee_amount": str(result["platform_fee_amount"]),
+        "net_amount": str(result["net_amount"]),
+        "receivables": [{**r, "amount": str(r["amount"])} for r in result["receivables"]],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument(
+        "--repeat", type=int, default=25, help="Rodadas; reporta a melhor (muitas rodadas curtas filtram o ruído)."
+    )
+    args = parser.parse_args()
+
+    service = Injector([BillingModule]).get(PaymentService)
+    capture_path(service)
+
+    elapsed = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            capture_path(service)
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    # Pico de memória transitória de uma chamada (objetos temporários incluídos)
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    capture_path(service)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"iterações:       {args.iterations:>10,}")
+    print(f"throughput:      {args.iterations / elapsed:>10,.0f} cálculos/s")
+    print(f"latência média:  {elapsed / args.iterations * 1e6:>10.2f} µs")
+    print(f"pico de memória: {peak - baseline:>10,} bytes por cálculo (tracemalloc)")
+
+
+if __name__ == "__main__":
+    main()
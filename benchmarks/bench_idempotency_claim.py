@@ -0,0 +1,134 @@
+"""
+Benchmark concorrente da verificação de idempotência: SELECT FOR UPDATE + INSERT (dois
+round trips) vs claim() (INSERT ... ON CONFLICT ... RETURNING, um round trip).
+
+Cada cliente (thread, conexão própria) roda transações "check + mark_completed" em dois cenários:
+- distinct: toda requisição usa uma chave nova
+- same: todos os clientes disputam um conjunto pequeno de chaves quentes (retries do gateway)
+
+Cria e destrói um banco de teste. Os números que interessam são os do PostgreSQL (DATABASE_URL);
+no SQLite as escritas são serializadas pelo próprio banco.
+
+Uso: python -m benchmarks.bench_idempotency_claim --clients 16 --requests 200 --hot-keys 8
+"""
+
+import argparse
+import os
+import statistics
+import threading
+import time
+import uuid
+
+import django
+from django.conf import settings
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "src.settings")
+django.setup()
+
+from django.db import IntegrityError, OperationalError, connection, transaction  # noqa: E402
+
+from src.idempotency.models import IdempotencyStatus  # noqa: E402
+from src.idempotency.repositories import IdempotencyRepository  # noqa: E402
+
+RESPONSE = {"payment_id": "bench", "status": "captured"}
+
+
+def lock_then_insert(repository: IdempotencyRepository, key: str, payload_hash: str):
+    """Fluxo anterior de IdempotencyService.check."""
+    record = repository.get_by_key_for_update(key)
+    if record is None:
+        return repository.create(key, payload_hash), True
+    return record, False
+
+
+def claim(repository: IdempotencyRepository, key: str, payload_hash: str):
+    return repository.claim(key, payload_hash)
+
+
+STRATEGIES = {"lock": lock_then_insert, "claim": claim}
+
+
+def run_client(strategy, keys: list[str], latencies: list[float], errors: list[int]) -> None:
+    repository = IdempotencyRepository()
+    for key in keys:
+        start = time.perf_counter()
+        try:
+            with transaction.atomic():
+                record, created = strategy(repository, key, "hash")
+                if created:
+                    repository.mark_completed(record, RESPONSE)
+                elif record.status != IdempotencyStatus.COMPLETED:
+                    errors.append(1)
+        except (IntegrityError, OperationalError):
+            # lock: duas requisições inserindo a mesma chave nova -> unique violation (500 na API)
+            errors.append(1)
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+
+
+def run(strategy_name: str, scenario: str, clients: int, requests: int, hot_keys: int) -> dict:
+    run_id = uuid.uuid4().hex[:8]
+    if scenario == "distinct":
+        plan = [[f"{run_id}-{c}-{i}" for i in range(requests)] for c in range(clients)]
+    else:
+        plan = [[f"{run_id}-hot-{(c + i) % hot_keys}" for i in range(requests)] for c in range(clients)]
+
+    latencies: list[float] = []
+    errors: list[int] = []
+    threads = [
+        threading.Thread(target=run_client, args=(STRATEGIES[strategy_name], keys, latencies, errors)) for keys in plan
+    ]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "strategy": strategy_name,
+        "scenario": scenario,
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": quantiles[49] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="Requisições por cliente.")
+    parser.add_argument("--hot-keys", type=int, default=8, help="Chaves disputadas no cenário same.")
+    args = parser.parse_args()
+
+    if connection.vendor == "sqlite":
+        # Arquivo (não memória compartilhada) + BEGIN IMMEDIATE: escritores esperam o lock em vez de falhar
+        database = settings.DATABASES["default"]
+        database["TEST"] = {**database.get("TEST", {}), "NAME": str(settings.BASE_DIR / "bench_idempotency.sqlite3")}
+        database["OPTIONS"] = {
+            **database.get("OPTIONS", {}),
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 30,
+            "init_command": "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;",
+        }
+        connection.settings_dict.update(database)
+
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        print(f"banco: {connection.vendor}, {args.clients} clientes x {args.requests} requisições")
+        for scenario in ("distinct", "same"):
+            for strategy_name in STRATEGIES:
+                r = run(strategy_name, scenario, args.clients, args.requests, args.hot_keys)
+                print(
+                    f"{r['scenario']:>8} {r['strategy']:>5}: {r['throughput']:>9,.0f} req/s  "
+                    f"p50 {r['p50_ms']:.2f} ms  p99 {r['p99_ms']:.2f} ms  erros {r['errors']}"
+                )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Relay particionado com vários processos: vazão e verificação da ordem por agregado.
+
+Semeia --aggregates payments com --events eventos cada (seq 0..n-1, intercalados entre payments)
+e sobe --workers processos de relay_outbox --partitioned. Com um terço publicado, um worker sai
+(leave) e outro entra, forçando rebalanceamento. No fim confere, para cada payment, que os eventos
+foram publicados na ordem de seq e sem duplicatas.
+
+Cria e destrói um banco de teste. Roda no SQLite (arquivo, escritas serializadas pelo banco) ou no
+PostgreSQL local via DATABASE_URL.
+
+Uso: python -m benchmarks.bench_outbox_partitions --workers 4 --aggregates 200 --events 10
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+import uuid
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import django
+from django.conf import settings
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "src.settings")
+django.setup()
+
+from django.db import connection  # noqa: E402
+
+from src.outbox.models import OutboxEvent, OutboxEventStatus  # noqa: E402
+from src.outbox.publishers import OutboxPublisher, to_message  # noqa: E402
+from src.outbox.repositories.lease_repository import OutboxLeaseRepository  # noqa: E402
+from src.outbox.repositories.outbox_repository import OutboxRepository  # noqa: E402
+from src.outbox.services.partitioned_relay import PartitionedRelay  # noqa: E402
+from src.outbox.services.relay_service import OutboxRelayService  # noqa: E402
+
+
+class TimestampedPublisher(OutboxPublisher):
+    """Uma linha por evento com o instante da publicação - a ordem entre processos sai daqui."""
+
+    def __init__(self, path: Path, worker_id: str, delay: float):
+        self._path = path
+        self._worker_id = worker_id
+        self._delay = delay
+
+    def publish(self, events: list[OutboxEvent]) -> None:
+        time.sleep(self._delay)  # latência simulada do broker
+        with self._path.open("a", encoding="utf-8") as file:
+            for event in events:
+                line = {**to_message(event), "worker": self._worker_id, "partition": event.partition}
+                file.write(json.dumps({**line, "published_ns": time.time_ns()}) + "\n")
+
+
+def worker(database: dict, worker_id: str, output: str, stop, partitions: int, lease_seconds: float, delay: float):
+    connection.settings_dict.update(database)
+    publisher = TimestampedPublisher(Path(output), worker_id, delay)
+    relay = PartitionedRelay(
+        OutboxRelayService(OutboxRepository(), publisher),
+        OutboxLeaseRepository(),
+        worker_id=worker_id,
+        partitions=partitions,
+        lease_seconds=lease_seconds,
+    )
+    try:
+        relay.run(batch_size=50, poll_interval=0.05, stop=stop)
+    finally:
+        relay.leave()
+        connection.close()
+
+
+def seed(aggregates: int, events: int, partitions: int) -> None:
+    repository = OutboxRepository(partitions=partitions)
+    ids = [str(uuid.uuid4()) for _ in range(aggregates)]
+    for seq in range(events):
+        repository.bulk_create(
+            [repository.build("payment_captured", {"aggregate": a, "seq": seq}, partition_key=a) for a in ids]
+        )
+
+
+def pending() -> int:
+    return OutboxEvent.objects.filter(status=OutboxEventStatus.PENDING).count()
+
+
+def check(output: Path) -> dict:
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    lines.sort(key=lambda line: line["published_ns"])
+    sequences = defaultdict(list)
+    for line in lines:
+        sequences[line["payload"]["aggregate"]].append(line["payload"]["seq"])
+
+    owners = defaultdict(set)
+    for line in lines:
+        owners[line["partition"]].add(line["worker"])
+
+    return {
+        "published": len(lines),
+        "duplicates": len(lines) - len({line["id"] for line in lines}),
+        "out_of_order": sum(seqs != sorted(seqs) for seqs in sequences.values()),
+        "handovers": sum(len(workers) - 1 for workers in owners.values()),
+        "per_worker": Counter(line["worker"] for line in lines),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--aggregates", type=int, default=200)
+    parser.add_argument("--events", type=int, default=10, help="Eventos por payment.")
+    parser.add_argument("--partitions", type=int, default=16)
+    parser.add_argument("--lease-seconds", type=float, default=2.0)
+    parser.add_argument("--publish-delay", type=float, default=0.005, help="Segundos por lote no publisher.")
+    args = parser.parse_args()
+
+    if connection.vendor == "sqlite":
+        database = settings.DATABASES["default"]
+        database["TEST"] = {**database.get("TEST", {}), "NAME": str(settings.BASE_DIR / "bench_outbox.sqlite3")}
+        database["OPTIONS"] = {
+            **database.get("OPTIONS", {}),
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 30,
+            "init_command": "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;",
+        }
+        connection.settings_dict.update(database)
+
+    old_name = connection.creation.create_test_db(verbosity=0)
+    context = multiprocessing.get_context("spawn")
+    try:
+        seed(args.aggregates, args.events, args.partitions)
+        total = pending()
+        database = {key: connection.settings_dict[key] for key in ("NAME", "OPTIONS")}
+        connection.close()
+
+        output = Path(tempfile.mkstemp(prefix="outbox-", suffix=".jsonl")[1])
+        processes = {}
+
+        def start(worker_id: str) -> None:
+            stop = context.Event()
+            process = context.Process(
+                target=worker,
+                args=(database, worker_id, str(output), stop, args.partitions, args.lease_seconds, args.publish_delay),
+            )
+            process.start()
+            processes[worker_id] = (process, stop)
+
+        started = time.perf_counter()
+        for i in range(args.workers):
+            start(f"worker-{i}")
+
+        rebalanced = False
+        while pending():
+            if not rebalanced and pending() <= total * 2 // 3:
+                # Um worker sai e outro entra no meio do caminho
+                process, stop = processes.pop("worker-0")
+                stop.set()
+                process.join()
+                start("worker-late")
+                rebalanced = True
+            time.sleep(0.05)
+        elapsed = time.perf_counter() - started
+
+        for process, stop in processes.values():
+            stop.set()
+        for process, _ in processes.values():
+            process.join()
+
+        result = check(output)
+        output.unlink()
+        print(f"banco: {connection.vendor}, {args.workers} workers, {args.partitions} partições, {total} eventos")
+        print(
+            f"{result['published']} publicados em {elapsed:.2f}s ({result['published'] / elapsed:,.0f} eventos/s), "
+            f"duplicados {result['duplicates']}, payments fora de ordem {result['out_of_order']}, "
+            f"trocas de dono {result['handovers']}"
+        )
+        for worker_id, count in sorted(result["per_worker"].items()):
+            print(f"  {worker_id}: {count}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark do split em lote (colunar) vs. caminho escalar.
+calculate_many ainda aloca pagamento a pagamento; a diferença é não montar Decimal/dict/Money por recebedor.
+
+Uso: python -m benchmarks.bench_split_calculator --payments 1000000
+O caminho escalar roda sobre uma amostra (--scalar-sample) e é extrapolado.
+"""
+
+import argparse
+import random
+import time
+from decimal import Decimal
+
+from src.billing.services.split_calculator import SplitCalculator
+from src.common.money import Money
+
+LAYOUTS = [
+    [Decimal("100")],
+    [Decimal("70"), Decimal("30")],
+    [Decimal("33.33"), Decimal("33.33"), Decimal("33.34")],
+    [Decimal("50"), Decimal("25"), Decimal("15"), Decimal("10")],
+    [Decimal("10"), Decimal("15"), Decimal("20"), Decimal("25"), Decimal("30")],
+]
+
+
+def build_dataset(payments: int, seed: int):
+    rng = random.Random(seed)
+    calculator = SplitCalculator()
+    scaled_layouts = [[calculator.to_scaled_percent(p) for p in layout] for layout in LAYOUTS]
+
+    net_cents, offsets, scaled, layout_ids = [], [0], [], []
+    for _ in range(payments):
+        layout_id = rng.randrange(len(LAYOUTS))
+        net_cents.append(rng.randint(1, 5_000_000))
+        scaled.extend(scaled_layouts[layout_id])
+        offsets.append(len(scaled))
+        layout_ids.append(layout_id)
+    return net_cents, offsets, scaled, layout_ids
+
+
+def run_scalar(calculator: SplitCalculator, net_cents, layout_ids) -> float:
+    splits_by_layout = [
+        [{"recipient_id": str(j), "role": "r", "percent": p} for j, p in enumerate(layout)] for layout in LAYOUTS
+    ]
+    start = time.perf_counter()
+    for cents, layout_id in zip(net_cents, layout_ids):
+        calculator.calculate(Money(cents), splits_by_layout[layout_id])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--payments", type=int, default=1_000_000)
+    parser.add_argument("--scalar-sample", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    calculator = SplitCalculator()
+    net_cents, offsets, scaled, layout_ids = build_dataset(args.payments, args.seed)
+
+    start = time.perf_counter()
+    calculator.calculate_many(net_cents, offsets, scaled)
+    batch_elapsed = time.perf_counter() - start
+
+    sample = min(args.scalar_sample, args.payments)
+    scalar_elapsed = run_scalar(calculator, net_cents[:sample], layout_ids[:sample])
+
+    batch_rate = args.payments / batch_elapsed
+    scalar_rate = sample / scalar_elapsed
+    print(f"pagamentos:        {args.payments:>12,}  ({len(scaled):,} recebedores)")
+    print(f"calculate_many:    {batch_rate:>12,.0f} pagamentos/s  ({batch_elapsed:.2f}s)")
+    print(f"calculate (1 a 1): {scalar_rate:>12,.0f} pagamentos/s  (amostra de {sample:,})")
+    print(f"speedup:           {batch_rate / scalar_rate:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Inserts com PK UUID v4 (aleatório) vs UUID v7 (ordenado pelo tempo): vazão e tamanho do índice da PK.
+
+Cada variante grava --rows linhas em uma tabela própria (mesmo formato: PK uuid + colunas de um
+evento pequeno), em transações de --batch linhas, como um fluxo de capturas. Com v4 cada insert cai
+em uma folha aleatória do B-tree (page splits, páginas meio vazias, working set = índice inteiro);
+com v7 os inserts vão para a última folha.
+
+Cria e destrói um banco de teste. PostgreSQL via DATABASE_URL (pg_relation_size do índice); no
+SQLite o tamanho vem da tabela virtual dbstat, quando disponível.
+
+Uso: python -m benchmarks.bench_uuid_keys --rows 200000 --batch 500
+"""
+
+import argparse
+import os
+import time
+import uuid
+
+import django
+from django.conf import settings
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "src.settings")
+django.setup()
+
+from django.db import OperationalError, connection, models, transaction  # noqa: E402
+
+from src.common.ids import uuid7  # noqa: E402
+
+GENERATORS = {"v4": uuid.uuid4, "v7": uuid7}
+_UUID_FIELD = models.UUIDField()
+
+
+def create_table(name: str) -> None:
+    uuid_type = "uuid" if connection.vendor == "postgresql" else "char(32)"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE {name} (id {uuid_type} NOT NULL PRIMARY KEY, event_type varchar(100) NOT NULL, "
+            f"amount bigint NOT NULL)"
+        )
+
+
+def index_size(table: str) -> int | None:
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT pg_relation_size(%s)", [f"{table}_pkey"])
+            return cursor.fetchone()[0]
+        try:
+            cursor.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = %s", [f"sqlite_autoindex_{table}_1"])
+        except OperationalError:
+            return None  # SQLite compilado sem SQLITE_ENABLE_DBSTAT_VTAB
+        return cursor.fetchone()[0]
+
+
+def run(variant: str, rows: int, batch: int) -> dict:
+    table = f"bench_keys_{variant}"
+    create_table(table)
+    generate = GENERATORS[variant]
+    sql = f"INSERT INTO {table} (id, event_type, amount) VALUES (%s, %s, %s)"
+
+    start = time.perf_counter()
+    for offset in range(0, rows, batch):
+        params = [
+            (_UUID_FIELD.get_db_prep_value(generate(), connection), "payment_captured", i)
+            for i in range(offset, min(offset + batch, rows))
+        ]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, params)
+    elapsed = time.perf_counter() - start
+
+    return {"variant": variant, "throughput": rows / elapsed, "index_bytes": index_size(table)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=500, help="Linhas por transação.")
+    args = parser.parse_args()
+
+    if connection.vendor == "sqlite":
+        # Arquivo em disco: o tamanho do índice e o custo de page split só aparecem fora da memória
+        database = settings.DATABASES["default"]
+        database["TEST"] = {**database.get("TEST", {}), "NAME": str(settings.BASE_DIR / "bench_uuid_keys.sqlite3")}
+        connection.settings_dict.update(database)
+
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        print(f"banco: {connection.vendor}, {args.rows:,} linhas em transações de {args.batch}")
+        results = [run(variant, args.rows, args.batch) for variant in GENERATORS]
+        for r in results:
+            size = f"{r['index_bytes'] / 1024 / 1024:,.1f} MiB" if r["index_bytes"] is not None else "n/d"
+            print(f"{r['variant']}: {r['throughput']:>10,.0f} inserts/s  índice da PK {size}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
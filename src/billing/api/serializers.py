@@ -1,5 +1,6 @@
 from rest_framework import serializers
 
+from src.billing.constants import LEDGER_PAGE_SIZE, MAX_BATCH_SIZE, MAX_LEDGER_PAGE_SIZE
 from src.billing.models import PaymentMethod
 
 
@@ -14,9 +15,37 @@ class PaymentInputSerializer(serializers.Serializer):
     currency = serializers.CharField(max_length=3)
     payment_method = serializers.ChoiceField(choices=PaymentMethod)
     installments = serializers.IntegerField(default=1)
+    splits = SplitSerializer(many=True, required=False)
+    split_template_id = serializers.UUIDField(required=False)
+
+    def validate(self, attrs):
+        # Exatamente um dos dois: a lista de splits ou um template já validado
+        if ("splits" in attrs) == ("split_template_id" in attrs):
+            raise serializers.ValidationError({"splits": "Informe splits ou split_template_id (apenas um)."})
+        return attrs
+
+
+class SplitTemplateInputSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=255)
+    splits = SplitSerializer(many=True)
+
+
+class SplitTemplateOutputSerializer(serializers.Serializer):
+    id = serializers.CharField()
+    name = serializers.CharField()
+    version = serializers.IntegerField()
     splits = SplitSerializer(many=True)
 
 
+class PaymentBatchItemSerializer(PaymentInputSerializer):
+    idempotency_key = serializers.CharField(max_length=255)
+
+
+class PaymentBatchInputSerializer(serializers.Serializer):
+    # Itens validados um a um na view para que erros de estrutura fiquem no próprio item
+    payments = serializers.ListField(child=serializers.DictField(), min_length=1, max_length=MAX_BATCH_SIZE)
+
+
 class ReceivableSerializer(serializers.Serializer):
     recipient_id = serializers.CharField()
     role = serializers.CharField()
@@ -28,6 +57,33 @@ class OutboxEventSerializer(serializers.Serializer):
     status = serializers.CharField()
 
 
+class QuoteOutputSerializer(serializers.Serializer):
+    gross_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    platform_fee_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    net_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    receivables = ReceivableSerializer(many=True)
+
+
+class InstallmentSimulationInputSerializer(serializers.Serializer):
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class InstallmentOptionSerializer(serializers.Serializer):
+    installments = serializers.IntegerField()
+    rate = serializers.DecimalField(max_digits=6, decimal_places=4)
+    platform_fee_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    net_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    installment_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class QuoteCacheStatsSerializer(serializers.Serializer):
+    hits = serializers.IntegerField()
+    misses = serializers.IntegerField()
+    size = serializers.IntegerField()
+    max_size = serializers.IntegerField()
+    hit_rate = serializers.FloatField()
+
+
 class PaymentOutputSerializer(serializers.Serializer):
     payment_id = serializers.CharField()
     status = serializers.CharField()
@@ -36,3 +92,68 @@ class PaymentOutputSerializer(serializers.Serializer):
     net_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
     receivables = ReceivableSerializer(many=True)
     outbox_event = OutboxEventSerializer()
+
+
+class PaymentBatchResultSerializer(serializers.Serializer):
+    index = serializers.IntegerField()
+    idempotency_key = serializers.CharField(allow_null=True)
+    status = serializers.IntegerField(source="status_code")
+    payment = PaymentOutputSerializer(source="response", required=False)
+    errors = serializers.DictField(required=False)
+
+
+class RecipientLedgerQuerySerializer(serializers.Serializer):
+    limit = serializers.IntegerField(default=LEDGER_PAGE_SIZE, min_value=1, max_value=MAX_LEDGER_PAGE_SIZE)
+    cursor = serializers.CharField(required=False, max_length=200)
+
+
+class LedgerEntryOutputSerializer(serializers.Serializer):
+    id = serializers.CharField()
+    payment_id = serializers.CharField()
+    role = serializers.CharField()
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    created_at = serializers.DateTimeField()
+
+
+class RecipientBalanceOutputSerializer(serializers.Serializer):
+    recipient_id = serializers.CharField()
+    balance = serializers.CharField()
+    entries = serializers.IntegerField()
+
+
+class RevenueQuerySerializer(serializers.Serializer):
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+
+    def validate(self, attrs):
+        # Intervalos alinhados à hora fecham com os buckets dos rollups (sem varrer horas parciais)
+        for name in ("start", "end"):
+            value = attrs[name]
+            if (value.minute, value.second, value.microsecond) != (0, 0, 0):
+                raise serializers.ValidationError({name: "Use um horário cheio (ex.: 2026-10-01T00:00:00-03:00)."})
+        if attrs["start"] >= attrs["end"]:
+            raise serializers.ValidationError({"end": "end deve ser maior que start."})
+        return attrs
+
+
+class PaymentRevenueSerializer(serializers.Serializer):
+    payment_method = serializers.CharField()
+    installments = serializers.IntegerField()
+    payments = serializers.IntegerField()
+    gross_amount = serializers.CharField()
+    platform_fee_amount = serializers.CharField()
+    net_amount = serializers.CharField()
+
+
+class LedgerRevenueSerializer(serializers.Serializer):
+    role = serializers.CharField()
+    entries = serializers.IntegerField()
+    amount = serializers.CharField()
+
+
+class RevenueOutputSerializer(serializers.Serializer):
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+    rolled_up_until = serializers.DateTimeField(allow_null=True)
+    payments = PaymentRevenueSerializer(many=True)
+    ledger = LedgerRevenueSerializer(many=True)
@@ -1,7 +1,29 @@
 from django.urls import path
 
-from src.billing.api.views import PaymentView
+from src.billing.api.views import (
+    InstallmentSimulationView,
+    PaymentBatchView,
+    PaymentDetailView,
+    PaymentView,
+    QuoteCacheStatsView,
+    QuoteView,
+    RecipientBalanceView,
+    RecipientLedgerView,
+    RevenueReportView,
+    SplitTemplateDetailView,
+    SplitTemplateView,
+)
 
 urlpatterns = [
     path("payments", PaymentView.as_view(), name="payment-create"),
+    path("payments/batch", PaymentBatchView.as_view(), name="payment-batch-create"),
+    path("payments/<uuid:payment_id>", PaymentDetailView.as_view(), name="payment-detail"),
+    path("quote", QuoteView.as_view(), name="quote"),
+    path("quote/stats", QuoteCacheStatsView.as_view(), name="quote-stats"),
+    path("installments", InstallmentSimulationView.as_view(), name="installment-simulation"),
+    path("split-templates", SplitTemplateView.as_view(), name="split-template-create"),
+    path("split-templates/<uuid:template_id>", SplitTemplateDetailView.as_view(), name="split-template-detail"),
+    path("recipients/<str:recipient_id>/balance", RecipientBalanceView.as_view(), name="recipient-balance"),
+    path("recipients/<str:recipient_id>/ledger", RecipientLedgerView.as_view(), name="recipient-ledger"),
+    path("reports/revenue", RevenueReportView.as_view(), name="revenue-report"),
 ]
@@ -1,11 +1,33 @@
+from django.utils.http import parse_etags
 from injector import inject
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from src.billing.api.serializers import PaymentInputSerializer, PaymentOutputSerializer
+from src.billing.api.serializers import (
+    InstallmentOptionSerializer,
+    InstallmentSimulationInputSerializer,
+    LedgerEntryOutputSerializer,
+    PaymentBatchInputSerializer,
+    PaymentBatchItemSerializer,
+    PaymentBatchResultSerializer,
+    PaymentInputSerializer,
+    PaymentOutputSerializer,
+    QuoteCacheStatsSerializer,
+    QuoteOutputSerializer,
+    RecipientBalanceOutputSerializer,
+    RecipientLedgerQuerySerializer,
+    RevenueOutputSerializer,
+    RevenueQuerySerializer,
+    SplitTemplateInputSerializer,
+    SplitTemplateOutputSerializer,
+)
+from src.billing.selectors import LedgerSelector, RevenueSelector
+from src.billing.services.payment_query_service import PaymentQueryService
 from src.billing.services.payment_service import PaymentService
+from src.billing.services.quote_service import QuoteService
+from src.billing.services.split_template_service import SplitTemplateService
 
 
 class PaymentView(APIView):
@@ -31,3 +53,232 @@ class PaymentView(APIView):
 
         output_serializer = PaymentOutputSerializer(result)
         return Response(output_serializer.data, status=status.HTTP_201_CREATED)
+
+
+class PaymentDetailView(APIView):
+    """
+    Pagamento + ledger entries. Responde com ETag forte; If-None-Match igual devolve 304 sem corpo
+    e, com o cache quente, sem tocar o banco.
+    """
+
+    _payment_query_service: PaymentQueryService
+
+    @inject
+    def setup(self, request, *args, payment_query_service: PaymentQueryService, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self._payment_query_service = payment_query_service
+
+    def get(self, request: Request, payment_id) -> Response:
+        detail = self._payment_query_service.get(payment_id)
+        headers = {"ETag": detail.etag, "Cache-Control": "private, no-cache"}
+
+        # Comparação fraca, como manda a RFC 9110 para If-None-Match (W/"x" casa com "x")
+        client_etags = {etag.removeprefix("W/") for etag in parse_etags(request.headers.get("If-None-Match", ""))}
+        if detail.etag in client_etags or "*" in client_etags:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(detail.data, headers=headers)
+
+
+class PaymentBatchView(APIView):
+    """
+    Captura em lote: cada item traz sua própria idempotency_key.
+    Responde 207 com um resultado por item (status 201/400/409 individual).
+    """
+
+    _payment_service: PaymentService
+
+    @inject
+    def setup(self, request, *args, payment_service: PaymentService, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self._payment_service = payment_service
+
+    def post(self, request: Request) -> Response:
+        batch_serializer = PaymentBatchInputSerializer(data=request.data)
+        batch_serializer.is_valid(raise_exception=True)
+
+        results = []
+        valid_items = []
+        valid_indexes = []
+
+        for index, raw_item in enumerate(batch_serializer.validated_data["payments"]):
+            item_serializer = PaymentBatchItemSerializer(data=raw_item)
+            if not item_serializer.is_valid():
+                results.append(
+                    {
+                        "index": index,
+                        "idempotency_key": raw_item.get("idempotency_key"),
+                        "status_code": status.HTTP_400_BAD_REQUEST,
+                        "errors": item_serializer.errors,
+                    }
+                )
+                continue
+
+            data = dict(item_serializer.validated_data)
+            idempotency_key = data.pop("idempotency_key")
+            valid_items.append((idempotency_key, data))
+            valid_indexes.append(index)
+
+        if valid_items:
+            processed = self._payment_service.process_many(valid_items)
+            results.extend({"index": index, **item} for index, item in zip(valid_indexes, processed))
+
+        results.sort(key=lambda item: item["index"])
+        output_serializer = PaymentBatchResultSerializer(results, many=True)
+        return Response({"results": output_serializer.data}, status=status.HTTP_207_MULTI_STATUS)
+
+
+class QuoteView(APIView):
+    """Cotação de taxa + split sem persistir (não acessa o banco)."""
+
+    _quote_service: QuoteService
+
+    @inject
+    def setup(self, request, *args, quote_service: QuoteService, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self._quote_service = quote_service
+
+    def post(self, request: Request) -> Response:
+        input_serializer = PaymentInputSerializer(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+
+        result = self._quote_service.quote(input_serializer.validated_data)
+
+        output_serializer = QuoteOutputSerializer(result)
+        return Response(output_serializer.data, status=status.HTTP_200_OK)
+
+
+class QuoteCacheStatsView(APIView):
+    """Contadores de hit/miss do cache de cotação (por processo) para dimensionamento."""
+
+    _quote_service: QuoteService
+
+    @inject
+    def setup(self, request, *args, quote_service: QuoteService, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self._quote_service = quote_service
+
+    def get(self, request: Request) -> Response:
+        return Response(QuoteCacheStatsSerializer(self._quote_service.stats()).data)
+
+
+class InstallmentSimulationView(APIView):
+    """Simulador de parcelamento: taxa, líquido e valor da parcela de 1x a 12x em uma chamada."""
+
+    _payment_service: PaymentService
+
+    @inject
+    def setup(self, request, *args, payment_service: PaymentService, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self._payment_service = payment_service
+
+    def get(self, request: Request) -> Response:
+        input_serializer = InstallmentSimulationInputSerializer(data=request.query_params)
+        input_serializer.is_valid(raise_exception=True)
+
+        options = self._payment_service.simulate_installments(input_serializer.validated_data["amount"])
+
+        return Response(
+            {
+                "gross_amount": str(input_serializer.validated_data["amount"]),
+                "options": InstallmentOptionSerializer(options, many=True).data,
+            }
+        )
+
+
+class SplitTemplateView(APIView):
+    """Cria templates de split reutilizáveis (validados uma única vez aqui)."""
+
+    _split_template_service: SplitTemplateService
+
+    @inject
+    def setup(self, request, *args, split_template_service: SplitTemplateService, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self._split_template_service = split_template_service
+
+    def post(self, request: Request) -> Response:
+        input_serializer = SplitTemplateInputSerializer(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+
+        template = self._split_template_service.create(**input_serializer.validated_data)
+
+        return Response(SplitTemplateOutputSerializer(template).data, status=status.HTTP_201_CREATED)
+
+
+class SplitTemplateDetailView(APIView):
+    _split_template_service: SplitTemplateService
+
+    @inject
+    def setup(self, request, *args, split_template_service: SplitTemplateService, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self._split_template_service = split_template_service
+
+    def get(self, request: Request, template_id) -> Response:
+        template = self._split_template_service.get(template_id)
+        return Response(SplitTemplateOutputSerializer(template).data)
+
+    def put(self, request: Request, template_id) -> Response:
+        input_serializer = SplitTemplateInputSerializer(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+
+        template = self._split_template_service.update(template_id, **input_serializer.validated_data)
+
+        return Response(SplitTemplateOutputSerializer(template).data)
+
+
+class RecipientLedgerView(APIView):
+    """Extrato do recebedor (mais novo primeiro), paginado por cursor: ?limit=50&cursor=<next_cursor>."""
+
+    _ledger_selector: LedgerSelector
+
+    @inject
+    def setup(self, request, *args, ledger_selector: LedgerSelector, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self._ledger_selector = ledger_selector
+
+    def get(self, request: Request, recipient_id: str) -> Response:
+        input_serializer = RecipientLedgerQuerySerializer(data=request.query_params)
+        input_serializer.is_valid(raise_exception=True)
+
+        page = self._ledger_selector.recipient_statement(recipient_id, **input_serializer.validated_data)
+
+        return Response(
+            {
+                "recipient_id": recipient_id,
+                "entries": LedgerEntryOutputSerializer(page.entries, many=True).data,
+                "next_cursor": page.next_cursor,
+            }
+        )
+
+
+class RecipientBalanceView(APIView):
+    """Saldo acumulado do recebedor (read model recipient_balances, sem SUM sobre o ledger)."""
+
+    _ledger_selector: LedgerSelector
+
+    @inject
+    def setup(self, request, *args, ledger_selector: LedgerSelector, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self._ledger_selector = ledger_selector
+
+    def get(self, request: Request, recipient_id: str) -> Response:
+        return Response(RecipientBalanceOutputSerializer(self._ledger_selector.recipient_balance(recipient_id)).data)
+
+
+class RevenueReportView(APIView):
+    """Totais de receita de [start, end) a partir dos rollups (+ a hora aberta, direto das tabelas)."""
+
+    _revenue_selector: RevenueSelector
+
+    @inject
+    def setup(self, request, *args, revenue_selector: RevenueSelector, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self._revenue_selector = revenue_selector
+
+    def get(self, request: Request) -> Response:
+        input_serializer = RevenueQuerySerializer(data=request.query_params)
+        input_serializer.is_valid(raise_exception=True)
+
+        totals = self._revenue_selector.totals(**input_serializer.validated_data)
+
+        return Response(RevenueOutputSerializer(totals).data)
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class BillingConfig(AppConfig):
+    name = "src.billing"
+    label = "billing"
+
+    def ready(self):
+        # Invalidação do cache de GET /payments/{id} em escritas pelo ORM
+        from src.billing import signals  # noqa: F401
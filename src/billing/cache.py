@@ -0,0 +1,58 @@
+from typing import Iterable, Optional
+from uuid import UUID
+
+from django.core.cache import caches
+
+
+class PaymentDetailCache:
+    """
+    Cache read-through do detalhe de pagamento (GET /payments/{id}): guarda {"etag", "data"} por id.
+
+    Pagamento capturado é imutável, então a entrada vale até o TTL. Escritas pelo ORM em payments
+    ou ledger_entries já existentes invalidam a entrada no commit (ver src/billing/signals.py);
+    pagamento novo não precisa, porque 404 nunca é cacheado.
+
+    Esta classe base é o cache desligado (PAYMENT_DETAIL_CACHE="none").
+    """
+
+    def get(self, payment_id: UUID) -> Optional[dict]:
+        return None
+
+    def set(self, payment_id: UUID, entry: dict) -> None:
+        return None
+
+    def invalidate(self, payment_ids: Iterable[UUID]) -> None:
+        return None
+
+
+class DjangoPaymentDetailCache(PaymentDetailCache):
+    """Backend de cache do Django (CACHES[alias]) - Redis/Memcached compartilhado entre workers em produção."""
+
+    KEY_PREFIX = "payment-detail"
+
+    def __init__(self, alias: str = "default", ttl: float = 86400.0):
+        self._alias = alias
+        self._ttl = ttl
+
+    @property
+    def _cache(self):
+        return caches[self._alias]
+
+    @classmethod
+    def _cache_key(cls, payment_id: UUID) -> str:
+        return f"{cls.KEY_PREFIX}:{UUID(str(payment_id)).hex}"
+
+    def get(self, payment_id: UUID) -> Optional[dict]:
+        return self._cache.get(self._cache_key(payment_id))
+
+    def set(self, payment_id: UUID, entry: dict) -> None:
+        self._cache.set(self._cache_key(payment_id), entry, timeout=self._ttl)
+
+    def invalidate(self, payment_ids: Iterable[UUID]) -> None:
+        self._cache.delete_many([self._cache_key(payment_id) for payment_id in payment_ids])
+
+
+def build_payment_detail_cache(backend: str, alias: str, ttl: float) -> PaymentDetailCache:
+    if backend == "django":
+        return DjangoPaymentDetailCache(alias=alias, ttl=ttl)
+    return PaymentDetailCache()
@@ -5,7 +5,17 @@ MIN_INSTALLMENTS = 1
 MAX_INSTALLMENTS = 12
 
 MIN_SPLITS = 1
-MAX_SPLITS = 5
+# O máximo (MAX_SPLITS) vem de settings: configurável por ambiente
+
+# Ledger entries são gravados em blocos deste tamanho (um INSERT por bloco)
+LEDGER_WRITE_CHUNK_SIZE = 500
+
+# Limite de pagamentos por requisição no endpoint em lote
+MAX_BATCH_SIZE = 100
+
+# Extrato por recebedor (GET /recipients/{id}/ledger): tamanho padrão e máximo da página
+LEDGER_PAGE_SIZE = 50
+MAX_LEDGER_PAGE_SIZE = 200
 
 EXPECTED_PERCENT_SUM = 100
 MIN_PERCENT = 0
@@ -1,22 +1,125 @@
-from injector import Binder, Module
+from typing import Optional
 
-from src.billing.rates import PlatformRates
+from django.conf import settings
+from injector import Binder, Module, ProviderOf, provider, singleton
+
+from src.billing.cache import PaymentDetailCache, build_payment_detail_cache
+from src.billing.rates import FileRatesLoader, PlatformRates, RatesLoader, RatesProvider
+from src.billing.repositories.balance_repository import RecipientBalanceRepository
+from src.billing.repositories.capture_repository import CaptureRepository
+from src.billing.repositories.partition_repository import PartitionRepository
 from src.billing.repositories.payment_repository import PaymentRepository
+from src.billing.repositories.rates_repository import PlatformRatesRepository
+from src.billing.repositories.rollup_repository import RollupRepository
+from src.billing.repositories.split_template_repository import SplitTemplateRepository
+from src.billing.selectors import LedgerSelector, PaymentSelector, RevenueSelector
 from src.billing.services.fee_calculator import FeeCalculator
+from src.billing.services.payment_query_service import PaymentQueryService
 from src.billing.services.payment_service import PaymentService
+from src.billing.services.quote_service import QuoteCache, QuoteService
 from src.billing.services.split_calculator import SplitCalculator
+from src.billing.services.split_template_service import SplitPlanCache, SplitTemplateService
+from src.idempotency.cache import DjangoReplayCache, LocalReplayCache, ReplayCache
+from src.idempotency.coalescing import InFlightRequests
+from src.idempotency.hashing import PayloadHasher
 from src.idempotency.repositories import IdempotencyRepository
 from src.idempotency.services import IdempotencyService
+from src.outbox.dispatcher import OutboxDispatcher
+from src.outbox.publishers import OutboxPublisher, build_publisher
+from src.outbox.repositories.lease_repository import OutboxLeaseRepository
 from src.outbox.repositories.outbox_repository import OutboxRepository
+from src.outbox.services.relay_service import OutboxRelayService
 
 
 class BillingModule(Module):
     def configure(self, binder: Binder) -> None:
         binder.bind(PlatformRates, to=PlatformRates())
+        binder.bind(
+            RatesProvider,
+            to=RatesProvider(
+                defaults=PlatformRates(),
+                loader=self._rates_loader(),
+                reload_interval=settings.PLATFORM_RATES_RELOAD_SECONDS,
+            ),
+        )
+        binder.bind(PlatformRatesRepository, to=PlatformRatesRepository)
         binder.bind(FeeCalculator, to=FeeCalculator)
         binder.bind(SplitCalculator, to=SplitCalculator)
         binder.bind(PaymentRepository, to=PaymentRepository)
-        binder.bind(OutboxRepository, to=OutboxRepository)
-        binder.bind(IdempotencyRepository, to=IdempotencyRepository)
+        binder.bind(LedgerSelector, to=LedgerSelector)
+        binder.bind(RevenueSelector, to=RevenueSelector)
+        binder.bind(RollupRepository, to=RollupRepository(time_zone=settings.ROLLUP_TIME_ZONE))
+        binder.bind(RecipientBalanceRepository, to=RecipientBalanceRepository)
+        binder.bind(PartitionRepository, to=PartitionRepository)
+        binder.bind(CaptureRepository, to=CaptureRepository(enabled=settings.PAYMENT_CAPTURE_SINGLE_STATEMENT))
+        binder.bind(OutboxPublisher, to=build_publisher(settings.OUTBOX_PUBLISHER, settings.OUTBOX_PUBLISHER_FILE))
+        binder.bind(OutboxRelayService, to=OutboxRelayService)
+        binder.bind(OutboxLeaseRepository, to=OutboxLeaseRepository)
+        binder.bind(
+            IdempotencyRepository,
+            to=IdempotencyRepository(
+                compact_responses=settings.IDEMPOTENCY_COMPACT_RESPONSES,
+                lock_timeout=settings.IDEMPOTENCY_WAIT_TIMEOUT_SECONDS,
+            ),
+        )
+        binder.bind(ReplayCache, to=self._replay_cache())
+        binder.bind(PayloadHasher, to=PayloadHasher(algorithm=settings.IDEMPOTENCY_HASH_ALGORITHM))
         binder.bind(IdempotencyService, to=IdempotencyService)
+        binder.bind(
+            InFlightRequests,
+            to=InFlightRequests(
+                enabled=settings.IDEMPOTENCY_COALESCING,
+                wait_timeout=settings.IDEMPOTENCY_WAIT_TIMEOUT_SECONDS,
+            ),
+        )
+        binder.bind(SplitTemplateRepository, to=SplitTemplateRepository)
+        binder.bind(SplitPlanCache, to=SplitPlanCache(ttl=settings.SPLIT_TEMPLATE_CACHE_SECONDS))
+        binder.bind(SplitTemplateService, to=SplitTemplateService)
         binder.bind(PaymentService, to=PaymentService)
+        binder.bind(PaymentSelector, to=PaymentSelector)
+        binder.bind(
+            PaymentDetailCache,
+            to=build_payment_detail_cache(
+                settings.PAYMENT_DETAIL_CACHE,
+                settings.PAYMENT_DETAIL_CACHE_ALIAS,
+                settings.PAYMENT_DETAIL_CACHE_SECONDS,
+            ),
+        )
+        binder.bind(PaymentQueryService, to=PaymentQueryService)
+        binder.bind(QuoteCache, to=QuoteCache(max_size=settings.QUOTE_CACHE_MAX_SIZE))
+        binder.bind(QuoteService, to=QuoteService)
+
+    @singleton
+    @provider
+    def provide_outbox_repository(self, relay_service: ProviderOf[OutboxRelayService]) -> OutboxRepository:
+        if not settings.OUTBOX_DISPATCH_ON_COMMIT:
+            return OutboxRepository(partitions=settings.OUTBOX_PARTITIONS)
+        # ProviderOf quebra o ciclo repository -> dispatcher -> relay service -> repository
+        dispatcher = OutboxDispatcher(
+            handler=lambda event_ids: relay_service.get().relay_ids(event_ids),
+            max_workers=settings.OUTBOX_DISPATCH_WORKERS,
+            max_pending=settings.OUTBOX_DISPATCH_MAX_PENDING,
+        )
+        return OutboxRepository(dispatcher=dispatcher, partitions=settings.OUTBOX_PARTITIONS)
+
+    @staticmethod
+    def _rates_loader() -> Optional[RatesLoader]:
+        if settings.PLATFORM_RATES_SOURCE == "db":
+            return PlatformRatesRepository()
+        if settings.PLATFORM_RATES_SOURCE == "file":
+            return FileRatesLoader(settings.PLATFORM_RATES_FILE)
+        return None
+
+    @staticmethod
+    def _replay_cache() -> ReplayCache:
+        if settings.IDEMPOTENCY_REPLAY_CACHE == "local":
+            return LocalReplayCache(
+                max_size=settings.IDEMPOTENCY_REPLAY_CACHE_MAX_SIZE,
+                ttl=settings.IDEMPOTENCY_REPLAY_CACHE_SECONDS,
+            )
+        if settings.IDEMPOTENCY_REPLAY_CACHE == "django":
+            return DjangoReplayCache(
+                alias=settings.IDEMPOTENCY_REPLAY_CACHE_ALIAS,
+                ttl=settings.IDEMPOTENCY_REPLAY_CACHE_SECONDS,
+            )
+        return ReplayCache()
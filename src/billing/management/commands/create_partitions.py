@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from src.billing.repositories.partition_repository import (
+    PARTITIONED_TABLES,
+    PartitionRepository,
+    add_months,
+    month_start,
+    partition_name,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Cria com antecedência as partições mensais de payments e ledger_entries (PostgreSQL). "
+        "Idempotente - pensado para rodar em cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months-ahead", type=int, default=settings.PARTITION_MONTHS_AHEAD)
+
+    def handle(self, *args, **options):
+        if options["months_ahead"] < 0:
+            raise CommandError("--months-ahead não pode ser negativo.")
+
+        repository = PartitionRepository()
+        if not repository.enabled:
+            self.stdout.write("Banco sem particionamento (SQLite): nada a fazer.")
+            return
+
+        current = month_start(timezone.now())
+        created = 0
+        for table in PARTITIONED_TABLES:
+            for offset in range(options["months_ahead"] + 1):
+                month = add_months(current, offset)
+                if repository.create_month(table, month):
+                    created += 1
+                    self.stdout.write(f"criada {partition_name(table, month)}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Partições prontas até {add_months(current, options['months_ahead']):%Y-%m}" f" ({created} novas)."
+            )
+        )
@@ -0,0 +1,58 @@
+from datetime import datetime, time, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone as django_timezone
+
+from src.billing.repositories.partition_repository import (
+    PARTITIONED_TABLES,
+    PartitionRepository,
+    add_months,
+    month_start,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Desanexa de payments/ledger_entries as partições mensais mais antigas que a retenção (PostgreSQL). "
+        "Elas ficam no banco como tabelas comuns ou, com --export-dir, viram CSV gzip e são apagadas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-months", type=int, default=settings.PARTITION_RETENTION_MONTHS)
+        parser.add_argument("--export-dir", type=Path, help="Exporta cada partição desanexada e apaga a tabela.")
+        parser.add_argument("--dry-run", action="store_true", help="Só lista o que seria desanexado.")
+
+    def handle(self, *args, **options):
+        if options["older_than_months"] < 1:
+            raise CommandError("--older-than-months deve ser pelo menos 1 (o mês corrente nunca sai).")
+        if options["export_dir"] is not None and not options["export_dir"].is_dir():
+            raise CommandError(f"Diretório inexistente: {options['export_dir']}")
+
+        repository = PartitionRepository()
+        if not repository.enabled:
+            self.stdout.write("Banco sem particionamento (SQLite): nada a fazer.")
+            return
+
+        cutoff_month = add_months(month_start(django_timezone.now()), -options["older_than_months"])
+        cutoff = datetime.combine(cutoff_month, time.min, tzinfo=timezone.utc)
+        detached = 0
+        for table in PARTITIONED_TABLES:
+            for partition in repository.list_partitions(table):
+                # DEFAULT (sem limite) nunca sai; a legacy sai quando todo o seu intervalo fica velho
+                if partition.upper_bound is None or partition.upper_bound > cutoff:
+                    continue
+                if options["dry_run"]:
+                    self.stdout.write(f"desanexaria {partition.name}")
+                    continue
+
+                repository.detach(partition)
+                detached += 1
+                if options["export_dir"] is not None:
+                    target = repository.export_and_drop(partition.name, options["export_dir"])
+                    self.stdout.write(f"{partition.name}: desanexada, exportada para {target} e apagada")
+                else:
+                    self.stdout.write(f"{partition.name}: desanexada (tabela mantida)")
+
+        self.stdout.write(self.style.SUCCESS(f"{detached} partições anteriores a {cutoff_month:%Y-%m} desanexadas."))
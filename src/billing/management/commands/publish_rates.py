@@ -0,0 +1,39 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from src.billing.rates import PlatformRates
+from src.billing.repositories.rates_repository import PlatformRatesRepository
+
+
+class Command(BaseCommand):
+    help = "Publica uma nova versão das taxas no banco (lida pelos workers com PLATFORM_RATES_SOURCE=db)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", type=Path, help="JSON no formato {'pix_rate', 'card': {...}}.")
+        parser.add_argument("--pix-rate")
+        parser.add_argument("--card-base")
+        parser.add_argument("--card-installment-base")
+        parser.add_argument("--card-installment-extra")
+
+    def handle(self, *args, **options):
+        data = json.loads(options["file"].read_text()) if options["file"] else {}
+        card = data.setdefault("card", {})
+
+        overrides = {
+            "base": options["card_base"],
+            "installment_base": options["card_installment_base"],
+            "installment_extra": options["card_installment_extra"],
+        }
+        card.update({name: value for name, value in overrides.items() if value is not None})
+        if options["pix_rate"] is not None:
+            data["pix_rate"] = options["pix_rate"]
+
+        try:
+            rates = PlatformRates.from_dict(data)
+        except ArithmeticError as exc:
+            raise CommandError(f"Taxa inválida: {exc}") from exc
+
+        row = PlatformRatesRepository().publish(rates)
+        self.stdout.write(self.style.SUCCESS(f"Taxas publicadas: versão {row.version}."))
@@ -0,0 +1,44 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from src.billing.repositories.balance_repository import RecipientBalanceRepository
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula recipient_balances a partir de ledger_entries, em blocos de recebedores processados "
+        "em paralelo (uma transação curta por bloco). Seguro com capturas acontecendo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500, help="Recebedores por bloco/transação.")
+        parser.add_argument("--workers", type=int, default=4, help="Blocos em paralelo (1 = na thread atual).")
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] <= 0 or options["workers"] <= 0:
+            raise CommandError("--chunk-size e --workers devem ser maiores que zero.")
+
+        repository = RecipientBalanceRepository()
+        chunks = repository.recipient_chunks(options["chunk_size"])
+        # SQLite serializa as escritas: threads só disputariam o lock
+        workers = 1 if connection.vendor == "sqlite" else options["workers"]
+        start = time.perf_counter()
+
+        if workers == 1:
+            total = sum(repository.rebuild(chunk) for chunk in chunks)
+        else:
+
+            def rebuild(chunk: list[str]) -> int:
+                try:
+                    return repository.rebuild(chunk)
+                finally:
+                    connection.close()  # conexão da thread do pool
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                total = sum(pool.map(rebuild, chunks))
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f"{total} saldos recalculados em {elapsed:.2f}s ({workers} workers)."))
@@ -0,0 +1,52 @@
+import signal
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from src.billing.repositories.rollup_repository import RollupRepository
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker dos rollups de receita: soma payments/ledger_entries novos (a partir do watermark) "
+        "nos rollups por hora e por dia. Vários processos podem rodar; cada janela é somada uma vez."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--poll-interval", type=float, default=settings.ROLLUP_POLL_SECONDS)
+        parser.add_argument("--settle-seconds", type=float, default=settings.ROLLUP_SETTLE_SECONDS)
+        parser.add_argument("--max-window-hours", type=float, default=settings.ROLLUP_MAX_WINDOW_HOURS)
+        parser.add_argument("--drain", action="store_true", help="Sai quando alcançar agora - settle.")
+
+    def handle(self, *args, **options):
+        if options["max_window_hours"] <= 0 or options["settle_seconds"] < 0:
+            raise CommandError("--max-window-hours deve ser maior que zero e --settle-seconds não negativo.")
+
+        repository = RollupRepository(time_zone=settings.ROLLUP_TIME_ZONE)
+        settle = timedelta(seconds=options["settle_seconds"])
+        max_window = timedelta(hours=options["max_window_hours"])
+
+        stop = threading.Event()
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: stop.set())
+
+        steps = 0
+        while not stop.is_set():
+            step = repository.advance(timezone.now() - settle, max_window)
+            if step is not None:
+                steps += 1
+                self.stdout.write(
+                    f"{step.start:%Y-%m-%d %H:%M:%S} -> {step.end:%Y-%m-%d %H:%M:%S}: "
+                    f"{step.payments} payments, {step.ledger_entries} ledger entries"
+                )
+                if step.end - step.start >= max_window:
+                    continue  # atrasado: próxima janela sem esperar
+            if options["drain"]:
+                break
+            stop.wait(options["poll_interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Rollups até {repository.watermark()} ({steps} janelas)."))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:00
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("billing", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlatformRateVersion",
+            fields=[
+                ("id", models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ("version", models.PositiveIntegerField(unique=True)),
+                ("pix_rate", models.DecimalField(decimal_places=4, max_digits=6)),
+                ("card_base", models.DecimalField(decimal_places=4, max_digits=6)),
+                ("card_installment_base", models.DecimalField(decimal_places=4, max_digits=6)),
+                ("card_installment_extra", models.DecimalField(decimal_places=4, max_digits=6)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "platform_rates",
+                "ordering": ["-version"],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:07
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("billing", "0002_platform_rates"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SplitTemplate",
+            fields=[
+                ("id", models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ("name", models.CharField(max_length=255)),
+                ("splits", models.JSONField()),
+                ("version", models.PositiveIntegerField(default=1)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "split_templates",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,80 @@
+from datetime import date, timezone
+
+from django.db import migrations
+from django.db.migrations.exceptions import IrreversibleError
+from django.utils import timezone as django_timezone
+
+TABLES = ("payments", "ledger_entries")
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_tables(apps, schema_editor):
+    """
+    PostgreSQL: transforma payments e ledger_entries em tabelas particionadas por mês de created_at.
+    A tabela atual vira a partição <tabela>_legacy (MINVALUE até o início do próximo mês), sem copiar
+    linhas; depois vêm as partições mensais seguintes e uma DEFAULT de segurança.
+    SQLite: nada muda.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    first_month = _add_months(django_timezone.now().astimezone(timezone.utc).date().replace(day=1), 1)
+    with schema_editor.connection.cursor() as cursor:
+        # PK/unique de tabela particionada precisam incluir created_at: não há mais FK para payments(id)
+        # nem unique global em payments.idempotency_key. A unicidade por chave fica na captura (claim em
+        # idempotency_records + lookup do payment já gravado); a 0009 alinha o model e o SQLite a isso
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = 'ledger_entries'::regclass AND contype = 'f'"
+        )
+        for (name,) in cursor.fetchall():
+            cursor.execute(f'ALTER TABLE "ledger_entries" DROP CONSTRAINT "{name}"')
+
+        for table in TABLES:
+            legacy = f"{table}_legacy"
+            cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{legacy}"')
+            cursor.execute(f'ALTER INDEX "{table}_pkey" RENAME TO "{legacy}_pkey"')
+            cursor.execute(
+                f'CREATE TABLE "{table}" (LIKE "{legacy}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+                f"PARTITION BY RANGE (created_at)"
+            )
+            cursor.execute(f'ALTER TABLE "{table}" ADD PRIMARY KEY (id, created_at)')
+            # A partição precisa da mesma PK da mãe: com a PK (id) antiga o ATTACH falha
+            # ("multiple primary keys"). Reconstruir o índice trava a legacy enquanto ele é montado
+            cursor.execute(f'ALTER TABLE "{legacy}" DROP CONSTRAINT "{legacy}_pkey"')
+            cursor.execute(f'ALTER TABLE "{legacy}" ADD CONSTRAINT "{legacy}_pkey" PRIMARY KEY (id, created_at)')
+            cursor.execute(
+                f'ALTER TABLE "{table}" ATTACH PARTITION "{legacy}" FOR VALUES FROM (MINVALUE) TO (%s)',
+                [f"{first_month.isoformat()} 00:00:00+00"],
+            )
+            for offset in range(MONTHS_AHEAD):
+                month = _add_months(first_month, offset)
+                cursor.execute(
+                    f'CREATE TABLE "{table}_p{month:%Y_%m}" PARTITION OF "{table}" FOR VALUES FROM (%s) TO (%s)',
+                    [f"{month.isoformat()} 00:00:00+00", f"{_add_months(month, 1).isoformat()} 00:00:00+00"],
+                )
+            cursor.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+
+        # Índices na tabela-mãe: o PostgreSQL reaproveita os equivalentes que a legacy já tem
+        cursor.execute('CREATE INDEX "payments_idempotency_key_idx" ON "payments" ("idempotency_key")')
+        cursor.execute('CREATE INDEX "ledger_entries_payment_id_idx" ON "ledger_entries" ("payment_id")')
+
+
+def unpartition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        raise IrreversibleError("Particionamento de payments/ledger_entries não é revertido automaticamente.")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("billing", "0004_uuid7_primary_keys"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_tables, unpartition_tables),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("billing", "0005_monthly_partitions"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ledgerentry",
+            index=models.Index(fields=["recipient_id", "created_at", "id"], name="ledger_recipient_created_idx"),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("billing", "0006_ledger_recipient_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecipientBalance",
+            fields=[
+                ("recipient_id", models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ("balance_cents", models.BigIntegerField(default=0)),
+                ("entries", models.PositiveBigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "recipient_balances",
+                "ordering": ["recipient_id"],
+            },
+        ),
+    ]
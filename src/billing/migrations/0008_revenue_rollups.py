@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:53
+
+import src.common.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("billing", "0007_recipient_balances"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LedgerRollup",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(default=src.common.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                ("granularity", models.CharField(choices=[("hour", "Hour"), ("day", "Day")], max_length=4)),
+                ("bucket_start", models.DateTimeField()),
+                ("role", models.CharField(max_length=50)),
+                ("entries", models.PositiveBigIntegerField(default=0)),
+                ("amount_cents", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "db_table": "ledger_rollups",
+                "ordering": ["granularity", "bucket_start"],
+            },
+        ),
+        migrations.CreateModel(
+            name="PaymentRollup",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(default=src.common.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                ("granularity", models.CharField(choices=[("hour", "Hour"), ("day", "Day")], max_length=4)),
+                ("bucket_start", models.DateTimeField()),
+                ("payment_method", models.CharField(choices=[("pix", "PIX"), ("card", "CARD")], max_length=10)),
+                ("installments", models.PositiveSmallIntegerField()),
+                ("payments", models.PositiveBigIntegerField(default=0)),
+                ("gross_cents", models.BigIntegerField(default=0)),
+                ("platform_fee_cents", models.BigIntegerField(default=0)),
+                ("net_cents", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "db_table": "payment_rollups",
+                "ordering": ["granularity", "bucket_start"],
+            },
+        ),
+        migrations.CreateModel(
+            name="RollupWatermark",
+            fields=[
+                ("name", models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ("processed_until", models.DateTimeField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "rollup_watermarks",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="ledgerentry",
+            index=models.Index(fields=["created_at"], name="ledger_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(fields=["created_at"], name="payments_created_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="ledgerrollup",
+            constraint=models.UniqueConstraint(
+                fields=("granularity", "bucket_start", "role"), name="ledger_rollups_bucket_uniq"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="paymentrollup",
+            constraint=models.UniqueConstraint(
+                fields=("granularity", "bucket_start", "payment_method", "installments"),
+                name="payment_rollups_bucket_uniq",
+            ),
+        ),
+    ]
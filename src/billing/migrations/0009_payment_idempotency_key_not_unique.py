@@ -0,0 +1,43 @@
+from django.db import migrations, models
+
+
+def drop_unique(apps, schema_editor):
+    """
+    Tira o UNIQUE de payments.idempotency_key nos dois bancos. No PostgreSQL a tabela-mãe particionada
+    já não tem (0005) e só resta o da payments_legacy; no SQLite a tabela é recriada com índice comum.
+    """
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass('payments_legacy') AND contype = 'u'"
+            )
+            for (name,) in cursor.fetchall():
+                cursor.execute(f'ALTER TABLE "payments_legacy" DROP CONSTRAINT "{name}"')
+        return
+
+    payment = apps.get_model("billing", "Payment")
+    old_field = payment._meta.get_field("idempotency_key")
+    new_field = models.CharField(max_length=255, db_index=True)
+    new_field.set_attributes_from_name("idempotency_key")
+    new_field.model = payment
+    schema_editor.alter_field(payment, old_field, new_field)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("billing", "0008_revenue_rollups"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(drop_unique, migrations.RunPython.noop)],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="payment",
+                    name="idempotency_key",
+                    field=models.CharField(db_index=True, max_length=255),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,65 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+PAYMENT_KEY_INDEX = models.Index(fields=["idempotency_key"], name="payments_idempotency_key_idx")
+LEDGER_PAYMENT_INDEX = models.Index(fields=["payment"], name="ledger_entries_payment_id_idx")
+
+
+def align_schema(apps, schema_editor):
+    """
+    Alinha o SQLite ao que o PostgreSQL já tem desde a 0005: ledger_entries.payment_id sem FK e os
+    índices de payments.idempotency_key e ledger_entries.payment_id com os nomes criados lá.
+    No PostgreSQL o banco já está assim - só o estado das migrations muda.
+    """
+    if schema_editor.connection.vendor == "postgresql":
+        return
+
+    payment = apps.get_model("billing", "Payment")
+    ledger_entry = apps.get_model("billing", "LedgerEntry")
+
+    new_key = models.CharField(max_length=255)
+    new_key.set_attributes_from_name("idempotency_key")
+    new_key.model = payment
+    schema_editor.alter_field(payment, payment._meta.get_field("idempotency_key"), new_key)
+    schema_editor.add_index(payment, PAYMENT_KEY_INDEX)
+
+    new_payment = models.ForeignKey(
+        payment, on_delete=models.CASCADE, related_name="ledger_entries", db_constraint=False, db_index=False
+    )
+    new_payment.set_attributes_from_name("payment")
+    new_payment.model = ledger_entry
+    schema_editor.alter_field(ledger_entry, ledger_entry._meta.get_field("payment"), new_payment)
+    schema_editor.add_index(ledger_entry, LEDGER_PAYMENT_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("billing", "0009_payment_idempotency_key_not_unique"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(align_schema, migrations.RunPython.noop)],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="payment",
+                    name="idempotency_key",
+                    field=models.CharField(max_length=255),
+                ),
+                migrations.AddIndex(model_name="payment", index=PAYMENT_KEY_INDEX),
+                migrations.AlterField(
+                    model_name="ledgerentry",
+                    name="payment",
+                    field=models.ForeignKey(
+                        db_constraint=False,
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ledger_entries",
+                        to="billing.payment",
+                    ),
+                ),
+                migrations.AddIndex(model_name="ledgerentry", index=LEDGER_PAYMENT_INDEX),
+            ],
+        ),
+    ]
@@ -20,19 +20,32 @@ class Payment(BaseModel):
     net_amount = models.DecimalField(max_digits=12, decimal_places=2)
     payment_method = models.CharField(max_length=10, choices=PaymentMethod)
     installments = models.PositiveSmallIntegerField(default=1)
-    idempotency_key = models.CharField(max_length=255, unique=True)
+    # Sem UNIQUE no banco: no PostgreSQL a tabela é particionada por created_at e não aceita unicidade
+    # global só da chave. Uma chave só cria um payment porque a captura grava o idempotency_records da
+    # chave na mesma transação e, com o registro já purgado, reaproveita o payment existente.
+    # O índice é o payments_idempotency_key_idx de Meta.indexes, o mesmo nome que a 0005 cria na tabela-mãe
+    idempotency_key = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         db_table = "payments"
         ordering = ["-created_at"]
+        indexes = [
+            # Janelas do worker de rollups (e partition pruning + range scan no PostgreSQL)
+            models.Index(fields=["created_at"], name="payments_created_idx"),
+            models.Index(fields=["idempotency_key"], name="payments_idempotency_key_idx"),
+        ]
 
     def __str__(self):
         return f"Payment {self.id} - {self.gross_amount} BRL"
 
 
 class LedgerEntry(BaseModel):
-    payment = models.ForeignKey(Payment, on_delete=models.CASCADE, related_name="ledger_entries")
+    # Sem FK no banco: no PostgreSQL a PK de payments é (id, created_at) e a 0005 tira a constraint.
+    # O CASCADE continua valendo pelo ORM; o índice é o ledger_entries_payment_id_idx de Meta.indexes
+    payment = models.ForeignKey(
+        Payment, on_delete=models.CASCADE, related_name="ledger_entries", db_constraint=False, db_index=False
+    )
     recipient_id = models.CharField(max_length=255)
     role = models.CharField(max_length=50)
     amount = models.DecimalField(max_digits=12, decimal_places=2)
@@ -41,6 +54,141 @@ class LedgerEntry(BaseModel):
     class Meta:
         db_table = "ledger_entries"
         ordering = ["-created_at"]
+        indexes = [
+            # Extrato do recebedor: filtro por recipient_id + keyset em (created_at, id)
+            models.Index(fields=["recipient_id", "created_at", "id"], name="ledger_recipient_created_idx"),
+            models.Index(fields=["created_at"], name="ledger_created_idx"),
+            models.Index(fields=["payment"], name="ledger_entries_payment_id_idx"),
+        ]
 
     def __str__(self):
         return f"Ledger {self.recipient_id} - {self.amount} BRL"
+
+
+class RecipientBalance(models.Model):
+    """
+    Saldo acumulado do recebedor (read model): soma dos ledger entries mantida na mesma transação
+    da captura. Ler o saldo é um lookup pela PK em vez de um SUM sobre todo o histórico.
+    Em centavos inteiros - a soma incremental no banco fica exata também no SQLite.
+    """
+
+    recipient_id = models.CharField(max_length=255, primary_key=True)
+    balance_cents = models.BigIntegerField(default=0)
+    entries = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "recipient_balances"
+        ordering = ["recipient_id"]
+
+    def __str__(self):
+        return f"Balance {self.recipient_id} - {self.balance_cents} cents"
+
+
+class RollupGranularity(models.TextChoices):
+    HOUR = "hour", "Hour"
+    DAY = "day", "Day"
+
+
+class PaymentRollup(BaseModel):
+    """
+    Totais de payments por bucket (hora UTC ou dia em ROLLUP_TIME_ZONE), método e parcelas.
+    Mantido em incrementos pelo worker rollup_revenue; valores em centavos inteiros.
+    """
+
+    granularity = models.CharField(max_length=4, choices=RollupGranularity)
+    bucket_start = models.DateTimeField()
+    payment_method = models.CharField(max_length=10, choices=PaymentMethod)
+    installments = models.PositiveSmallIntegerField()
+    payments = models.PositiveBigIntegerField(default=0)
+    gross_cents = models.BigIntegerField(default=0)
+    platform_fee_cents = models.BigIntegerField(default=0)
+    net_cents = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = "payment_rollups"
+        ordering = ["granularity", "bucket_start"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["granularity", "bucket_start", "payment_method", "installments"],
+                name="payment_rollups_bucket_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"PaymentRollup {self.granularity} {self.bucket_start} {self.payment_method} {self.installments}x"
+
+
+class LedgerRollup(BaseModel):
+    """Totais de ledger entries por bucket e papel (producer, affiliate, ...), em centavos."""
+
+    granularity = models.CharField(max_length=4, choices=RollupGranularity)
+    bucket_start = models.DateTimeField()
+    role = models.CharField(max_length=50)
+    entries = models.PositiveBigIntegerField(default=0)
+    amount_cents = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = "ledger_rollups"
+        ordering = ["granularity", "bucket_start"]
+        constraints = [
+            models.UniqueConstraint(fields=["granularity", "bucket_start", "role"], name="ledger_rollups_bucket_uniq"),
+        ]
+
+    def __str__(self):
+        return f"LedgerRollup {self.granularity} {self.bucket_start} {self.role}"
+
+
+class RollupWatermark(models.Model):
+    """Até onde (created_at, exclusivo) payments/ledger_entries já foram somados nos rollups."""
+
+    name = models.CharField(max_length=50, primary_key=True)
+    processed_until = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "rollup_watermarks"
+
+    def __str__(self):
+        return f"RollupWatermark {self.name} - {self.processed_until}"
+
+
+class PlatformRateVersion(BaseModel):
+    """
+    Versão publicada das taxas da plataforma. A de maior `version` é a vigente;
+    os workers detectam a troca sozinhos (ver RatesProvider), sem redeploy.
+    """
+
+    version = models.PositiveIntegerField(unique=True)
+    pix_rate = models.DecimalField(max_digits=6, decimal_places=4)
+    card_base = models.DecimalField(max_digits=6, decimal_places=4)
+    card_installment_base = models.DecimalField(max_digits=6, decimal_places=4)
+    card_installment_extra = models.DecimalField(max_digits=6, decimal_places=4)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "platform_rates"
+        ordering = ["-version"]
+
+    def __str__(self):
+        return f"PlatformRates v{self.version}"
+
+
+class SplitTemplate(BaseModel):
+    """
+    Layout de split reutilizável (produtor/afiliado/coprodutor), validado uma única vez na criação.
+    `splits` guarda [{"recipient_id", "role", "percent": "33.33"}]; `version` sobe a cada alteração.
+    """
+
+    name = models.CharField(max_length=255)
+    splits = models.JSONField()
+    version = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "split_templates"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"SplitTemplate {self.name} v{self.version}"
@@ -1,7 +1,17 @@
+import hashlib
+import json
+import logging
+import threading
+import time
 from dataclasses import dataclass
 from decimal import Decimal
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping, Optional, Protocol
 
-from src.billing.constants import PAYMENT_METHOD_PIX
+from src.billing.constants import MAX_INSTALLMENTS, MIN_INSTALLMENTS, PAYMENT_METHOD_CARD, PAYMENT_METHOD_PIX
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass(frozen=True)
@@ -15,11 +25,28 @@ class CardRates:
 
 @dataclass(frozen=True)
 class PlatformRates:
-    """Configuração central de taxas da plataforma. Essas configuraçoes poderiam esta na base de dados (POR ENQUANTO VOU DEIXAR AQUI MESMO)"""
+    """
+    Configuração central de taxas da plataforma (valores padrão).
+    Em produção pode ser substituída por uma versão vinda do banco ou de arquivo - ver RatesProvider.
+    """
 
     pix_rate: Decimal = Decimal("0")
     card: CardRates = CardRates()
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "PlatformRates":
+        """Monta a partir de {"pix_rate", "card": {"base", "installment_base", "installment_extra"}}."""
+        defaults = cls()
+        card = data.get("card", {})
+        return cls(
+            pix_rate=Decimal(str(data.get("pix_rate", defaults.pix_rate))),
+            card=CardRates(
+                base=Decimal(str(card.get("base", defaults.card.base))),
+                installment_base=Decimal(str(card.get("installment_base", defaults.card.installment_base))),
+                installment_extra=Decimal(str(card.get("installment_extra", defaults.card.installment_extra))),
+            ),
+        )
+
     def get_rate(self, payment_method: str, installments: int) -> Decimal:
         if payment_method == PAYMENT_METHOD_PIX:
             return self.pix_rate
@@ -29,3 +56,149 @@ class PlatformRates:
 
         extra_installments = installments - 1
         return self.card.installment_base + (self.card.installment_extra * extra_installments)
+
+
+@dataclass(frozen=True, eq=False)
+class RateTable:
+    """
+    Tabela de taxas compilada uma única vez a partir de PlatformRates: lookup O(1)
+    por (método, parcelas), imutável e versionada. Um cálculo que pegou esta tabela
+    termina nela, mesmo que uma versão nova seja publicada no meio do caminho.
+
+    content_hash identifica as taxas em si: um arquivo republicado com outras taxas e o
+    mesmo "version" gera outro hash, e é ele que os caches usam para invalidar.
+    """
+
+    version: int
+    content_hash: str
+    rates: Mapping[tuple[str, int], Decimal]
+    # Mesmas taxas como fração inteira (numerador, denominador) para a aritmética em centavos
+    ratios: Mapping[tuple[str, int], tuple[int, int]]
+    card_installment_rates: tuple[tuple[int, Decimal], ...]
+    source: PlatformRates
+
+    @classmethod
+    def compile(cls, platform_rates: PlatformRates, version: int = 0) -> "RateTable":
+        rates = {}
+        for installments in range(MIN_INSTALLMENTS, MAX_INSTALLMENTS + 1):
+            for payment_method in (PAYMENT_METHOD_PIX, PAYMENT_METHOD_CARD):
+                rates[(payment_method, installments)] = platform_rates.get_rate(payment_method, installments)
+
+        card_installment_rates = tuple(
+            (installments, rates[(PAYMENT_METHOD_CARD, installments)])
+            for installments in range(MIN_INSTALLMENTS, MAX_INSTALLMENTS + 1)
+        )
+        return cls(
+            version=version,
+            content_hash=cls._hash(rates),
+            rates=MappingProxyType(rates),
+            ratios=MappingProxyType({key: rate.as_integer_ratio() for key, rate in rates.items()}),
+            card_installment_rates=card_installment_rates,
+            source=platform_rates,
+        )
+
+    @staticmethod
+    def _hash(rates: Mapping[tuple[str, int], Decimal]) -> str:
+        """sha256 das taxas compiladas em forma canônica (Decimal normalizado, chaves ordenadas)."""
+        canonical = ";".join(
+            f"{method}:{installments}={rates[(method, installments)].normalize()}"
+            for method, installments in sorted(rates)
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get_rate(self, payment_method: str, installments: int) -> Decimal:
+        rate = self.rates.get((payment_method, installments))
+        if rate is None:
+            # Fora da faixa compilada (entrada inválida que ainda não passou pela validação)
+            return self.source.get_rate(payment_method, installments)
+        return rate
+
+    def get_rate_ratio(self, payment_method: str, installments: int) -> tuple[int, int]:
+        ratio = self.ratios.get((payment_method, installments))
+        if ratio is None:
+            return self.source.get_rate(payment_method, installments).as_integer_ratio()
+        return ratio
+
+
+class RatesLoader(Protocol):
+    def fingerprint(self) -> Optional[object]:
+        """Identificador barato da versão na fonte (None = fonte sem taxas publicadas)."""
+
+    def load(self) -> tuple[int, PlatformRates]:
+        """Carrega (versão, taxas) da fonte."""
+
+
+class FileRatesLoader:
+    """
+    Taxas em um arquivo JSON local: {"version": 2, "pix_rate": "0", "card": {...}}.
+    A mudança é detectada pelo mtime; sem "version" no arquivo, o mtime vira a versão.
+    """
+
+    def __init__(self, path: Path):
+        self._path = Path(path)
+
+    def fingerprint(self) -> Optional[object]:
+        try:
+            return self._path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def load(self) -> tuple[int, PlatformRates]:
+        data = json.loads(self._path.read_text())
+        version = int(data.get("version", self._path.stat().st_mtime_ns))
+        return version, PlatformRates.from_dict(data)
+
+
+class RatesProvider:
+    """
+    Guarda a RateTable vigente e troca por uma nova de forma atômica (troca de referência).
+
+    Com um loader configurado (banco ou arquivo), consulta a fonte no máximo a cada
+    reload_interval segundos e recompila só quando a versão muda - assim uma alteração
+    de taxa chega a todos os workers do gunicorn sem restart.
+    """
+
+    def __init__(
+        self,
+        defaults: Optional[PlatformRates] = None,
+        loader: Optional[RatesLoader] = None,
+        reload_interval: float = 30.0,
+    ):
+        self._table = RateTable.compile(defaults or PlatformRates())
+        self._loader = loader
+        self._reload_interval = reload_interval
+        self._fingerprint: Optional[object] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def current(self) -> RateTable:
+        if self._loader is not None and time.monotonic() >= self._next_check:
+            self.refresh()
+        return self._table
+
+    def refresh(self, force: bool = False) -> RateTable:
+        """Recarrega da fonte se a versão mudou. Sem force, não espera outra thread que já está recarregando."""
+        if self._loader is None or not self._lock.acquire(blocking=force):
+            return self._table
+
+        try:
+            self._next_check = time.monotonic() + self._reload_interval
+            fingerprint = self._loader.fingerprint()
+            if fingerprint is not None and (force or fingerprint != self._fingerprint):
+                version, rates = self._loader.load()
+                self.swap(RateTable.compile(rates, version))
+                self._fingerprint = fingerprint
+        except Exception:
+            # Fonte indisponível ou inválida: segue com a tabela atual
+            logger.exception("Falha ao recarregar taxas; mantendo a versão %s.", self._table.version)
+        finally:
+            self._lock.release()
+
+        return self._table
+
+    def swap(self, table: RateTable) -> None:
+        if table.version != self._table.version:
+            logger.info("Taxas atualizadas: versão %s -> %s.", self._table.version, table.version)
+        elif table.content_hash != self._table.content_hash:
+            logger.warning("Taxas alteradas sem mudar a versão (%s); caches serão invalidados.", table.version)
+        self._table = table
@@ -0,0 +1,120 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+from injector import singleton
+
+from src.billing.constants import LEDGER_WRITE_CHUNK_SIZE
+from src.billing.models import LedgerEntry, RecipientBalance
+from src.common.money import Money
+
+# recipient_id -> (centavos, quantidade de entries)
+BalanceTotals = dict[str, tuple[int, int]]
+
+
+def totals_for(entries: Iterable[LedgerEntry], totals: Optional[BalanceTotals] = None) -> BalanceTotals:
+    """
+    Agrega os entries por recebedor (somando em totals, se vier): o mesmo recebedor duas vezes
+    no lote vira uma linha só do upsert - o PostgreSQL recusa atualizar a mesma linha duas vezes.
+    """
+    totals = defaultdict(lambda: (0, 0), totals or {})
+    for entry in entries:
+        cents, count = totals[entry.recipient_id]
+        totals[entry.recipient_id] = (cents + Money.from_decimal(entry.amount).cents, count + 1)
+    return dict(totals)
+
+
+@singleton
+class RecipientBalanceRepository:
+    """
+    Read model recipient_balances. Cada captura soma seus entries com um único
+    INSERT ... ON CONFLICT DO UPDATE (PostgreSQL e SQLite), na transação que grava o ledger.
+    As linhas vão ordenadas por recipient_id: capturas concorrentes travam os saldos na mesma
+    ordem e não entram em deadlock.
+    """
+
+    @staticmethod
+    def upsert_sql(totals: BalanceTotals, now: datetime, replace: bool = False) -> tuple[str, list]:
+        """INSERT ... ON CONFLICT que soma (ou, com replace, substitui) saldo e contagem."""
+        qn = connection.ops.quote_name
+        updated_at = RecipientBalance._meta.get_field("updated_at").get_db_prep_save(now, connection)
+        params = []
+        for recipient_id in sorted(totals):
+            params += [recipient_id, *totals[recipient_id], updated_at]
+
+        table = qn(RecipientBalance._meta.db_table)
+        if replace:
+            assignments = "balance_cents = excluded.balance_cents, entries = excluded.entries"
+        else:
+            assignments = (
+                f"balance_cents = {table}.balance_cents + excluded.balance_cents, "
+                f"entries = {table}.entries + excluded.entries"
+            )
+        rows = ", ".join(["(%s, %s, %s, %s)"] * len(totals))
+        sql = (
+            f"INSERT INTO {table} (recipient_id, balance_cents, entries, updated_at) VALUES {rows} "
+            f"ON CONFLICT (recipient_id) DO UPDATE SET {assignments}, updated_at = excluded.updated_at"
+        )
+        return sql, params
+
+    @classmethod
+    def add(cls, totals: BalanceTotals) -> None:
+        if not totals:
+            return
+        now = timezone.now()
+        recipients = sorted(totals)
+        with connection.cursor() as cursor:
+            for start in range(0, len(recipients), LEDGER_WRITE_CHUNK_SIZE):
+                chunk = {r: totals[r] for r in recipients[start : start + LEDGER_WRITE_CHUNK_SIZE]}
+                cursor.execute(*cls.upsert_sql(chunk, now))
+
+    @staticmethod
+    def get(recipient_id: str) -> Optional[RecipientBalance]:
+        return RecipientBalance.objects.filter(recipient_id=recipient_id).first()
+
+    @staticmethod
+    def recipient_chunks(chunk_size: int) -> Iterator[list[str]]:
+        """Recebedores distintos do ledger, em blocos ordenados (keyset no índice de recipient_id)."""
+        last = ""
+        while True:
+            chunk = list(
+                LedgerEntry.objects.filter(recipient_id__gt=last)
+                .order_by("recipient_id")
+                .values_list("recipient_id", flat=True)
+                .distinct()[:chunk_size]
+            )
+            if not chunk:
+                return
+            yield chunk
+            last = chunk[-1]
+
+    @classmethod
+    def rebuild(cls, recipient_ids: list[str]) -> int:
+        """
+        Recalcula do ledger o saldo de um bloco de recebedores, sem perder capturas concorrentes:
+        primeiro um upsert que soma zero (cria as linhas que faltam e trava todas, no SQLite pega o
+        lock de escrita), e só então soma o ledger. Uma captura em voo termina antes (e entra na soma)
+        ou espera o lock e soma por cima do valor recalculado.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            placeholders = {recipient_id: (0, 0) for recipient_id in recipient_ids}
+            with connection.cursor() as cursor:
+                cursor.execute(*cls.upsert_sql(placeholders, now))
+
+            sums = (
+                LedgerEntry.objects.filter(recipient_id__in=recipient_ids)
+                .order_by()
+                .values("recipient_id")
+                .annotate(total=Sum("amount"), count=Count("id"))
+            )
+            totals = {**placeholders}
+            for row in sums:
+                totals[row["recipient_id"]] = (Money.from_decimal(row["total"]).cents, row["count"])
+
+            with connection.cursor() as cursor:
+                cursor.execute(*cls.upsert_sql(totals, now, replace=True))
+        return len(recipient_ids)
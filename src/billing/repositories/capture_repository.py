@@ -0,0 +1,87 @@
+from django.db import connection, models
+from injector import singleton
+
+from src.billing.constants import LEDGER_WRITE_CHUNK_SIZE
+from src.billing.models import LedgerEntry, Payment
+from src.billing.repositories.balance_repository import RecipientBalanceRepository, totals_for
+from src.idempotency.models import IdempotencyRecord
+from src.outbox.models import OutboxEvent
+
+
+@singleton
+class CaptureRepository:
+    """
+    Caminho rápido do PostgreSQL para a captura: payment, ledger entries, saldos dos recebedores,
+    evento do outbox e conclusão do registro de idempotência em um único statement (CTEs com INSERT
+    + UPDATE final), em vez de um round trip por tabela. As garantias são as do caminho ORM: roda
+    dentro da transação de PaymentService.process (a FK ledger -> payment saiu com o particionamento).
+    SQLite não aceita INSERT dentro de CTE - lá o PaymentService segue pelo ORM.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self._enabled = enabled
+
+    def supports(self, ledger_entries: int) -> bool:
+        # Splits enormes continuam no ORM, em blocos (limite de parâmetros por statement)
+        return self._enabled and connection.vendor == "postgresql" and ledger_entries <= LEDGER_WRITE_CHUNK_SIZE
+
+    def write(
+        self,
+        payment: Payment,
+        ledger_entries: list[LedgerEntry],
+        event: OutboxEvent,
+        record: IdempotencyRecord,
+        record_fields: list[str],
+    ) -> None:
+        sql, params = self.build_sql(payment, ledger_entries, event, record, record_fields)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    @classmethod
+    def build_sql(
+        cls,
+        payment: Payment,
+        ledger_entries: list[LedgerEntry],
+        event: OutboxEvent,
+        record: IdempotencyRecord,
+        record_fields: list[str],
+    ) -> tuple[str, list]:
+        ctes, params = [], []
+        for name, instances in (("payment", [payment]), ("ledger", ledger_entries), ("outbox", [event])):
+            if instances:
+                sql, values = cls._insert(instances)
+                ctes.append(f"{name} AS ({sql})")
+                params += values
+
+        if ledger_entries:
+            sql, values = RecipientBalanceRepository.upsert_sql(totals_for(ledger_entries), payment.created_at)
+            ctes.append(f"balances AS ({sql})")
+            params += values
+
+        sql, values = cls._update(record, record_fields)
+        return f"WITH {', '.join(ctes)} {sql}", params + values
+
+    @staticmethod
+    def _insert(instances: list[models.Model]) -> tuple[str, list]:
+        meta = instances[0]._meta
+        fields = meta.concrete_fields
+        qn = connection.ops.quote_name
+        params = [
+            # pre_save preenche auto_now_add (created_at) na própria instância, como o save() do ORM
+            field.get_db_prep_save(field.pre_save(instance, add=True), connection)
+            for instance in instances
+            for field in fields
+        ]
+        row = f"({', '.join(['%s'] * len(fields))})"
+        columns = ", ".join(qn(field.column) for field in fields)
+        return f"INSERT INTO {qn(meta.db_table)} ({columns}) VALUES {', '.join([row] * len(instances))}", params
+
+    @staticmethod
+    def _update(instance: models.Model, field_names: list[str]) -> tuple[str, list]:
+        meta = instance._meta
+        fields = [meta.get_field(name) for name in field_names]
+        qn = connection.ops.quote_name
+        assignments = ", ".join(f"{qn(field.column)} = %s" for field in fields)
+        params = [field.get_db_prep_save(getattr(instance, field.attname), connection) for field in fields]
+        params.append(meta.pk.get_db_prep_value(instance.pk, connection))
+        return f"UPDATE {qn(meta.db_table)} SET {assignments} WHERE {qn(meta.pk.column)} = %s", params
@@ -0,0 +1,143 @@
+import gzip
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, time, timezone
+from pathlib import Path
+from typing import Optional
+
+from django.db import connection, transaction
+from injector import singleton
+
+# Tabelas particionadas por mês de created_at (só PostgreSQL - ver migration billing 0005)
+PARTITIONED_TABLES = ("payments", "ledger_entries")
+
+_LOWER_BOUND = re.compile(r"FROM \('([^']+)'\)")
+_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+
+def month_start(value: datetime) -> date:
+    """Primeiro dia do mês (UTC) de um instante - os limites das partições são meses UTC."""
+    return value.astimezone(timezone.utc).date().replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def upper_bound(bound_expression: str) -> Optional[datetime]:
+    """Limite superior de "FOR VALUES FROM (...) TO ('...')"; None para DEFAULT ou MAXVALUE."""
+    match = _UPPER_BOUND.search(bound_expression)
+    return datetime.fromisoformat(match.group(1)) if match else None
+
+
+def lower_bound(bound_expression: str) -> Optional[datetime]:
+    """Limite inferior de "FOR VALUES FROM ('...') TO (...)"; None para DEFAULT ou MINVALUE."""
+    match = _LOWER_BOUND.search(bound_expression)
+    return datetime.fromisoformat(match.group(1)) if match else None
+
+
+@dataclass(frozen=True)
+class Partition:
+    table: str
+    name: str
+    upper_bound: Optional[datetime]
+    lower_bound: Optional[datetime] = None
+    default: bool = False
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        """Se a faixa da partição cruza [start, end). A DEFAULT não tem faixa."""
+        if self.default:
+            return False
+        return (self.lower_bound is None or self.lower_bound < end) and (
+            self.upper_bound is None or self.upper_bound > start
+        )
+
+
+@singleton
+class PartitionRepository:
+    """
+    DDL das partições mensais de payments/ledger_entries no PostgreSQL. No SQLite as tabelas não são
+    particionadas e enabled é False - os comandos viram no-op.
+    """
+
+    @property
+    def enabled(self) -> bool:
+        return connection.vendor == "postgresql"
+
+    def create_month(self, table: str, month: date) -> bool:
+        """
+        Cria a partição do mês se nenhuma partição de faixa já cobrir o mês (a do próprio mês ou a
+        <tabela>_legacy da migration 0005, que vai até o mês seguinte ao deploy). True se criou.
+        Se a DEFAULT já recebeu linhas desse mês (a partição não foi criada a tempo), elas são movidas
+        para a partição nova na mesma transação - senão o PostgreSQL recusa o CREATE.
+        """
+        name = partition_name(table, month)
+        default = f"{table}_default"
+        start = datetime.combine(month, time.min, tzinfo=timezone.utc)
+        end = datetime.combine(add_months(month, 1), time.min, tzinfo=timezone.utc)
+        bounds = [f"{month.isoformat()} 00:00:00+00", f"{add_months(month, 1).isoformat()} 00:00:00+00"]
+        qn = connection.ops.quote_name
+        in_range = "created_at >= %s AND created_at < %s"
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            if any(partition.overlaps(start, end) for partition in self.list_partitions(table)):
+                return False
+
+            cursor.execute("SELECT to_regclass(%s)", [default])
+            has_default = cursor.fetchone()[0]
+
+            stray = False
+            if has_default is not None:
+                cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {qn(default)} WHERE {in_range})", bounds)
+                stray = cursor.fetchone()[0]
+
+            if stray:
+                cursor.execute(f"ALTER TABLE {qn(table)} DETACH PARTITION {qn(default)}")
+            cursor.execute(f"CREATE TABLE {qn(name)} PARTITION OF {qn(table)} FOR VALUES FROM (%s) TO (%s)", bounds)
+            if stray:
+                cursor.execute(f"INSERT INTO {qn(name)} SELECT * FROM {qn(default)} WHERE {in_range}", bounds)
+                cursor.execute(f"DELETE FROM {qn(default)} WHERE {in_range}", bounds)
+                cursor.execute(f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(default)} DEFAULT")
+        return True
+
+    def list_partitions(self, table: str) -> list[Partition]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+                FROM pg_inherits
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE pg_inherits.inhparent = %s::regclass
+                ORDER BY child.relname
+                """,
+                [table],
+            )
+            return [
+                Partition(table, name, upper_bound(bound), lower_bound(bound), default=bound == "DEFAULT")
+                for name, bound in cursor.fetchall()
+            ]
+
+    def detach(self, partition: Partition) -> None:
+        """
+        Tira a partição da tabela-mãe; ela continua no banco como tabela comum (arquivo consultável).
+        Sem CONCURRENTLY: o PostgreSQL recusa quando existe partição DEFAULT (a 0005 sempre cria uma).
+        O DETACH pega ACCESS EXCLUSIVE na tabela-mãe e na partição, mas só troca catálogo (não lê
+        linhas): o bloqueio dura o tempo de esperar as transações em andamento na tabela terminarem.
+        """
+        qn = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {qn(partition.table)} DETACH PARTITION {qn(partition.name)}")
+
+    def export_and_drop(self, name: str, directory: Path) -> Path:
+        """Exporta uma partição já desanexada para CSV gzip (COPY) e apaga a tabela."""
+        target = Path(directory) / f"{name}.csv.gz"
+        qn = connection.ops.quote_name
+        with connection.cursor() as cursor, gzip.open(target, "wb") as file:
+            cursor.cursor.copy_expert(f"COPY {qn(name)} TO STDOUT WITH (FORMAT csv, HEADER)", file)
+            cursor.execute(f"DROP TABLE {qn(name)}")
+        return target
@@ -1,40 +1,102 @@
-from decimal import Decimal
+from itertools import islice
+from typing import Iterable, Iterator
 
+from django.db.models import Prefetch
 from injector import singleton
 
+from src.billing.constants import LEDGER_WRITE_CHUNK_SIZE
 from src.billing.models import LedgerEntry, Payment, PaymentStatus
+from src.billing.repositories.balance_repository import RecipientBalanceRepository, totals_for
+from src.common.money import Money
 
 
 @singleton
 class PaymentRepository:
+    @staticmethod
+    def build(
+        gross_amount: Money,
+        platform_fee_amount: Money,
+        net_amount: Money,
+        payment_method: str,
+        installments: int,
+        idempotency_key: str,
+    ) -> Payment:
+        """Monta o Payment sem persistir (o UUID já é gerado aqui) - usado pelo fluxo em lote."""
+        return Payment(
+            status=PaymentStatus.CAPTURED,
+            gross_amount=gross_amount.to_decimal(),
+            platform_fee_amount=platform_fee_amount.to_decimal(),
+            net_amount=net_amount.to_decimal(),
+            payment_method=payment_method,
+            installments=installments,
+            idempotency_key=idempotency_key,
+        )
+
     @staticmethod
     def create(
-        gross_amount: Decimal,
-        platform_fee_amount: Decimal,
-        net_amount: Decimal,
+        gross_amount: Money,
+        platform_fee_amount: Money,
+        net_amount: Money,
         payment_method: str,
         installments: int,
         idempotency_key: str,
     ) -> Payment:
         return Payment.objects.create(
             status=PaymentStatus.CAPTURED,
-            gross_amount=gross_amount,
-            platform_fee_amount=platform_fee_amount,
-            net_amount=net_amount,
+            gross_amount=gross_amount.to_decimal(),
+            platform_fee_amount=platform_fee_amount.to_decimal(),
+            net_amount=net_amount.to_decimal(),
             payment_method=payment_method,
             installments=installments,
             idempotency_key=idempotency_key,
         )
 
     @staticmethod
-    def create_ledger_entries(payment: Payment, receivables: list[dict]) -> list[LedgerEntry]:
-        entries = [
+    def get_by_idempotency_keys(keys: Iterable[str]) -> dict[str, Payment]:
+        """
+        Pagamentos já gravados com essas chaves, com os ledger entries na ordem de gravação.
+        Sem nenhum encontrado (o caso comum) é uma query só: o prefetch não roda.
+        """
+        entries = LedgerEntry.objects.order_by("created_at", "id")
+        payments = Payment.objects.filter(idempotency_key__in=list(keys)).prefetch_related(
+            Prefetch("ledger_entries", queryset=entries)
+        )
+        return {payment.idempotency_key: payment for payment in payments}
+
+    @staticmethod
+    def bulk_create(payments: list[Payment]) -> list[Payment]:
+        return Payment.objects.bulk_create(payments)
+
+    @staticmethod
+    def build_ledger_entries(payment: Payment, receivables: Iterable[dict]) -> Iterator[LedgerEntry]:
+        """Gera os LedgerEntry sob demanda - com milhares de recebedores não materializa tudo de uma vez."""
+        return (
             LedgerEntry(
                 payment=payment,
                 recipient_id=r["recipient_id"],
                 role=r["role"],
-                amount=r["amount"],
+                amount=r["amount"].to_decimal(),
             )
             for r in receivables
-        ]
-        return LedgerEntry.objects.bulk_create(entries)
+        )
+
+    @classmethod
+    def create_ledger_entries(cls, payment: Payment, receivables: list[dict]) -> int:
+        """
+        Grava os ledger entries em blocos de LEDGER_WRITE_CHUNK_SIZE e soma os valores em
+        recipient_balances com um upsert. Retorna quantos foram criados.
+        """
+        return cls.bulk_create_ledger_entries(cls.build_ledger_entries(payment, receivables))
+
+    @staticmethod
+    def bulk_create_ledger_entries(entries: Iterable[LedgerEntry]) -> int:
+        """Mesma gravação para vários pagamentos (lote): um upsert de saldos para o lote inteiro."""
+        created = 0
+        totals = {}
+        entries = iter(entries)
+        while chunk := list(islice(entries, LEDGER_WRITE_CHUNK_SIZE)):
+            LedgerEntry.objects.bulk_create(chunk)
+            totals = totals_for(chunk, totals)
+            created += len(chunk)
+        RecipientBalanceRepository.add(totals)
+        return created
@@ -0,0 +1,37 @@
+from typing import Optional
+
+from django.db.models import Max
+from injector import singleton
+
+from src.billing.models import PlatformRateVersion
+from src.billing.rates import CardRates, PlatformRates
+
+
+@singleton
+class PlatformRatesRepository:
+    """Taxas versionadas no banco. Também serve de loader para o RatesProvider."""
+
+    def fingerprint(self) -> Optional[object]:
+        return PlatformRateVersion.objects.aggregate(latest=Max("version"))["latest"]
+
+    def load(self) -> tuple[int, PlatformRates]:
+        row = PlatformRateVersion.objects.order_by("-version").first()
+        return row.version, PlatformRates(
+            pix_rate=row.pix_rate,
+            card=CardRates(
+                base=row.card_base,
+                installment_base=row.card_installment_base,
+                installment_extra=row.card_installment_extra,
+            ),
+        )
+
+    def publish(self, rates: PlatformRates) -> PlatformRateVersion:
+        """Publica uma nova versão (última + 1)."""
+        latest = self.fingerprint() or 0
+        return PlatformRateVersion.objects.create(
+            version=latest + 1,
+            pix_rate=rates.pix_rate,
+            card_base=rates.card.base,
+            card_installment_base=rates.card.installment_base,
+            card_installment_extra=rates.card.installment_extra,
+        )
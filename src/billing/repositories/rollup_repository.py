@@ -0,0 +1,204 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone
+from typing import Iterable, Optional
+from zoneinfo import ZoneInfo
+
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Count, Min, Sum
+from django.db.models.functions import TruncHour
+from injector import singleton
+
+from src.billing.models import (
+    LedgerEntry,
+    LedgerRollup,
+    Payment,
+    PaymentRollup,
+    RollupGranularity,
+    RollupWatermark,
+)
+from src.common.ids import uuid7
+from src.common.money import Money
+
+WATERMARK = "revenue"
+
+# Dimensões e somas (coluna do rollup -> campo da tabela bruta) de cada rollup
+PAYMENT_DIMENSIONS = ("payment_method", "installments")
+PAYMENT_SUMS = {"gross_cents": "gross_amount", "platform_fee_cents": "platform_fee_amount", "net_cents": "net_amount"}
+LEDGER_DIMENSIONS = ("role",)
+LEDGER_SUMS = {"amount_cents": "amount"}
+
+_UPSERT_CHUNK = 200
+
+
+@dataclass(frozen=True)
+class RollupStep:
+    start: datetime
+    end: datetime
+    payments: int
+    ledger_entries: int
+
+
+def _aggregate(queryset, dimensions: Iterable[str], sums: dict[str, str], count: str) -> list[dict]:
+    """GROUP BY dimensions com SUM em centavos inteiros e COUNT(*) (coluna count)."""
+    annotations = {column: Sum(field) for column, field in sums.items()}
+    rows = queryset.order_by().values(*dimensions).annotate(**annotations, **{count: Count("id")})
+    return [{**row, **{column: Money.from_decimal(row[column] or 0).cents for column in sums}} for row in rows]
+
+
+def merge_totals(rows: Iterable[dict], keys: tuple[str, ...], totals: Iterable[str]) -> list[dict]:
+    """Soma linhas com a mesma chave (ex.: horas do mesmo dia)."""
+    merged = defaultdict(lambda: dict.fromkeys(totals, 0))
+    for row in rows:
+        bucket = merged[tuple(row[key] for key in keys)]
+        for total in totals:
+            bucket[total] += row[total]
+    return [{**dict(zip(keys, key)), **values} for key, values in merged.items()]
+
+
+@singleton
+class RollupRepository:
+    """
+    Rollups por hora e por dia de payments (método x parcelas) e ledger_entries (papel).
+
+    advance() soma a janela [watermark, until) das tabelas brutas e aplica os totais com upserts
+    incrementais (INSERT ... ON CONFLICT DO UPDATE SET x = x + excluded.x), avançando o watermark
+    na mesma transação. O watermark avança por compare-and-set: se dois workers pegam a mesma
+    janela, só um grava e a janela nunca é somada duas vezes.
+    """
+
+    def __init__(self, time_zone: str = "UTC"):
+        self.time_zone = ZoneInfo(time_zone)
+
+    @staticmethod
+    def watermark() -> Optional[datetime]:
+        return RollupWatermark.objects.filter(name=WATERMARK).values_list("processed_until", flat=True).first()
+
+    def advance(self, until: datetime, max_window: timedelta) -> Optional[RollupStep]:
+        """Processa a próxima janela, até until e no máximo max_window. None se não havia o que fazer."""
+        start = self.watermark() or self._initial_watermark()
+        if start is None:
+            return None
+        end = min(until, start + max_window)
+        if end <= start:
+            return None
+
+        with transaction.atomic():
+            # Primeira escrita da transação: trava o watermark (no SQLite, o banco) antes de ler a janela
+            moved = RollupWatermark.objects.filter(name=WATERMARK, processed_until=start).update(processed_until=end)
+            if not moved:
+                return None  # outro worker levou a janela
+
+            hour = {"bucket_start": TruncHour("created_at", tzinfo=timezone.utc)}
+            window = {"created_at__gte": start, "created_at__lt": end}
+            payments = _aggregate(
+                Payment.objects.filter(**window).annotate(**hour),
+                ("bucket_start", *PAYMENT_DIMENSIONS),
+                PAYMENT_SUMS,
+                "payments",
+            )
+            ledger = _aggregate(
+                LedgerEntry.objects.filter(**window).annotate(**hour),
+                ("bucket_start", *LEDGER_DIMENSIONS),
+                LEDGER_SUMS,
+                "entries",
+            )
+
+            self._apply(PaymentRollup, payments, PAYMENT_DIMENSIONS, ("payments", *PAYMENT_SUMS))
+            self._apply(LedgerRollup, ledger, LEDGER_DIMENSIONS, ("entries", *LEDGER_SUMS))
+
+        return RollupStep(
+            start=start,
+            end=end,
+            payments=sum(row["payments"] for row in payments),
+            ledger_entries=sum(row["entries"] for row in ledger),
+        )
+
+    def day_start(self, value: datetime) -> datetime:
+        """Meia-noite (ROLLUP_TIME_ZONE) do dia de value."""
+        return datetime.combine(value.astimezone(self.time_zone).date(), time.min, tzinfo=self.time_zone)
+
+    @staticmethod
+    def raw_totals(start: datetime, end: datetime) -> tuple[list[dict], list[dict]]:
+        """Totais direto das tabelas brutas em [start, end) - usado só para o trecho após o watermark."""
+        window = {"created_at__gte": start, "created_at__lt": end}
+        return (
+            _aggregate(Payment.objects.filter(**window), PAYMENT_DIMENSIONS, PAYMENT_SUMS, "payments"),
+            _aggregate(LedgerEntry.objects.filter(**window), LEDGER_DIMENSIONS, LEDGER_SUMS, "entries"),
+        )
+
+    @staticmethod
+    def rollup_totals(granularity: str, start: datetime, end: datetime) -> tuple[list[dict], list[dict]]:
+        """Totais dos buckets de granularity com início em [start, end)."""
+        buckets = {"granularity": granularity, "bucket_start__gte": start, "bucket_start__lt": end}
+        payment_totals = {column: Sum(column) for column in ("payments", *PAYMENT_SUMS)}
+        ledger_totals = {column: Sum(column) for column in ("entries", *LEDGER_SUMS)}
+        return (
+            list(
+                PaymentRollup.objects.filter(**buckets)
+                .order_by()
+                .values(*PAYMENT_DIMENSIONS)
+                .annotate(**payment_totals)
+            ),
+            list(
+                LedgerRollup.objects.filter(**buckets).order_by().values(*LEDGER_DIMENSIONS).annotate(**ledger_totals)
+            ),
+        )
+
+    @staticmethod
+    def _initial_watermark() -> Optional[datetime]:
+        """Primeira execução: começa na hora do registro mais antigo. None se não há dados."""
+        oldest = [model.objects.aggregate(oldest=Min("created_at"))["oldest"] for model in (Payment, LedgerEntry)]
+        oldest = [value for value in oldest if value is not None]
+        if not oldest:
+            return None
+
+        start = min(oldest).astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        try:
+            with transaction.atomic():
+                RollupWatermark.objects.create(name=WATERMARK, processed_until=start)
+        except IntegrityError:
+            return RollupRepository.watermark()  # outro worker criou primeiro
+        return start
+
+    def _apply(
+        self, model: type[models.Model], hourly: list[dict], dimensions: tuple[str, ...], totals: tuple[str, ...]
+    ) -> None:
+        daily = merge_totals(
+            ({**row, "bucket_start": self.day_start(row["bucket_start"])} for row in hourly),
+            ("bucket_start", *dimensions),
+            totals,
+        )
+        for granularity, rows in ((RollupGranularity.HOUR, hourly), (RollupGranularity.DAY, daily)):
+            rows = sorted(rows, key=lambda row: (row["bucket_start"], *(row[d] for d in dimensions)))
+            for offset in range(0, len(rows), _UPSERT_CHUNK):
+                self._upsert(model, granularity, rows[offset : offset + _UPSERT_CHUNK], dimensions, totals)
+
+    @staticmethod
+    def _upsert(
+        model: type[models.Model],
+        granularity: str,
+        rows: list[dict],
+        dimensions: tuple[str, ...],
+        totals: tuple[str, ...],
+    ) -> None:
+        meta = model._meta
+        qn = connection.ops.quote_name
+        table = qn(meta.db_table)
+        keys = ("granularity", "bucket_start", *dimensions)
+        columns = ("id", *keys, *totals)
+        fields = [meta.get_field(column) for column in columns]
+
+        params = []
+        for row in rows:
+            values = {"id": uuid7(), "granularity": granularity, **row}
+            params += [field.get_db_prep_save(values[field.name], connection) for field in fields]
+
+        assignments = ", ".join(f"{qn(total)} = {table}.{qn(total)} + excluded.{qn(total)}" for total in totals)
+        placeholders = ", ".join([f"({', '.join(['%s'] * len(columns))})"] * len(rows))
+        sql = (
+            f"INSERT INTO {table} ({', '.join(qn(c) for c in columns)}) VALUES {placeholders} "
+            f"ON CONFLICT ({', '.join(qn(k) for k in keys)}) DO UPDATE SET {assignments}"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
@@ -0,0 +1,32 @@
+from typing import Iterable, Optional
+
+from django.db.models import F
+from injector import singleton
+
+from src.billing.models import SplitTemplate
+
+
+@singleton
+class SplitTemplateRepository:
+    @staticmethod
+    def get(template_id: str) -> Optional[SplitTemplate]:
+        return SplitTemplate.objects.filter(id=template_id).first()
+
+    @staticmethod
+    def versions(template_ids: Iterable[str]) -> dict[str, int]:
+        """Versão atual de cada template (só a coluna version, pela PK). Ids inexistentes ficam de fora."""
+        rows = SplitTemplate.objects.filter(id__in=list(template_ids)).values_list("id", "version")
+        return {str(template_id): version for template_id, version in rows}
+
+    @staticmethod
+    def create(name: str, splits: list[dict]) -> SplitTemplate:
+        return SplitTemplate.objects.create(name=name, splits=splits)
+
+    @staticmethod
+    def update(template: SplitTemplate, name: str, splits: list[dict]) -> SplitTemplate:
+        template.name = name
+        template.splits = splits
+        template.version = F("version") + 1
+        template.save(update_fields=["name", "splits", "version", "updated_at"])
+        template.refresh_from_db(fields=["version"])
+        return template
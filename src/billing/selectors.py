@@ -0,0 +1,162 @@
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from itertools import chain
+from typing import Optional
+from uuid import UUID
+
+from django.db.models import Prefetch, Q
+from injector import inject, singleton
+
+from src.billing.models import LedgerEntry, Payment, RecipientBalance, RollupGranularity
+from src.billing.repositories.rollup_repository import (
+    LEDGER_DIMENSIONS,
+    LEDGER_SUMS,
+    PAYMENT_DIMENSIONS,
+    PAYMENT_SUMS,
+    RollupRepository,
+    merge_totals,
+)
+from src.common.exceptions import BusinessValidationError
+from src.common.money import Money
+
+
+def encode_cursor(created_at: datetime, entry_id: UUID) -> str:
+    """Cursor opaco (base64 url-safe) com a posição do último item da página: (created_at, id)."""
+    raw = f"{created_at.isoformat()}|{entry_id.hex}".encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, entry_id = raw.split("|")
+        position = datetime.fromisoformat(created_at), UUID(entry_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise BusinessValidationError({"cursor": ["Cursor inválido."]})
+    if position[0].tzinfo is None:
+        raise BusinessValidationError({"cursor": ["Cursor inválido."]})
+    return position
+
+
+@dataclass(frozen=True)
+class LedgerPage:
+    entries: list[dict]
+    next_cursor: Optional[str]
+
+
+@singleton
+class PaymentSelector:
+    @staticmethod
+    def payment_detail(payment_id: UUID) -> Optional[Payment]:
+        """Payment + ledger entries em duas queries fixas (PK + prefetch por payment_id), qualquer que seja o split."""
+        entries = LedgerEntry.objects.order_by("created_at", "id").only(
+            "id", "payment_id", "recipient_id", "role", "amount", "created_at"
+        )
+        return (
+            Payment.objects.prefetch_related(Prefetch("ledger_entries", queryset=entries)).filter(id=payment_id).first()
+        )
+
+
+@singleton
+class LedgerSelector:
+    """
+    Consultas de leitura do ledger (sem regra de negócio, sem escrita).
+
+    O extrato do recebedor é paginado por keyset, do mais novo para o mais antigo: cada página
+    continua a partir do (created_at, id) do último item da anterior, direto no índice
+    ledger_recipient_created_idx. O custo da página não cresce com a profundidade, ao contrário
+    do OFFSET, que lê e descarta todas as linhas anteriores.
+    """
+
+    FIELDS = ("id", "payment_id", "role", "amount", "created_at")
+
+    def recipient_statement(self, recipient_id: str, limit: int, cursor: Optional[str] = None) -> LedgerPage:
+        queryset = LedgerEntry.objects.filter(recipient_id=recipient_id)
+        if cursor is not None:
+            created_at, entry_id = decode_cursor(cursor)
+            # O created_at__lte redundante vira limite do range scan no índice; o OR só desempata
+            queryset = queryset.filter(created_at__lte=created_at).filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=entry_id)
+            )
+
+        # Um item a mais diz se existe próxima página sem precisar de COUNT
+        rows = list(queryset.order_by("-created_at", "-id").values(*self.FIELDS)[: limit + 1])
+        if len(rows) <= limit:
+            return LedgerPage(entries=rows, next_cursor=None)
+
+        rows = rows[:limit]
+        return LedgerPage(entries=rows, next_cursor=encode_cursor(rows[-1]["created_at"], rows[-1]["id"]))
+
+    def recipient_balance(self, recipient_id: str) -> dict:
+        """Saldo do read model recipient_balances: um lookup pela PK. Recebedor sem entries tem saldo zero."""
+        row = RecipientBalance.objects.filter(recipient_id=recipient_id).values("balance_cents", "entries").first()
+        row = row or {"balance_cents": 0, "entries": 0}
+        return {"recipient_id": recipient_id, "balance": Money(row["balance_cents"]), "entries": row["entries"]}
+
+
+@singleton
+class RevenueSelector:
+    """
+    Totais de receita (payments por método x parcelas, ledger por papel) de um intervalo
+    [start, end) alinhado à hora, sem varrer as tabelas brutas: dias inteiros saem do rollup
+    diário, as pontas do rollup por hora e só o trecho depois do watermark (a hora aberta, alguns
+    minutos) é somado direto de payments/ledger_entries.
+    """
+
+    @inject
+    def __init__(self, rollups: RollupRepository):
+        self._rollups = rollups
+
+    def totals(self, start: datetime, end: datetime) -> dict:
+        watermark = self._rollups.watermark()
+        parts = []
+        if watermark is not None and watermark > start:
+            # Buckets alinhados a [start, end): juntos cobrem exatamente [start, min(end, watermark))
+            parts += [self._rollups.rollup_totals(*segment) for segment in self._segments(start, end)]
+        tail_start = start if watermark is None else max(start, watermark)
+        if tail_start < end:
+            parts.append(self._rollups.raw_totals(tail_start, end))
+
+        payments = merge_totals(
+            chain.from_iterable(p for p, _ in parts), PAYMENT_DIMENSIONS, ("payments", *PAYMENT_SUMS)
+        )
+        ledger = merge_totals(chain.from_iterable(lg for _, lg in parts), LEDGER_DIMENSIONS, ("entries", *LEDGER_SUMS))
+        return {
+            "start": start,
+            "end": end,
+            "rolled_up_until": None if watermark is None else min(watermark, end),
+            "payments": [
+                {
+                    "payment_method": row["payment_method"],
+                    "installments": row["installments"],
+                    "payments": row["payments"],
+                    "gross_amount": Money(row["gross_cents"]),
+                    "platform_fee_amount": Money(row["platform_fee_cents"]),
+                    "net_amount": Money(row["net_cents"]),
+                }
+                for row in sorted(payments, key=lambda row: (row["payment_method"], row["installments"]))
+            ],
+            "ledger": [
+                {"role": row["role"], "entries": row["entries"], "amount": Money(row["amount_cents"])}
+                for row in sorted(ledger, key=lambda row: row["role"])
+            ],
+        }
+
+    def _segments(self, start: datetime, end: datetime) -> list[tuple[str, datetime, datetime]]:
+        """Dias inteiros (fuso dos rollups) no meio, horas nas pontas."""
+        tz = self._rollups.time_zone
+
+        def midnight(day: date) -> datetime:
+            return datetime.combine(day, time.min, tzinfo=tz)
+
+        first_day = start.astimezone(tz).date()
+        first = midnight(first_day) if midnight(first_day) >= start else midnight(first_day + timedelta(days=1))
+        last = midnight(end.astimezone(tz).date())
+        if first >= last:
+            return [(RollupGranularity.HOUR, start, end)]
+
+        segments = [(RollupGranularity.DAY, first, last)]
+        segments += [(RollupGranularity.HOUR, a, b) for a, b in ((start, first), (last, end)) if a < b]
+        return segments
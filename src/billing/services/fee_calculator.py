@@ -1,9 +1,10 @@
-from decimal import ROUND_HALF_UP, Decimal
+from typing import Optional
 
 from injector import inject, singleton
 
-from src.billing.rates import PlatformRates
-from src.common.constants import DECIMAL_PRECISION, ZERO
+from src.billing.constants import PAYMENT_METHOD_CARD
+from src.billing.rates import RatesProvider, RateTable
+from src.common.money import ZERO, Money
 
 
 @singleton
@@ -11,20 +12,51 @@ class FeeCalculator:
     """Calcula a taxa da plataforma sobre o valor bruto."""
 
     @inject
-    def __init__(self, rates: PlatformRates):
+    def __init__(self, rates: RatesProvider):
         self._rates = rates
 
-    def calculate(self, gross_amount: Decimal, payment_method: str, installments: int) -> Decimal:
+    def current_table(self) -> RateTable:
+        """Tabela vigente - quem precisa de várias taxas consistentes entre si fixa uma e repassa."""
+        return self._rates.current()
+
+    def calculate(
+        self,
+        gross_amount: Money,
+        payment_method: str,
+        installments: int,
+        rate_table: Optional[RateTable] = None,
+    ) -> Money:
         """
         PIX: 0%
         CARD 1x: 3.99%
         CARD 2-12x: 4.99% + 2% por parcela extra (ex: 3x = 4.99% + 4% = 8.99%)
         Este valor pode ser alterado atraves do rates injetado no construtor
+        Aritmética inteira: gross * taxa arredondado para centavos com ROUND_HALF_UP.
         """
-        rate = self._rates.get_rate(payment_method, installments)
-
-        if rate == ZERO:
+        numerator, denominator = (rate_table or self._rates.current()).get_rate_ratio(payment_method, installments)
+        if numerator == 0:
             return ZERO
 
-        fee = gross_amount * rate
-        return fee.quantize(DECIMAL_PRECISION, rounding=ROUND_HALF_UP)
+        return gross_amount.scale(numerator, denominator)
+
+    def calculate_all_installments(self, gross_amount: Money) -> list[dict]:
+        """
+        Simulação de cartão para todas as opções de parcelamento em uma passada,
+        usando o vetor de taxas pré-compilado da RateTable vigente.
+        O valor da parcela é o bruto dividido igualmente (ROUND_HALF_UP), apenas para exibição.
+        """
+        table = self._rates.current()
+        options = []
+        for installments, rate in table.card_installment_rates:
+            numerator, denominator = table.get_rate_ratio(PAYMENT_METHOD_CARD, installments)
+            fee = gross_amount.scale(numerator, denominator) if numerator else ZERO
+            options.append(
+                {
+                    "installments": installments,
+                    "rate": rate,
+                    "platform_fee_amount": fee,
+                    "net_amount": gross_amount - fee,
+                    "installment_amount": gross_amount.scale(1, installments),
+                }
+            )
+        return options
@@ -0,0 +1,73 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from uuid import UUID
+
+from django.utils import timezone
+from injector import inject, singleton
+
+from src.billing.cache import PaymentDetailCache
+from src.billing.models import Payment
+from src.billing.selectors import PaymentSelector
+from src.common.exceptions import NotFoundError
+from src.common.money import Money
+
+
+@dataclass(frozen=True)
+class PaymentDetail:
+    etag: str
+    data: dict
+
+
+@singleton
+class PaymentQueryService:
+    """
+    Detalhe de pagamento com cache read-through: acerto no cache responde sem tocar o banco
+    (inclusive o 304 do If-None-Match); falta carrega do banco, calcula o ETag e guarda.
+
+    O ETag é forte: hash da representação JSON canônica - muda se qualquer byte da resposta mudar.
+    """
+
+    @inject
+    def __init__(self, selector: PaymentSelector, cache: PaymentDetailCache):
+        self._selector = selector
+        self._cache = cache
+
+    def get(self, payment_id: UUID) -> PaymentDetail:
+        entry = self._cache.get(payment_id)
+        if entry is None:
+            payment = self._selector.payment_detail(payment_id)
+            if payment is None:
+                raise NotFoundError("Pagamento não encontrado.")
+            data = self._represent(payment)
+            entry = {"etag": self.etag(data), "data": data}
+            self._cache.set(payment_id, entry)
+        return PaymentDetail(etag=entry["etag"], data=entry["data"])
+
+    @staticmethod
+    def etag(data: dict) -> str:
+        canonical = json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+        return f'"{hashlib.blake2b(canonical, digest_size=16).hexdigest()}"'
+
+    @staticmethod
+    def _represent(payment: Payment) -> dict:
+        return {
+            "payment_id": str(payment.id),
+            "status": payment.status,
+            "gross_amount": str(Money.from_decimal(payment.gross_amount)),
+            "platform_fee_amount": str(Money.from_decimal(payment.platform_fee_amount)),
+            "net_amount": str(Money.from_decimal(payment.net_amount)),
+            "payment_method": payment.payment_method,
+            "installments": payment.installments,
+            "created_at": timezone.localtime(payment.created_at).isoformat(),
+            "ledger_entries": [
+                {
+                    "id": str(entry.id),
+                    "recipient_id": entry.recipient_id,
+                    "role": entry.role,
+                    "amount": str(Money.from_decimal(entry.amount)),
+                    "created_at": timezone.localtime(entry.created_at).isoformat(),
+                }
+                for entry in payment.ledger_entries.all()
+            ],
+        }
@@ -1,29 +1,46 @@
+from dataclasses import dataclass
 from decimal import Decimal
+from itertools import chain
+from typing import Optional
 
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from injector import inject, singleton
 
 from src.billing.constants import (
-    EXPECTED_PERCENT_SUM,
     MAX_INSTALLMENTS,
-    MAX_PERCENT,
-    MAX_SPLITS,
     MIN_INSTALLMENTS,
-    MIN_PERCENT,
-    MIN_SPLITS,
     PAYMENT_CAPTURED_EVENT,
     PAYMENT_METHOD_CARD,
     PAYMENT_METHOD_PIX,
     SUPPORTED_CURRENCIES,
 )
+from src.billing.models import Payment
+from src.billing.rates import RateTable
+from src.billing.repositories.capture_repository import CaptureRepository
 from src.billing.repositories.payment_repository import PaymentRepository
 from src.billing.services.fee_calculator import FeeCalculator
 from src.billing.services.split_calculator import SplitCalculator
-from src.common.exceptions import BusinessValidationError, ConflictError
-from src.idempotency.services import IdempotencyService
+from src.billing.services.split_template_service import SplitPlan, SplitTemplateService
+from src.billing.validators import validate_splits
+from src.common.exceptions import BusinessValidationError, ConflictError, NotFoundError
+from src.common.money import Money
+from src.idempotency.coalescing import InFlightRequests
+from src.idempotency.services import IdempotencyResult, IdempotencyService
+from src.outbox.models import OutboxEvent
 from src.outbox.repositories.outbox_repository import OutboxRepository
 
 
+@dataclass(frozen=True)
+class _PendingWrite:
+    """Escritas de um item de process_many(); payment None = pagamento já gravado (só o registro)."""
+
+    index: int
+    completed: tuple[str, str, dict]  # (key, payload_hash, response_data) para save_completed_many
+    payment: Optional[Payment] = None
+    receivables: Optional[list[dict]] = None
+    event: Optional[OutboxEvent] = None
+
+
 @singleton
 class PaymentService:
     @inject
@@ -34,22 +51,31 @@ class PaymentService:
         payment_repository: PaymentRepository,
         outbox_repository: OutboxRepository,
         idempotency_service: IdempotencyService,
+        split_template_service: SplitTemplateService,
+        in_flight: InFlightRequests,
+        capture_repository: CaptureRepository,
     ):
         self._fee_calculator = fee_calculator
         self._split_calculator = split_calculator
         self._payment_repo = payment_repository
         self._outbox_repo = outbox_repository
         self._idempotency = idempotency_service
+        self._split_templates = split_template_service
+        self._in_flight = in_flight
+        self._capture_repo = capture_repository
 
-    def _validate(self, data: dict) -> None:
+    def _validate(self, data: dict, plan: Optional[SplitPlan] = None) -> tuple[Money, Optional[SplitPlan]]:
         """
         Validações de regra de negócio.
         Raises BusinessValidationError com dict de erros por campo.
+        Retorna o valor bruto já convertido para Money (evita converter de novo) e,
+        com split_template_id, o plano pré-compilado (validado na criação do template) -
+        o recebido em plan, se o chamador já resolveu, ou o vigente no banco.
         """
         errors = {}
 
-        amount = Decimal(str(data.get("amount", 0)))
-        if amount <= 0:
+        amount = Money.from_decimal(data.get("amount", 0))
+        if amount.cents <= 0:
             errors["amount"] = "O valor deve ser maior que zero."
 
         currency = data.get("currency", "")
@@ -66,35 +92,37 @@ class PaymentService:
             if installments < MIN_INSTALLMENTS or installments > MAX_INSTALLMENTS:
                 errors["installments"] = f"Cartão aceita entre {MIN_INSTALLMENTS} e {MAX_INSTALLMENTS} parcelas."
 
-        splits = data.get("splits", [])
-        if len(splits) < MIN_SPLITS or len(splits) > MAX_SPLITS:
-            errors["splits"] = f"Informe entre {MIN_SPLITS} e {MAX_SPLITS} recebedores."
+        if data.get("split_template_id"):
+            if plan is None:
+                try:
+                    plan = self._split_templates.get_plan(data["split_template_id"])
+                except NotFoundError as exc:
+                    errors["split_template_id"] = exc.message
         else:
-            for i, s in enumerate(splits):
-                percent = s.get("percent", 0)
-                if percent <= MIN_PERCENT or percent > MAX_PERCENT:
-                    errors[f"splits[{i}].percent"] = (
-                        f"Percentual deve ser entre {MIN_PERCENT} (exclusivo) e {MAX_PERCENT}."
-                    )
-
-            total_percent = sum(s.get("percent", 0) for s in splits)
-            if total_percent != EXPECTED_PERCENT_SUM:
-                errors["splits"] = f"A soma dos percentuais deve ser {EXPECTED_PERCENT_SUM}%. Atual: {total_percent}%."
+            plan = None
+            errors.update(validate_splits(data.get("splits", [])))
 
         if errors:
             raise BusinessValidationError(errors)
 
-    def calculate(self, data: dict) -> dict:
-        """Calcula taxas e split sem persistir - usado pelo endpoint /quote."""
-        self._validate(data)
+        return amount, plan
 
-        gross_amount = Decimal(str(data["amount"]))
+    def calculate(self, data: dict, rate_table: Optional[RateTable] = None, plan: Optional[SplitPlan] = None) -> dict:
+        """
+        Calcula taxas e split sem persistir - usado pelo endpoint /quote.
+        rate_table fixa a versão das taxas (ex.: um lote inteiro na mesma versão) e plan,
+        o plano do split_template_id já resolvido pelo chamador (lote, cotação).
+        """
+        gross_amount, plan = self._validate(data, plan)
         payment_method = data["payment_method"]
         installments = data.get("installments", 1)
 
-        fee = self._fee_calculator.calculate(gross_amount, payment_method, installments)
+        fee = self._fee_calculator.calculate(gross_amount, payment_method, installments, rate_table=rate_table)
         net_amount = gross_amount - fee
-        receivables = self._split_calculator.calculate(net_amount, data["splits"])
+        if plan is not None:
+            receivables = self._split_calculator.calculate_plan(net_amount, plan)
+        else:
+            receivables = self._split_calculator.calculate(net_amount, data["splits"])
 
         return {
             "gross_amount": gross_amount,
@@ -103,71 +131,335 @@ class PaymentService:
             "receivables": receivables,
         }
 
+    def simulate_installments(self, amount: Decimal) -> list[dict]:
+        """Tabela de taxas de cartão para todas as parcelas - usado pelo endpoint /installments."""
+        gross_amount = Money.from_decimal(amount)
+        if gross_amount.cents <= 0:
+            raise BusinessValidationError({"amount": "O valor deve ser maior que zero."})
+
+        return self._fee_calculator.calculate_all_installments(gross_amount)
+
     def process(self, data: dict, idempotency_key: str) -> dict:
         """
         Orquestra idempotência + cálculo + persistência + outbox
         em uma única transação.
+        Duplicatas concorrentes não recalculam: no mesmo processo esperam a resposta do líder
+        (InFlightRequests); entre processos esperam o lock da chave no claim. As duas esperas vão até
+        IDEMPOTENCY_WAIT_TIMEOUT_SECONDS e depois viram 409.
         """
-        payload_hash = IdempotencyService.hash_payload(data)
+        payload_hash = self._idempotency.hash_payload(data)
+
+        # Replay já concluído: responde do cache, sem transação nem lock
+        cached_response = self._idempotency.cached_replay(idempotency_key, payload_hash)
+        if cached_response is not None:
+            return cached_response
 
+        # Duplicatas concorrentes no mesmo processo esperam a resposta do líder
+        return self._in_flight.run(
+            idempotency_key, payload_hash, lambda: self._process_claimed(data, idempotency_key, payload_hash)
+        )
+
+    def _process_claimed(self, data: dict, idempotency_key: str, payload_hash: str) -> dict:
         with transaction.atomic():
             idempotency_result = self._idempotency.check(idempotency_key, payload_hash)
 
             if idempotency_result.is_conflict:
                 raise ConflictError("Idempotency-Key já utilizada com payload diferente.")
 
-            if idempotency_result.is_duplicate and idempotency_result.cached_response:
+            if not idempotency_result.is_duplicate:
+                return self._capture(data, idempotency_key, idempotency_result)
+
+            if idempotency_result.cached_response:
                 return idempotency_result.cached_response
 
-            result = self.calculate(data)
+        # O claim espera o commit do líder, que grava o registro já concluído; PROCESSING commitado
+        # só sobra de registros gravados fora da captura
+        raise ConflictError("Idempotency-Key em processamento.")
 
-            payment = self._payment_repo.create(
-                gross_amount=result["gross_amount"],
-                platform_fee_amount=result["platform_fee_amount"],
-                net_amount=result["net_amount"],
-                payment_method=data["payment_method"],
-                installments=data.get("installments", 1),
-                idempotency_key=idempotency_key,
-            )
+    def _capture(self, data: dict, idempotency_key: str, idempotency_result: IdempotencyResult) -> dict:
+        """Cálculo + persistência de uma chave recém-reservada. Chamado dentro da transação de process()."""
+        # Chave nova em idempotency_records não quer dizer chave nunca usada: o registro pode ter
+        # sido apagado pela retenção (purge_idempotency) e o pagamento continua lá
+        existing = self._payment_repo.get_by_idempotency_keys([idempotency_key]).get(idempotency_key)
+        if existing is not None:
+            response_data = self._rebuild_response(existing, data)
+            self._idempotency.save_response(idempotency_result.record, self._to_cache_data(response_data))
+            return response_data
 
-            self._payment_repo.create_ledger_entries(payment, result["receivables"])
+        result = self.calculate(data)
+        if self._capture_repo.supports(len(result["receivables"])):
+            return self._capture_single_statement(data, idempotency_key, idempotency_result, result)
 
-            self._outbox_repo.create(
-                event_type=PAYMENT_CAPTURED_EVENT,
-                payload={
-                    "payment_id": str(payment.id),
-                    "gross_amount": str(result["gross_amount"]),
-                    "net_amount": str(result["net_amount"]),
-                },
-            )
+        payment = self._payment_repo.create(
+            gross_amount=result["gross_amount"],
+            platform_fee_amount=result["platform_fee_amount"],
+            net_amount=result["net_amount"],
+            payment_method=data["payment_method"],
+            installments=data.get("installments", 1),
+            idempotency_key=idempotency_key,
+        )
+
+        self._payment_repo.create_ledger_entries(payment, result["receivables"])
+
+        self._outbox_repo.create(
+            event_type=PAYMENT_CAPTURED_EVENT,
+            payload=self._build_event_payload(payment, result),
+            partition_key=str(payment.id),
+        )
 
-            response_data = {
-                "payment_id": str(payment.id),
-                "status": payment.status,
-                "gross_amount": result["gross_amount"],
-                "platform_fee_amount": result["platform_fee_amount"],
-                "net_amount": result["net_amount"],
-                "receivables": result["receivables"],
-                "outbox_event": {
-                    "type": PAYMENT_CAPTURED_EVENT,
-                    "status": "pending",
-                },
-            }
-
-            # Cache serializado (Decimal -> str) para o JSONField
-            cache_data = {
-                "payment_id": str(payment.id),
-                "status": payment.status,
-                "gross_amount": str(result["gross_amount"]),
-                "platform_fee_amount": str(result["platform_fee_amount"]),
-                "net_amount": str(result["net_amount"]),
-                "receivables": [{**r, "amount": str(r["amount"])} for r in result["receivables"]],
-                "outbox_event": {
-                    "type": PAYMENT_CAPTURED_EVENT,
-                    "status": "pending",
-                },
-            }
-
-            self._idempotency.save_response(idempotency_result.record, cache_data)
+        response_data = self._build_response(payment, result)
+        cache_data = self._to_cache_data(response_data)
+
+        self._idempotency.save_response(idempotency_result.record, cache_data)
+
+        return response_data
+
+    def _capture_single_statement(
+        self, data: dict, idempotency_key: str, idempotency_result: IdempotencyResult, result: dict
+    ) -> dict:
+        """
+        Mesmas escritas de _capture(), montadas em memória e gravadas em um único round trip
+        (CaptureRepository, PostgreSQL): claim + busca da chave em payments + este statement por captura.
+        """
+        payment = self._payment_repo.build(
+            gross_amount=result["gross_amount"],
+            platform_fee_amount=result["platform_fee_amount"],
+            net_amount=result["net_amount"],
+            payment_method=data["payment_method"],
+            installments=data.get("installments", 1),
+            idempotency_key=idempotency_key,
+        )
+        ledger_entries = list(self._payment_repo.build_ledger_entries(payment, result["receivables"]))
+        event = self._outbox_repo.build(
+            PAYMENT_CAPTURED_EVENT, self._build_event_payload(payment, result), partition_key=str(payment.id)
+        )
+
+        response_data = self._build_response(payment, result)
+        record = idempotency_result.record
+        record_fields = self._idempotency.stage_response(record, self._to_cache_data(response_data))
+
+        self._capture_repo.write(payment, ledger_entries, event, record, record_fields)
+        self._outbox_repo.dispatch_on_commit([event])
 
         return response_data
+
+    def process_many(self, items: list[tuple[str, dict]]) -> list[dict]:
+        """
+        Versão em lote de process(): recebe (idempotency_key, data) por item e
+        devolve um resultado por item, na mesma ordem:
+        {"idempotency_key", "status_code", "response"} ou {"idempotency_key", "status_code", "errors"}.
+
+        Tudo em uma única transação: 1 SELECT FOR UPDATE para todas as chaves e
+        1 bulk_create por tabela (idempotency_records, payments, outbox_events; ledger_entries
+        em blocos de LEDGER_WRITE_CHUNK_SIZE).
+        Erros de validação/conflito ficam no item e não abortam o lote - inclusive a chave inserida
+        em paralelo por outra requisição, que vira 409 só no item que colidiu.
+        """
+        results: list[Optional[dict]] = [None] * len(items)
+        owners: dict[str, tuple[int, str]] = {}  # key -> (índice da 1ª ocorrência, payload_hash)
+        followers: list[tuple[int, int]] = []  # (índice repetido, índice do dono da chave)
+
+        for index, (key, data) in enumerate(items):
+            payload_hash = self._idempotency.hash_payload(data)
+            if key not in owners:
+                owners[key] = (index, payload_hash)
+            elif owners[key][1] == payload_hash:
+                followers.append((index, owners[key][0]))
+            else:
+                results[index] = self._item_error(
+                    key, 409, {"detail": "Idempotency-Key repetida no lote com payload diferente."}
+                )
+
+        # Replays já concluídos saem do cache; só o resto passa pelo SELECT FOR UPDATE
+        pending: dict[str, tuple[int, str]] = {}
+        for key, (index, payload_hash) in owners.items():
+            cached_response = self._idempotency.cached_replay(key, payload_hash)
+            if cached_response is not None:
+                results[index] = self._item_response(key, cached_response)
+            else:
+                pending[key] = (index, payload_hash)
+
+        if pending:
+            self._process_pending(items, pending, results)
+
+        for index, owner_index in followers:
+            results[index] = {**results[owner_index], "idempotency_key": items[index][0]}
+
+        return results
+
+    def _process_pending(
+        self, items: list[tuple[str, dict]], pending: dict[str, tuple[int, str]], results: list[Optional[dict]]
+    ) -> None:
+        """Parte transacional de process_many(): preenche results para as chaves que não vieram do cache."""
+        # O lote inteiro usa a mesma versão de taxas, mesmo que outra seja publicada no meio
+        rate_table = self._fee_calculator.current_table()
+        # ...e os planos de split vigentes, conferidos no banco com uma leitura só
+        template_ids = {items[index][1].get("split_template_id") for index, _ in pending.values()} - {None}
+        plans = self._split_templates.get_plans(template_ids) if template_ids else {}
+        writes: list[_PendingWrite] = []
+
+        with transaction.atomic():
+            checks = self._idempotency.check_many({key: payload_hash for key, (_, payload_hash) in pending.items()})
+            # Chaves sem registro que já têm pagamento (registro apagado pela retenção): uma query para o lote
+            fresh_keys = [key for key, check in checks.items() if not check.is_conflict and not check.is_duplicate]
+            existing = self._payment_repo.get_by_idempotency_keys(fresh_keys) if fresh_keys else {}
+
+            for key, (index, payload_hash) in pending.items():
+                check = checks[key]
+
+                if check.is_conflict:
+                    results[index] = self._item_error(
+                        key, 409, {"detail": "Idempotency-Key já utilizada com payload diferente."}
+                    )
+                    continue
+
+                if check.is_duplicate:
+                    if check.cached_response:
+                        results[index] = self._item_response(key, check.cached_response)
+                    else:
+                        results[index] = self._item_error(key, 409, {"detail": "Idempotency-Key em processamento."})
+                    continue
+
+                data = items[index][1]
+                if key in existing:
+                    try:
+                        response_data = self._rebuild_response(existing[key], data)
+                    except ConflictError as exc:
+                        results[index] = self._item_error(key, 409, {"detail": exc.message})
+                        continue
+                    writes.append(_PendingWrite(index, (key, payload_hash, self._to_cache_data(response_data))))
+                    results[index] = self._item_response(key, response_data)
+                    continue
+
+                try:
+                    plan = plans.get(str(data.get("split_template_id")))
+                    result = self.calculate(data, rate_table=rate_table, plan=plan)
+                except BusinessValidationError as exc:
+                    results[index] = self._item_error(key, 400, exc.errors)
+                    continue
+
+                payment = self._payment_repo.build(
+                    gross_amount=result["gross_amount"],
+                    platform_fee_amount=result["platform_fee_amount"],
+                    net_amount=result["net_amount"],
+                    payment_method=data["payment_method"],
+                    installments=data.get("installments", 1),
+                    idempotency_key=key,
+                )
+                event = self._outbox_repo.build(
+                    PAYMENT_CAPTURED_EVENT,
+                    self._build_event_payload(payment, result),
+                    partition_key=str(payment.id),
+                )
+
+                response_data = self._build_response(payment, result)
+                writes.append(
+                    _PendingWrite(
+                        index,
+                        (key, payload_hash, self._to_cache_data(response_data)),
+                        payment,
+                        result["receivables"],
+                        event,
+                    )
+                )
+                results[index] = self._item_response(key, response_data)
+
+            if not writes:
+                return
+            try:
+                # Savepoint: uma chave inserida em paralelo por outra requisição desfaz só a gravação em
+                # lote, e os itens são regravados um a um para isolar o que colidiu
+                with transaction.atomic():
+                    self._write_pending(writes)
+            except IntegrityError:
+                for write in writes:
+                    try:
+                        with transaction.atomic():
+                            self._write_pending([write])
+                    except IntegrityError:
+                        key = write.completed[0]
+                        results[write.index] = self._item_error(
+                            key, 409, {"detail": "Idempotency-Key em uso por requisição concorrente."}
+                        )
+
+    def _write_pending(self, writes: list[_PendingWrite]) -> None:
+        """Gravação em lote de _process_pending(): um INSERT por tabela (ledger em blocos)."""
+        # Idempotência primeiro: se outra requisição inseriu a mesma chave
+        # em paralelo, o unique estoura antes de gravar qualquer payment.
+        self._idempotency.save_completed_many([write.completed for write in writes])
+        captures = [write for write in writes if write.payment is not None]
+        if captures:
+            self._payment_repo.bulk_create([write.payment for write in captures])
+            self._payment_repo.bulk_create_ledger_entries(
+                chain.from_iterable(
+                    self._payment_repo.build_ledger_entries(write.payment, write.receivables) for write in captures
+                )
+            )
+            self._outbox_repo.bulk_create([write.event for write in captures])
+
+    def _rebuild_response(self, payment: Payment, data: dict) -> dict:
+        """
+        Resposta de um pagamento já gravado com a mesma Idempotency-Key, para quando o registro de
+        idempotência já saiu pela retenção. Sem o hash original, confere o que o pagamento guarda
+        do payload (valor, método e parcelas); se não bater é conflito, como no fluxo normal.
+        """
+        gross_amount = Money.from_decimal(payment.gross_amount)
+        if (
+            gross_amount.cents != Money.from_decimal(data.get("amount", 0)).cents
+            or payment.payment_method != data.get("payment_method")
+            or payment.installments != data.get("installments", 1)
+        ):
+            raise ConflictError("Idempotency-Key já utilizada com payload diferente.")
+
+        result = {
+            "gross_amount": gross_amount,
+            "platform_fee_amount": Money.from_decimal(payment.platform_fee_amount),
+            "net_amount": Money.from_decimal(payment.net_amount),
+            "receivables": [
+                {"recipient_id": entry.recipient_id, "role": entry.role, "amount": Money.from_decimal(entry.amount)}
+                for entry in payment.ledger_entries.all()
+            ],
+        }
+        return self._build_response(payment, result)
+
+    @staticmethod
+    def _build_event_payload(payment: Payment, result: dict) -> dict:
+        return {
+            "payment_id": str(payment.id),
+            "gross_amount": str(result["gross_amount"]),
+            "net_amount": str(result["net_amount"]),
+        }
+
+    @staticmethod
+    def _build_response(payment: Payment, result: dict) -> dict:
+        return {
+            "payment_id": str(payment.id),
+            "status": payment.status,
+            "gross_amount": result["gross_amount"],
+            "platform_fee_amount": result["platform_fee_amount"],
+            "net_amount": result["net_amount"],
+            "receivables": result["receivables"],
+            "outbox_event": {
+                "type": PAYMENT_CAPTURED_EVENT,
+                "status": "pending",
+            },
+        }
+
+    @staticmethod
+    def _to_cache_data(response_data: dict) -> dict:
+        """Cache serializado (Money -> str) para o JSONField."""
+        return {
+            **response_data,
+            "gross_amount": str(response_data["gross_amount"]),
+            "platform_fee_amount": str(response_data["platform_fee_amount"]),
+            "net_amount": str(response_data["net_amount"]),
+            "receivables": [{**r, "amount": str(r["amount"])} for r in response_data["receivables"]],
+        }
+
+    @staticmethod
+    def _item_response(key: str, response_data: dict) -> dict:
+        return {"idempotency_key": key, "status_code": 201, "response": response_data}
+
+    @staticmethod
+    def _item_error(key: str, status_code: int, errors: dict) -> dict:
+        return {"idempotency_key": key, "status_code": status_code, "errors": errors}
@@ -0,0 +1,148 @@
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+from injector import inject, singleton
+
+from src.billing.rates import RatesProvider
+from src.billing.services.payment_service import PaymentService
+from src.billing.services.split_calculator import SplitCalculator
+from src.billing.services.split_template_service import SplitPlan, SplitTemplateService
+from src.common.exceptions import NotFoundError
+from src.common.money import Money
+
+
+class QuoteCache:
+    """
+    Cache LRU em memória (por processo) e limitado por tamanho.
+
+    Guarda o content_hash da tabela de taxas com que as entradas foram calculadas:
+    quando as taxas mudam (mesmo sem mudar a versão), o cache inteiro é descartado
+    no próximo acesso.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self._max_size = max_size
+        self._entries: OrderedDict[Hashable, dict] = OrderedDict()
+        self._rates_token: Optional[Hashable] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, rates_token: Hashable) -> Optional[dict]:
+        with self._lock:
+            if rates_token != self._rates_token:
+                self._entries.clear()
+                self._rates_token = rates_token
+
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: dict, rates_token: Hashable) -> None:
+        with self._lock:
+            if rates_token != self._rates_token:
+                return
+
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "max_size": self._max_size,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+@singleton
+class QuoteService:
+    """
+    Cotação (taxa + split) sem persistir nada, com cache LRU na frente de
+    PaymentService.calculate. O resultado devolvido é compartilhado entre
+    requisições - não deve ser mutado.
+    """
+
+    @inject
+    def __init__(
+        self,
+        payment_service: PaymentService,
+        rates: RatesProvider,
+        cache: QuoteCache,
+        split_template_service: SplitTemplateService,
+    ):
+        self._payment_service = payment_service
+        self._rates = rates
+        self._cache = cache
+        self._split_templates = split_template_service
+
+    def quote(self, data: dict) -> dict:
+        plan = self._template_plan(data)
+        key = self._cache_key(data, plan)
+        rate_table = self._rates.current()
+
+        cached = self._cache.get(key, rate_table.content_hash)
+        if cached is not None:
+            return cached
+
+        # Erros de validação sobem normalmente e não são cacheados
+        result = self._payment_service.calculate(data, rate_table=rate_table, plan=plan)
+        self._cache.set(key, result, rate_table.content_hash)
+        return result
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+    def _template_plan(self, data: dict) -> Optional[SplitPlan]:
+        """
+        Plano do template resolvido uma vez por cotação, do cache do processo (sem ir ao banco
+        no hit). None sem template ou com template inexistente - calculate() devolve o erro.
+        """
+        if not data.get("split_template_id"):
+            return None
+        try:
+            return self._split_templates.cached_plan(data["split_template_id"])
+        except NotFoundError:
+            return None
+
+    @staticmethod
+    def _cache_key(data: dict, plan: Optional[SplitPlan]) -> tuple:
+        """
+        Chave normalizada em inteiros: Decimal("297"), Decimal("297.00") e 297 geram a mesma chave.
+        A ordem dos splits faz parte da chave porque define a ordem dos receivables.
+        Com template, entram o id e a versão do plano (alterar o template muda a chave).
+        """
+        if data.get("split_template_id"):
+            if plan is not None:
+                splits_key = ("template", plan.template_id, plan.version)
+            else:
+                # calculate() devolve o erro de validação; nada é cacheado
+                splits_key = ("template", str(data["split_template_id"]), None)
+        else:
+            splits_key = tuple(
+                (s.get("recipient_id"), s.get("role"), SplitCalculator.to_scaled_percent(s.get("percent", 0)))
+                for s in data.get("splits", [])
+            )
+
+        return (
+            Money.from_decimal(data.get("amount", 0)).cents,
+            str(data.get("currency", "")).upper(),
+            data.get("payment_method"),
+            data.get("installments", 1),
+            splits_key,
+        )
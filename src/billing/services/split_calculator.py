@@ -1,8 +1,21 @@
+import heapq
+from array import array
 from decimal import Decimal
+from typing import TYPE_CHECKING, Iterable, Sequence, Union
 
 from injector import singleton
 
-from src.common.constants import CENTS_MULTIPLIER, PERCENT_BASE
+from src.common.constants import PERCENT_SCALE, SCALED_PERCENT_BASE
+from src.common.money import Money
+
+if TYPE_CHECKING:
+    from src.billing.services.split_template_service import SplitPlan
+
+# Até aqui o split é alocado em listas simples; acima, arrays + heap (ver _allocate)
+SMALL_SPLIT_SIZE = 16
+
+# Decimal -> percentual em centésimos; os mesmos percentuais se repetem de captura em captura
+_SCALED_PERCENTS: dict[Decimal, int] = {}
 
 
 @singleton
@@ -13,51 +26,142 @@ class SplitCalculator:
     Trabalha em centavos (inteiros) para evitar imprecisão de ponto flutuante.
     A diferença entre o total e a soma das partes truncadas é distribuída
     1 centavo por vez, priorizando quem teve a maior perda fracionária.
+
+    As alocações ficam em arrays de inteiros (não em um dict por recebedor) e os
+    centavos que sobram são entregues com seleção parcial (heap): só os `leftover`
+    maiores restos são procurados, sem ordenar todos os recebedores - importante
+    para splits com milhares de recebedores.
     """
 
-    def calculate(self, net_amount: Decimal, splits: list[dict]) -> list[dict]:
-        total_cents = int(net_amount * CENTS_MULTIPLIER)
+    def calculate(self, net_amount: Money, splits: list[dict]) -> list[dict]:
+        """Retorna um receivable por split, na mesma ordem da entrada."""
+        to_scaled_percent = self.to_scaled_percent
+        scaled_percents = [to_scaled_percent(split["percent"]) for split in splits]
+
+        allocations = self._allocate(net_amount.cents, scaled_percents)
+
+        return self._to_result(((split["recipient_id"], split["role"]) for split in splits), allocations)
+
+    def calculate_plan(self, net_amount: Money, plan: "SplitPlan") -> list[dict]:
+        """Split a partir de um template pré-compilado: percentuais já inteiros, sem parsing por recebedor."""
+        allocations = self._allocate(net_amount.cents, plan.scaled_percents)
+
+        return self._to_result(plan.recipients, allocations)
+
+    def calculate_many(
+        self,
+        net_cents: Sequence[int],
+        split_offsets: Sequence[int],
+        scaled_percents: Sequence[int],
+    ) -> list[int]:
+        """
+        Versão em lote (colunar) para reprocessar splits de muitos pagamentos de uma vez.
+
+        Entrada em formato "ragged" (CSR): os percentuais do pagamento i estão em
+        scaled_percents[split_offsets[i]:split_offsets[i + 1]], em centésimos de ponto
+        percentual (ver to_scaled_percent). Retorna os centavos de cada recebedor,
+        alinhados com scaled_percents - o mesmo resultado de calculate() pagamento a pagamento.
 
-        allocations = self._compute_base_allocations(total_cents, splits)
-        self._distribute_leftover(total_cents, allocations)
+        Não é vetorizado: é um loop por pagamento em volta de _allocate. O ganho sobre calculate()
+        (~2.6x em bench_split_calculator) vem de pular Decimal, dicts e Money por recebedor. Pisos e
+        restos numa passada sobre os arrays planos ficaram mais lentos em Python puro, porque os
+        centavos que sobram ainda são entregues pagamento a pagamento.
+        """
+        if len(split_offsets) != len(net_cents) + 1:
+            raise ValueError("split_offsets deve ter len(net_cents) + 1 posições.")
 
-        return self._to_result(allocations)
+        result = []
 
-    def _compute_base_allocations(self, total_cents: int, splits: list[dict]) -> list[dict]:
-        """Calcula a parte base (floor) de cada recebedor e guarda o resto fracionário."""
-        return [self._allocate_one(total_cents, split) for split in splits]
+        for i, total_cents in enumerate(net_cents):
+            percents = scaled_percents[split_offsets[i] : split_offsets[i + 1]]
+            if sum(percents) != SCALED_PERCENT_BASE:
+                raise ValueError(f"Percentuais do pagamento {i} não somam 100%.")
+
+            result.extend(self._allocate(total_cents, percents))
+
+        return result
+
+    @classmethod
+    def _allocate(cls, total_cents: int, scaled_percents: Sequence[int]) -> Sequence[int]:
+        if len(scaled_percents) <= SMALL_SPLIT_SIZE:
+            return cls._allocate_small(total_cents, scaled_percents)
+
+        cents, remainders = cls._compute_base_allocations(total_cents, scaled_percents)
+        cls._distribute_leftover(total_cents, cents, remainders)
+        return cents
 
     @staticmethod
-    def _allocate_one(total_cents: int, split: dict) -> dict:
-        percent = Decimal(str(split["percent"]))
-        exact = total_cents * percent / PERCENT_BASE
-        floored = int(exact)
-
-        return {
-            "recipient_id": split["recipient_id"],
-            "role": split["role"],
-            "floored": floored,
-            "remainder": exact - floored,
-        }
+    def _allocate_small(total_cents: int, scaled_percents: Sequence[int]) -> list[int]:
+        """
+        Caminho da captura comum (poucos recebedores): listas simples e sort estável, que para
+        poucos itens custam menos que montar arrays e o heap. Mesmo resultado de _allocate.
+        """
+        cents = []
+        remainders = []
+        for percent in scaled_percents:
+            floored, remainder = divmod(total_cents * percent, SCALED_PERCENT_BASE)
+            cents.append(floored)
+            remainders.append(remainder)
+
+        leftover = total_cents - sum(cents)
+        if leftover > 0:
+            for i in sorted(range(len(remainders)), key=remainders.__getitem__, reverse=True)[:leftover]:
+                cents[i] += 1
+        return cents
 
     @staticmethod
-    def _distribute_leftover(total_cents: int, allocations: list[dict]) -> None:
-        """Distribui os centavos restantes para quem teve maior perda fracionária."""
-        distributed = sum(a["floored"] for a in allocations)
-        leftover = total_cents - distributed
+    def _compute_base_allocations(total_cents: int, scaled_percents: Sequence[int]) -> tuple[array, array]:
+        """
+        Calcula a parte base (floor) de cada recebedor e guarda o resto fracionário.
+        total * p / 10000 exato: quociente = floor, resto = numerador da parte fracionária.
+        """
+        cents = array("q")
+        remainders = array("q")
+        for percent in scaled_percents:
+            floored, remainder = divmod(total_cents * percent, SCALED_PERCENT_BASE)
+            cents.append(floored)
+            remainders.append(remainder)
+        return cents, remainders
 
-        allocations.sort(key=lambda a: a["remainder"], reverse=True)
+    @staticmethod
+    def _distribute_leftover(total_cents: int, cents: array, remainders: array) -> None:
+        """
+        Distribui os centavos restantes para quem teve maior perda fracionária.
+        nlargest equivale a sorted(..., reverse=True)[:n]: empates mantêm a ordem de entrada.
+        """
+        leftover = total_cents - sum(cents)
+        if leftover <= 0:
+            return
 
-        for i in range(leftover):
-            allocations[i]["floored"] += 1
+        for i in heapq.nlargest(leftover, range(len(remainders)), key=remainders.__getitem__):
+            cents[i] += 1
 
     @staticmethod
-    def _to_result(allocations: list[dict]) -> list[dict]:
+    def _to_result(recipients: Iterable[tuple[str, str]], allocations: Sequence[int]) -> list[dict]:
         return [
             {
-                "recipient_id": allocation["recipient_id"],
-                "role": allocation["role"],
-                "amount": Decimal(allocation["floored"]) / Decimal(str(CENTS_MULTIPLIER)),
+                "recipient_id": recipient_id,
+                "role": role,
+                "amount": Money(amount),
             }
-            for allocation in allocations
+            for (recipient_id, role), amount in zip(recipients, allocations)
         ]
+
+    @staticmethod
+    def to_scaled_percent(percent: Union[Decimal, int, str]) -> int:
+        """Converte um percentual com até 2 casas (ex.: 33.33) para inteiro em centésimos (3333)."""
+        if isinstance(percent, int):
+            return percent * PERCENT_SCALE
+
+        scaled = _SCALED_PERCENTS.get(percent)
+        if scaled is not None:
+            return scaled
+
+        numerator, denominator = (percent if isinstance(percent, Decimal) else Decimal(str(percent))).as_integer_ratio()
+        if PERCENT_SCALE % denominator:
+            raise ValueError(f"Percentual com mais de 2 casas decimais: {percent}.")
+        scaled = numerator * (PERCENT_SCALE // denominator)
+        if isinstance(percent, Decimal) and 0 < scaled <= SCALED_PERCENT_BASE:
+            # No máximo 10000 chaves: percentuais válidos têm 2 casas e ficam em (0, 100]
+            _SCALED_PERCENTS[percent] = scaled
+        return scaled
@@ -0,0 +1,140 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from injector import inject, singleton
+
+from src.billing.models import SplitTemplate
+from src.billing.repositories.split_template_repository import SplitTemplateRepository
+from src.billing.services.split_calculator import SplitCalculator
+from src.billing.validators import validate_splits
+from src.common.exceptions import BusinessValidationError, NotFoundError
+
+
+@dataclass(frozen=True, slots=True)
+class SplitPlan:
+    """Template pré-compilado: recebedores e percentuais já em inteiros (centésimos), prontos para o split."""
+
+    template_id: str
+    version: int
+    recipients: tuple[tuple[str, str], ...]  # (recipient_id, role)
+    scaled_percents: tuple[int, ...]
+
+
+class SplitPlanCache:
+    """
+    Cache por processo dos planos de split. Na captura, a entrada só é usada se a versão
+    bater com a do banco (ver SplitTemplateService.get_plan); o `ttl` só limita o atraso
+    das cotações, que usam o plano em cache sem conferir.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self._ttl = ttl
+        self._entries: dict[str, tuple[SplitPlan, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, template_id: str) -> Optional[SplitPlan]:
+        entry = self._entries.get(template_id)
+        if entry is None or entry[1] < time.monotonic():
+            return None
+        return entry[0]
+
+    def set(self, plan: SplitPlan) -> None:
+        with self._lock:
+            self._entries[plan.template_id] = (plan, time.monotonic() + self._ttl)
+
+    def invalidate(self, template_id: str) -> None:
+        with self._lock:
+            self._entries.pop(template_id, None)
+
+
+@singleton
+class SplitTemplateService:
+    """
+    Templates de split: validados uma vez na criação/alteração e compilados em SplitPlan.
+    A captura com split_template_id usa o plano em cache e pula a validação por split.
+
+    O cache é por processo e um PUT em outro worker não chega aqui: antes de capturar, a
+    versão do plano em cache é conferida com a do banco (uma leitura da coluna version pela
+    PK). Percentual antigo em captura é dinheiro errado; em cotação, só exibição.
+    """
+
+    @inject
+    def __init__(self, repository: SplitTemplateRepository, cache: SplitPlanCache):
+        self._repository = repository
+        self._cache = cache
+
+    def create(self, name: str, splits: list[dict]) -> SplitTemplate:
+        template = self._repository.create(name, self._validate(splits))
+        self._cache.set(self._compile(template))
+        return template
+
+    def update(self, template_id: str, name: str, splits: list[dict]) -> SplitTemplate:
+        template = self._get_or_raise(template_id)
+        self._cache.invalidate(str(template.id))
+        template = self._repository.update(template, name, self._validate(splits))
+        self._cache.set(self._compile(template))
+        return template
+
+    def get(self, template_id: str) -> SplitTemplate:
+        return self._get_or_raise(template_id)
+
+    def get_plan(self, template_id) -> SplitPlan:
+        """
+        Plano vigente para a captura. Com o plano em cache, confere só a versão no banco e
+        recompila se o template mudou (inclusive por outro worker).
+        Raises NotFoundError se o template não existe.
+        """
+        template_id = str(template_id)
+        plan = self._cache.get(template_id)
+        if plan is not None and self._repository.versions([template_id]).get(template_id) == plan.version:
+            return plan
+        return self._load(template_id)
+
+    def get_plans(self, template_ids) -> dict[str, SplitPlan]:
+        """Planos vigentes de um lote, com uma única leitura de versões. Ids inexistentes ficam de fora."""
+        template_ids = {str(template_id) for template_id in template_ids}
+        plans = {}
+        for template_id, version in self._repository.versions(template_ids).items():
+            plan = self._cache.get(template_id)
+            plans[template_id] = plan if plan is not None and plan.version == version else self._load(template_id)
+        return plans
+
+    def cached_plan(self, template_id) -> SplitPlan:
+        """
+        Plano para cotação: aceita o que estiver em cache sem conferir a versão (atraso de até
+        SPLIT_TEMPLATE_CACHE_SECONDS após um PUT em outro worker); só vai ao banco no miss.
+        Raises NotFoundError se o template não existe.
+        """
+        template_id = str(template_id)
+        return self._cache.get(template_id) or self._load(template_id)
+
+    def _load(self, template_id: str) -> SplitPlan:
+        plan = self._compile(self._get_or_raise(template_id))
+        self._cache.set(plan)
+        return plan
+
+    @staticmethod
+    def _validate(splits: list[dict]) -> list[dict]:
+        """Valida e normaliza para o formato gravado (percent como string com 2 casas)."""
+        errors = validate_splits(splits)
+        if errors:
+            raise BusinessValidationError(errors)
+
+        return [{"recipient_id": s["recipient_id"], "role": s["role"], "percent": str(s["percent"])} for s in splits]
+
+    def _get_or_raise(self, template_id) -> SplitTemplate:
+        template = self._repository.get(template_id)
+        if template is None:
+            raise NotFoundError("Template de split não encontrado.")
+        return template
+
+    @staticmethod
+    def _compile(template: SplitTemplate) -> SplitPlan:
+        return SplitPlan(
+            template_id=str(template.id),
+            version=template.version,
+            recipients=tuple((s["recipient_id"], s["role"]) for s in template.splits),
+            scaled_percents=tuple(SplitCalculator.to_scaled_percent(s["percent"]) for s in template.splits),
+        )
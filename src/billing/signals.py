@@ -0,0 +1,40 @@
+from uuid import UUID
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from src.billing.cache import PaymentDetailCache
+from src.billing.models import LedgerEntry, Payment
+
+
+def _invalidate_on_commit(payment_id: UUID) -> None:
+    # O mesmo cache que o PaymentQueryService recebe do injector da aplicação (BillingModule)
+    cache = apps.get_app_config("django_injector").injector.get(PaymentDetailCache)
+    # Só depois do commit: invalidar antes deixaria um GET concorrente recachear o estado antigo
+    transaction.on_commit(lambda: cache.invalidate([payment_id]), robust=True)
+
+
+@receiver(post_save, sender=Payment)
+def payment_saved(sender, instance: Payment, created: bool, **kwargs) -> None:
+    # Pagamento novo não está no cache (404 não é cacheado): a captura não paga a invalidação
+    if not created:
+        _invalidate_on_commit(instance.pk)
+
+
+@receiver(post_delete, sender=Payment)
+def payment_deleted(sender, instance: Payment, **kwargs) -> None:
+    _invalidate_on_commit(instance.pk)
+
+
+@receiver(post_save, sender=LedgerEntry)
+def ledger_entry_saved(sender, instance: LedgerEntry, created: bool, **kwargs) -> None:
+    # Entries nascem na captura, junto com o pagamento (ainda fora do cache), como em payment_saved
+    if not created:
+        _invalidate_on_commit(instance.payment_id)
+
+
+@receiver(post_delete, sender=LedgerEntry)
+def ledger_entry_deleted(sender, instance: LedgerEntry, **kwargs) -> None:
+    _invalidate_on_commit(instance.payment_id)
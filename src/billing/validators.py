@@ -0,0 +1,28 @@
+from django.conf import settings
+
+from src.billing.constants import EXPECTED_PERCENT_SUM, MAX_PERCENT, MIN_PERCENT, MIN_SPLITS
+
+
+def validate_splits(splits: list[dict]) -> dict:
+    """
+    Regras de negócio da lista de splits (quantidade, faixa e soma dos percentuais).
+    Compartilhada entre a captura e a criação de templates. Retorna dict de erros por campo.
+    """
+    errors = {}
+    max_splits = settings.MAX_SPLITS
+
+    if len(splits) < MIN_SPLITS or len(splits) > max_splits:
+        errors["splits"] = f"Informe entre {MIN_SPLITS} e {max_splits} recebedores."
+        return errors
+
+    total_percent = 0
+    for i, s in enumerate(splits):
+        percent = s.get("percent", 0)
+        if percent <= MIN_PERCENT or percent > MAX_PERCENT:
+            errors[f"splits[{i}].percent"] = f"Percentual deve ser entre {MIN_PERCENT} (exclusivo) e {MAX_PERCENT}."
+        total_percent += percent
+
+    if total_percent != EXPECTED_PERCENT_SUM:
+        errors["splits"] = f"A soma dos percentuais deve ser {EXPECTED_PERCENT_SUM}%. Atual: {total_percent}%."
+
+    return errors
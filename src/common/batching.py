@@ -0,0 +1,48 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+@dataclass(frozen=True)
+class BatchRun:
+    """Progresso de run_in_batches(): linhas processadas, lotes e segundos desde o início."""
+
+    rows: int
+    batches: int
+    elapsed: float
+
+    @property
+    def rate(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def run_in_batches(
+    process_batch: Callable[[int], int],
+    batch_size: int,
+    pause: float,
+    max_batches: Optional[int] = None,
+    on_batch: Optional[Callable[[int, BatchRun], None]] = None,
+) -> BatchRun:
+    """
+    Manutenção em lotes pequenos (purge, arquivamento): chama process_batch(batch_size), que processa
+    até batch_size linhas na sua própria transação curta e devolve quantas, até um lote vir incompleto
+    ou max_batches. Dorme pause segundos entre lotes para não disputar I/O e locks com o tráfego.
+    on_batch(linhas do lote, progresso) é chamado depois de cada lote, para o relatório de linhas/s.
+    """
+    rows = batches = 0
+    start = time.perf_counter()
+
+    while max_batches is None or batches < max_batches:
+        processed = process_batch(batch_size)
+        if not processed:
+            break
+        rows += processed
+        batches += 1
+
+        if on_batch is not None:
+            on_batch(processed, BatchRun(rows, batches, time.perf_counter() - start))
+        if processed < batch_size:
+            break
+        time.sleep(pause)
+
+    return BatchRun(rows, batches, time.perf_counter() - start)
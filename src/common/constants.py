@@ -1,7 +1,12 @@
 from decimal import Decimal
 
-# Precisão monetária - 2 casas decimais (centavos)
-DECIMAL_PRECISION = Decimal("0.01")
+# Valores monetários circulam como inteiros em centavos (ver src.common.money.Money).
+# Decimal só aparece nas bordas: serializers (entrada/saída HTTP) e ORM.
 CENTS_MULTIPLIER = 100
-PERCENT_BASE = Decimal("100")
-ZERO = Decimal("0.00")
+
+# Precisão monetária nas bordas - 2 casas decimais (centavos)
+DECIMAL_PRECISION = Decimal("0.01")
+
+# Percentual em centésimos (2 casas decimais) como inteiro: 33.33% -> 3333, 100% -> 10000
+PERCENT_SCALE = 100
+SCALED_PERCENT_BASE = 10000
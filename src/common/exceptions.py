@@ -13,3 +13,8 @@ class BusinessValidationError(DomainException):
 class ConflictError(DomainException):
     def __init__(self, message: str = "Conflito com recurso existente."):
         super().__init__(message)
+
+
+class NotFoundError(DomainException):
+    def __init__(self, message: str = "Recurso não encontrado."):
+        super().__init__(message)
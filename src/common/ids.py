@@ -0,0 +1,44 @@
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+_COUNTER_MAX = 0xFFF
+
+
+def uuid7() -> uuid.UUID:
+    """
+    UUID versão 7 (RFC 9562): 48 bits de timestamp Unix em ms + 74 bits aleatórios.
+    Ordenado pelo tempo: inserts caem no fim do B-tree da PK em vez de em uma página aleatória.
+
+    Dentro do mesmo ms, os 12 bits de rand_a viram um contador (método 1 da RFC), então ids gerados
+    no mesmo processo são estritamente crescentes; se o contador estourar, avança o timestamp em 1 ms.
+    """
+    global _last_ms, _counter
+
+    random = int.from_bytes(os.urandom(10), "big")
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # Começa em um valor aleatório da metade de baixo: sobra espaço para o contador
+            _counter = (random >> 64) & 0x7FF
+        else:
+            # Mesmo ms (ou relógio voltou): continua a sequência do último id
+            _counter += 1
+            if _counter > _COUNTER_MAX:
+                _last_ms += 1
+                _counter = 0
+        timestamp, counter = _last_ms, _counter
+
+    rand_b = random & ((1 << 62) - 1)
+    value = (timestamp << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | rand_b
+    return uuid.UUID(int=value)
+
+
+def uuid7_timestamp_ms(value: uuid.UUID) -> int:
+    """Instante de criação (ms Unix) embutido em um UUIDv7."""
+    return value.int >> 80
@@ -1,10 +1,11 @@
 from django.http import JsonResponse
 
-from src.common.exceptions import BusinessValidationError, ConflictError, DomainException
+from src.common.exceptions import BusinessValidationError, ConflictError, DomainException, NotFoundError
 
 DOMAIN_STATUS_MAP = {
     BusinessValidationError: 400,
     ConflictError: 409,
+    NotFoundError: 404,
 }
 
 DEFAULT_DOMAIN_STATUS = 400
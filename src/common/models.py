@@ -1,12 +1,15 @@
-import uuid
-
 from django.db import models
 
+from src.common.ids import uuid7
+
 
 class BaseModel(models.Model):
-    """Model base abstrato com UUID v4 como primary key."""
+    """
+    Model base abstrato com UUID v7 (ordenado pelo tempo) como primary key.
+    Linhas antigas continuam com UUID v4 - os dois convivem na mesma coluna.
+    """
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     class Meta:
         abstract = True
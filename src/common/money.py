@@ -0,0 +1,105 @@
+from decimal import ROUND_HALF_UP, Decimal
+from functools import total_ordering
+from typing import Union
+
+from src.common.constants import CENTS_MULTIPLIER, DECIMAL_PRECISION
+
+_set_cents = object.__setattr__
+
+
+@total_ordering
+class Money:
+    """
+    Valor monetário imutável em centavos inteiros.
+
+    Toda a aritmética do caminho de captura é feita em inteiros; a conversão
+    para Decimal acontece só nas bordas (from_decimal / to_decimal). str() devolve
+    o formato com 2 casas ("297.00"), aceito direto pelos DecimalField do DRF.
+    Comparação com Decimal/int é por valor: Money(29700) == Decimal("297.00").
+    """
+
+    __slots__ = ("cents",)
+
+    cents: int
+
+    def __init__(self, cents: int):
+        _set_cents(self, "cents", cents)
+
+    @classmethod
+    def from_decimal(cls, value: Union[Decimal, int, str]) -> "Money":
+        """Converte da borda (serializer/ORM), arredondando para centavos com ROUND_HALF_UP."""
+        if isinstance(value, int):
+            return cls(value * CENTS_MULTIPLIER)
+
+        amount = value if isinstance(value, Decimal) else Decimal(str(value))
+        # Caso comum (até 2 casas) sai da fração exata, sem quantize nem as_tuple()
+        numerator, denominator = amount.as_integer_ratio()
+        if CENTS_MULTIPLIER % denominator == 0:
+            return cls(numerator * (CENTS_MULTIPLIER // denominator))
+        return cls(int(amount.quantize(DECIMAL_PRECISION, rounding=ROUND_HALF_UP).scaleb(2)))
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.cents).scaleb(-2)
+
+    def scale(self, numerator: int, denominator: int) -> "Money":
+        """
+        Multiplica pela fração numerator/denominator com ROUND_HALF_UP
+        (empate arredonda para longe do zero, como o Decimal).
+        """
+        if self.cents >= 0:
+            return Money((2 * self.cents * numerator + denominator) // (2 * denominator))
+        return Money(-((2 * -self.cents * numerator + denominator) // (2 * denominator)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Money é imutável.")
+
+    def __add__(self, other: "Money") -> "Money":
+        if isinstance(other, Money):
+            return Money(self.cents + other.cents)
+        return NotImplemented
+
+    def __radd__(self, other) -> "Money":
+        # Suporta sum(): o valor inicial é o int 0
+        if other == 0:
+            return self
+        return NotImplemented
+
+    def __sub__(self, other: "Money") -> "Money":
+        if isinstance(other, Money):
+            return Money(self.cents - other.cents)
+        return NotImplemented
+
+    def __neg__(self) -> "Money":
+        return Money(-self.cents)
+
+    def __bool__(self) -> bool:
+        return self.cents != 0
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Money):
+            return self.cents == other.cents
+        if isinstance(other, (Decimal, int)):
+            return self.to_decimal() == other
+        return NotImplemented
+
+    def __lt__(self, other) -> bool:
+        if isinstance(other, Money):
+            return self.cents < other.cents
+        if isinstance(other, (Decimal, int)):
+            return self.to_decimal() < other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        # Consistente com __eq__ contra Decimal/int
+        return hash(self.to_decimal())
+
+    def __str__(self) -> str:
+        if self.cents >= 0:
+            return "%d.%02d" % divmod(self.cents, CENTS_MULTIPLIER)
+        return "-%d.%02d" % divmod(-self.cents, CENTS_MULTIPLIER)
+
+    def __repr__(self) -> str:
+        return f"Money('{self}')"
+
+
+ZERO = Money(0)
@@ -0,0 +1,103 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from django.core.cache import caches
+
+
+class ReplayCache:
+    """
+    Cache de respostas já concluídas, indexado por (key, payload_hash).
+
+    Fica na frente de idempotency_records: um replay que acerta o cache é
+    respondido sem transação e sem SELECT FOR UPDATE. Só recebe entradas depois
+    do commit (ver IdempotencyService), então nunca devolve uma resposta que
+    foi revertida. Chave com payload diferente nunca acerta - cai no banco,
+    que devolve o conflito.
+
+    Esta classe base é o cache desligado (IDEMPOTENCY_REPLAY_CACHE="none").
+    """
+
+    def get(self, key: str, payload_hash: str) -> Optional[dict]:
+        return None
+
+    def set(self, key: str, payload_hash: str, response_data: dict) -> None:
+        return None
+
+    def set_many(self, entries: list[tuple[str, str, dict]]) -> None:
+        for key, payload_hash, response_data in entries:
+            self.set(key, payload_hash, response_data)
+
+    def clear(self) -> None:
+        return None
+
+
+class LocalReplayCache(ReplayCache):
+    """LRU em memória (por processo), limitado por tamanho e com expiração."""
+
+    def __init__(self, max_size: int = 10000, ttl: float = 86400.0):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: OrderedDict[tuple[str, str], tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, payload_hash: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get((key, payload_hash))
+            if entry is None:
+                return None
+
+            expires_at, response_data = entry
+            if expires_at <= time.monotonic():
+                del self._entries[(key, payload_hash)]
+                return None
+
+            self._entries.move_to_end((key, payload_hash))
+            return response_data
+
+    def set(self, key: str, payload_hash: str, response_data: dict) -> None:
+        with self._lock:
+            self._entries[(key, payload_hash)] = (time.monotonic() + self._ttl, response_data)
+            self._entries.move_to_end((key, payload_hash))
+            if len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoReplayCache(ReplayCache):
+    """
+    Usa um backend de cache do Django (ex.: Redis/Memcached em CACHES) -
+    compartilhado entre workers, ao contrário do LocalReplayCache.
+    """
+
+    KEY_PREFIX = "idempotency"
+
+    def __init__(self, alias: str = "default", ttl: float = 86400.0):
+        self._alias = alias
+        self._ttl = ttl
+
+    @property
+    def _cache(self):
+        return caches[self._alias]
+
+    @classmethod
+    def _cache_key(cls, key: str, payload_hash: str) -> str:
+        # A Idempotency-Key vem do cliente: hash para caber nas restrições de chave do memcached
+        return f"{cls.KEY_PREFIX}:{hashlib.sha256(key.encode()).hexdigest()}:{payload_hash}"
+
+    def get(self, key: str, payload_hash: str) -> Optional[dict]:
+        return self._cache.get(self._cache_key(key, payload_hash))
+
+    def set(self, key: str, payload_hash: str, response_data: dict) -> None:
+        self._cache.set(self._cache_key(key, payload_hash), response_data, timeout=self._ttl)
+
+    def set_many(self, entries: list[tuple[str, str, dict]]) -> None:
+        self._cache.set_many(
+            {self._cache_key(key, payload_hash): response_data for key, payload_hash, response_data in entries},
+            timeout=self._ttl,
+        )
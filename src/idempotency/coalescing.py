@@ -0,0 +1,61 @@
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable
+
+from src.common.exceptions import ConflictError
+
+
+class InFlightRequests:
+    """
+    Coalescência de requisições duplicadas dentro do processo.
+
+    A primeira requisição de um (key, payload_hash) vira líder e executa; as que
+    chegam enquanto ela está em andamento esperam o mesmo Future (até wait_timeout)
+    e recebem a resposta - ou a exceção - do líder, sem abrir transação nem calcular nada.
+    Payload diferente não coalesce: segue o fluxo normal e o banco acusa o conflito.
+    """
+
+    def __init__(self, enabled: bool = True, wait_timeout: float = 5.0):
+        self.enabled = enabled
+        self.wait_timeout = wait_timeout
+        self._in_flight: dict[str, tuple[str, Future]] = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: str, payload_hash: str, compute: Callable[[], dict]) -> dict:
+        if not self.enabled:
+            return compute()
+
+        with self._lock:
+            entry = self._in_flight.get(key)
+            if entry is None:
+                future: Future = Future()
+                self._in_flight[key] = (payload_hash, future)
+                is_leader = True
+            else:
+                is_leader = False
+
+        if not is_leader:
+            leader_hash, leader_future = entry
+            if leader_hash != payload_hash:
+                return compute()
+            try:
+                return leader_future.result(timeout=self.wait_timeout)
+            except FutureTimeoutError as exc:
+                raise ConflictError("Idempotency-Key em processamento.") from exc
+
+        try:
+            response = compute()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
@@ -0,0 +1,138 @@
+import json
+import struct
+import sys
+import uuid
+import zlib
+from array import array
+from itertools import accumulate
+from typing import Union
+
+from src.common.constants import CENTS_MULTIPLIER
+from src.common.money import Money
+
+# Primeiro byte do blob: formato do conteúdo (zlib em ambos)
+FORMAT_JSON = 0
+FORMAT_CAPTURE_V1 = 1
+
+_RESPONSE_KEYS = frozenset(
+    ("payment_id", "status", "gross_amount", "platform_fee_amount", "net_amount", "receivables", "outbox_event")
+)
+_RECEIVABLE_KEYS = frozenset(("recipient_id", "role", "amount"))
+_OUTBOX_KEYS = frozenset(("type", "status"))
+_HEADER = struct.Struct("<16sI")  # payment_id + quantidade de recebíveis
+
+
+def _cents(amount: str) -> int:
+    """Centavos de um valor "123.45"; ValueError se str(Money) não reproduzir o texto original."""
+    whole, dot, fraction = amount.partition(".")
+    if dot and len(fraction) == 2 and (whole + fraction).isascii() and whole.isdigit() and fraction.isdigit():
+        if whole == "0" or whole[0] != "0":
+            return int(whole) * CENTS_MULTIPLIER + int(fraction)
+
+    money = Money.from_decimal(amount)
+    if str(money) != amount:
+        raise ValueError(amount)
+    return money.cents
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little_endian(typecode: str, raw: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(raw)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _encode_capture(data: dict) -> bytes:
+    """
+    Layout colunar do cache_data de PaymentService.process, sem nomes de campo:
+    payment_id (16 bytes) | n | tamanhos das strings (uint32) | valores em centavos (int64) | texto UTF-8.
+    Strings: status, outbox.type, outbox.status e (recipient_id, role) de cada recebível;
+    valores: gross, fee, net e o de cada recebível. ValueError/KeyError se o formato não bater.
+    """
+    outbox = data["outbox_event"]
+    receivables = data["receivables"]
+    if data.keys() != _RESPONSE_KEYS or outbox.keys() != _OUTBOX_KEYS:
+        raise ValueError("formato desconhecido")
+
+    payment_id = uuid.UUID(data["payment_id"])
+    if str(payment_id) != data["payment_id"]:
+        raise ValueError(data["payment_id"])
+
+    strings = [data["status"], outbox["type"], outbox["status"]]
+    cents = array("q", (_cents(data["gross_amount"]), _cents(data["platform_fee_amount"]), _cents(data["net_amount"])))
+    for receivable in receivables:
+        if receivable.keys() != _RECEIVABLE_KEYS:
+            raise ValueError("formato desconhecido")
+        strings += (receivable["recipient_id"], receivable["role"])
+        cents.append(_cents(receivable["amount"]))
+
+    lengths = array("I", map(len, strings))
+    return b"".join(
+        (
+            _HEADER.pack(payment_id.bytes, len(receivables)),
+            _little_endian(lengths),
+            _little_endian(cents),
+            "".join(strings).encode(),
+        )
+    )
+
+
+def _format_cents(cents: int) -> str:
+    return str(Money(cents)) if cents < 0 else "%d.%02d" % divmod(cents, CENTS_MULTIPLIER)
+
+
+def _decode_capture(buffer: bytes) -> dict:
+    payment_id, count = _HEADER.unpack_from(buffer)
+    offset = _HEADER.size
+    strings_end = offset + 4 * (3 + 2 * count)
+    lengths = _from_little_endian("I", buffer[offset:strings_end])
+    cents_end = strings_end + 8 * (3 + count)
+    amounts = [_format_cents(value) for value in _from_little_endian("q", buffer[strings_end:cents_end])]
+
+    text = buffer[cents_end:].decode()
+    bounds = list(accumulate(lengths, initial=0))
+    strings = [text[bounds[i] : bounds[i + 1]] for i in range(len(lengths))]
+
+    return {
+        "payment_id": str(uuid.UUID(bytes=payment_id)),
+        "status": strings[0],
+        "gross_amount": amounts[0],
+        "platform_fee_amount": amounts[1],
+        "net_amount": amounts[2],
+        "receivables": [
+            {"recipient_id": recipient_id, "role": role, "amount": amount}
+            for recipient_id, role, amount in zip(strings[3::2], strings[4::2], amounts[3:])
+        ],
+        "outbox_event": {"type": strings[1], "status": strings[2]},
+    }
+
+
+def encode_response(data: dict) -> bytes:
+    """
+    Codificação compacta da resposta guardada para replay: layout binário do formato de
+    captura (valores em centavos, uuid em 16 bytes) comprimido com zlib. Qualquer outro
+    formato cai em JSON comprimido - decode_response() sempre devolve o dict original.
+    """
+    try:
+        fmt, body = FORMAT_CAPTURE_V1, _encode_capture(data)
+    except (KeyError, TypeError, ValueError, ArithmeticError, AttributeError):
+        fmt, body = FORMAT_JSON, json.dumps(data, separators=(",", ":")).encode()
+    return bytes((fmt,)) + zlib.compress(body)
+
+
+def decode_response(blob: Union[bytes, memoryview]) -> dict:
+    blob = bytes(blob)
+    body = zlib.decompress(blob[1:])
+    if blob[0] == FORMAT_CAPTURE_V1:
+        return _decode_capture(body)
+    if blob[0] == FORMAT_JSON:
+        return json.loads(body)
+    raise ValueError(f"Formato de resposta desconhecido: {blob[0]}")
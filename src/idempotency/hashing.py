@@ -0,0 +1,104 @@
+import hashlib
+import json
+from typing import Any, Callable
+
+# Versão da codificação canônica: muda junto com o prefixo se encode_payment_payload mudar
+ENCODING_VERSION = "c1"
+
+HASH_ALGORITHMS: dict[str, Callable[[bytes], str]] = {
+    "blake2b": lambda payload: hashlib.blake2b(payload, digest_size=16).hexdigest(),
+    "sha256": lambda payload: hashlib.sha256(payload).hexdigest(),
+}
+
+_PAYMENT_FIELDS = frozenset(("amount", "currency", "payment_method", "installments", "split_template_id", "splits"))
+_SEPARATOR = "\x1f"
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def encode_payment_payload(data: dict) -> bytes:
+    """
+    Codificação canônica do formato do PaymentInputSerializer, sem passar por JSON.
+
+    Campos em ordem fixa (splits na ordem recebida) separados por \x1f; Decimal/UUID/int
+    entram pelo str(), como no hash legado. Chaves fora do formato conhecido vão no fim,
+    ordenadas. Se algum valor contiver o separador, usa repr() da lista - que escapa o
+    separador e, por ter um único \x1f, nunca colide com a forma rápida.
+    """
+    get = data.get
+    splits = get("splits") or ()
+    parts = [
+        _text(get("amount")),
+        _text(get("currency")),
+        _text(get("payment_method")),
+        _text(get("installments")),
+        _text(get("split_template_id")),
+        str(len(splits)),
+    ]
+    for split in splits:
+        parts += (_text(split.get("recipient_id")), _text(split.get("role")), _text(split.get("percent")))
+    if not _PAYMENT_FIELDS.issuperset(data):
+        for key in sorted(data.keys() - _PAYMENT_FIELDS):
+            parts += (str(key), _text(data[key]))
+
+    encoded = _SEPARATOR.join(parts)
+    if encoded.count(_SEPARATOR) != len(parts) - 1:
+        encoded = _SEPARATOR + repr(parts)
+    return encoded.encode()
+
+
+def legacy_hash(data: dict) -> str:
+    """Hash original (SHA-256 do JSON ordenado), ainda gravado nos registros antigos - sem prefixo."""
+    canonical = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def is_legacy(stored_hash: str) -> bool:
+    return ":" not in stored_hash
+
+
+class PayloadHash(str):
+    """
+    Hash versionado ("c1.blake2b:<hex>") que continua sendo uma str para
+    banco, caches e dicionários, mas sabe recalcular o hash legado do mesmo
+    payload - só quando encontra um registro antigo.
+    """
+
+    def __new__(cls, value: str, data: dict):
+        instance = super().__new__(cls, value)
+        instance._data = data
+        return instance
+
+    def matches(self, stored_hash: str) -> bool:
+        if stored_hash == self:
+            return True
+        if is_legacy(stored_hash):
+            return stored_hash == legacy_hash(self._data)
+
+        # Gravado com outro algoritmo (IDEMPOTENCY_HASH_ALGORITHM mudou): recalcula com o dele
+        scheme = stored_hash.partition(":")[0]
+        version, _, algorithm = scheme.partition(".")
+        if version != ENCODING_VERSION or algorithm not in HASH_ALGORITHMS or self.startswith(scheme + ":"):
+            return False
+        return stored_hash == f"{scheme}:{HASH_ALGORITHMS[algorithm](encode_payment_payload(self._data))}"
+
+
+def payload_hash_matches(stored_hash: str, payload_hash: str) -> bool:
+    if isinstance(payload_hash, PayloadHash):
+        return payload_hash.matches(stored_hash)
+    return stored_hash == payload_hash
+
+
+class PayloadHasher:
+    """Hash do payload de captura com algoritmo configurável (IDEMPOTENCY_HASH_ALGORITHM)."""
+
+    def __init__(self, algorithm: str = "blake2b"):
+        if algorithm not in HASH_ALGORITHMS:
+            raise ValueError(f"Algoritmo de hash não suportado: {algorithm}. Use: {', '.join(HASH_ALGORITHMS)}.")
+        self._digest = HASH_ALGORITHMS[algorithm]
+        self._prefix = f"{ENCODING_VERSION}.{algorithm}:"
+
+    def hash(self, data: dict) -> PayloadHash:
+        return PayloadHash(self._prefix + self._digest(encode_payment_payload(data)), data)
@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from src.common.batching import BatchRun, run_in_batches
+from src.idempotency.repositories import IdempotencyRepository
+
+
+class Command(BaseCommand):
+    help = (
+        "Apaga registros de idempotência mais antigos que a retenção, em lotes pequenos com pausa "
+        "entre eles (nenhum lock longo), reportando linhas/s."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--retention-hours", type=float, default=settings.IDEMPOTENCY_RETENTION_HOURS)
+        parser.add_argument("--batch-size", type=int, default=settings.IDEMPOTENCY_PURGE_BATCH_SIZE)
+        parser.add_argument("--pause", type=float, default=settings.IDEMPOTENCY_PURGE_PAUSE_SECONDS)
+        parser.add_argument("--max-batches", type=int, help="Para depois de N lotes (ex.: janela de manutenção).")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size deve ser maior que zero.")
+
+        cutoff = timezone.now() - timedelta(hours=options["retention_hours"])
+        repository = IdempotencyRepository()
+
+        def report(processed: int, run: BatchRun) -> None:
+            self.stdout.write(f"lote {run.batches}: {processed} linhas ({run.rows} no total, {run.rate:,.0f} linhas/s)")
+
+        run = run_in_batches(
+            lambda batch_size: repository.delete_expired_batch(cutoff, batch_size),
+            options["batch_size"],
+            options["pause"],
+            max_batches=options["max_batches"],
+            on_batch=report,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Purge concluído: {run.rows} registros anteriores a {cutoff:%Y-%m-%d %H:%M} "
+                f"em {run.batches} lotes ({run.elapsed:.1f}s, {run.rate:,.0f} linhas/s)."
+            )
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("idempotency", "0002_remove_idempotencyrecord_status_code"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="idempotencyrecord",
+            name="payload_hash",
+            field=models.CharField(max_length=80),
+        ),
+    ]
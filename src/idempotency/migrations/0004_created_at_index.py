@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("idempotency", "0003_payload_hash_versioned"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="idempotencyrecord",
+            index=models.Index(fields=["created_at"], name="idempotency_created_at_idx"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("idempotency", "0004_created_at_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="idempotencyrecord",
+            name="response_blob",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 
 from src.common.models import BaseModel
+from src.idempotency.encoding import decode_response
 
 
 class IdempotencyStatus(models.TextChoices):
@@ -11,18 +12,31 @@ class IdempotencyStatus(models.TextChoices):
 class IdempotencyRecord(BaseModel):
     """
     Registro de idempotência para evitar processamento duplicado.
-    O payload_hash (SHA-256) garante que a mesma chave não seja
-    reutilizada com um payload diferente.
+    O payload_hash (versionado, ex.: "c1.blake2b:<hex>"; SHA-256 puro nos registros
+    antigos) garante que a mesma chave não seja reutilizada com um payload diferente.
     """
 
     key = models.CharField(max_length=255, unique=True)
-    payload_hash = models.CharField(max_length=64)
+    payload_hash = models.CharField(max_length=80)
     status = models.CharField(max_length=20, choices=IdempotencyStatus, default=IdempotencyStatus.PROCESSING)
     response_data = models.JSONField(null=True, blank=True)
+    # Resposta em codificação compacta (encoding.py), usada quando IDEMPOTENCY_COMPACT_RESPONSES está ligado
+    response_blob = models.BinaryField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         db_table = "idempotency_records"
+        indexes = [
+            # Suporte ao purge por retenção (purge_idempotency)
+            models.Index(fields=["created_at"], name="idempotency_created_at_idx"),
+        ]
+
+    @property
+    def response(self):
+        """Resposta guardada para replay, decodificando o blob compacto quando existir (ou o JSON legado)."""
+        if self.response_blob is not None:
+            return decode_response(self.response_blob)
+        return self.response_data
 
     def __str__(self):
         return f"Idempotency {self.key} - {self.status}"
@@ -1,16 +1,85 @@
+from datetime import datetime
 from typing import Optional
 
+from django.db import OperationalError, connection, transaction
+from django.utils import timezone
 from injector import singleton
 
+from src.common.ids import uuid7
+from src.idempotency.encoding import encode_response
 from src.idempotency.models import IdempotencyRecord, IdempotencyStatus
 
+# SQLSTATE lock_not_available: lock_timeout estourou
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+def is_lock_timeout(exc: OperationalError) -> bool:
+    return getattr(exc.__cause__, "pgcode", None) == LOCK_NOT_AVAILABLE
+
 
 @singleton
 class IdempotencyRepository:
+    def __init__(self, compact_responses: bool = False, lock_timeout: Optional[float] = None):
+        # Grava a resposta em response_blob (encoding.py) em vez do JSONField
+        self._compact_responses = compact_responses
+        # Espera máxima (s) do claim pelo lock de outra transação com a mesma chave (PostgreSQL)
+        self._lock_timeout = lock_timeout
+
+    def _response_fields(self, response_data: dict) -> dict:
+        if self._compact_responses:
+            return {"response_data": None, "response_blob": encode_response(response_data)}
+        return {"response_data": response_data, "response_blob": None}
+
     def get_by_key_for_update(self, key: str) -> Optional[IdempotencyRecord]:
         """Busca registro com lock pessimista (SELECT FOR UPDATE)."""
         return IdempotencyRecord.objects.select_for_update().filter(key=key).first()
 
+    def get_many_by_keys_for_update(self, keys: list[str]) -> dict[str, IdempotencyRecord]:
+        """Busca vários registros com lock pessimista em uma única query, indexados pela chave."""
+        return {record.key: record for record in IdempotencyRecord.objects.select_for_update().filter(key__in=keys)}
+
+    def claim(self, key: str, payload_hash: str) -> tuple[IdempotencyRecord, bool]:
+        """
+        Insere a chave como PROCESSING ou devolve o registro existente, em um único statement
+        (INSERT ... ON CONFLICT DO UPDATE ... RETURNING - PostgreSQL e SQLite >= 3.35).
+
+        O DO UPDATE no-op trava a linha existente como o SELECT FOR UPDATE e, no PostgreSQL,
+        espera o commit de um INSERT concorrente da mesma chave antes de devolver a linha.
+        Retorna (record, created); created compara o id devolvido com o id gerado aqui.
+        Deve ser chamado dentro de transaction.atomic().
+
+        Com lock_timeout, o PostgreSQL desiste da espera depois desse tempo (SET LOCAL, vale até o fim
+        da transação) e levanta OperationalError com LockNotAvailable - ver is_lock_timeout().
+        """
+        if self._lock_timeout is not None and connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT set_config('lock_timeout', %s, true)", [f"{max(1, round(self._lock_timeout * 1000))}ms"]
+                )
+
+        meta = IdempotencyRecord._meta
+        new_id = uuid7()
+        columns = ["id", "key", "payload_hash", "status", "response_data", "response_blob", "created_at"]
+        params = [
+            meta.get_field("id").get_db_prep_value(new_id, connection),
+            key,
+            payload_hash,
+            IdempotencyStatus.PROCESSING.value,
+            None,
+            None,
+            meta.get_field("created_at").get_db_prep_value(timezone.now(), connection),
+        ]
+
+        qn = connection.ops.quote_name
+        column_list = ", ".join(qn(column) for column in columns)
+        sql = (
+            f"INSERT INTO {qn(meta.db_table)} ({column_list}) VALUES ({', '.join(['%s'] * len(columns))}) "
+            f"ON CONFLICT ({qn('key')}) DO UPDATE SET {qn('key')} = EXCLUDED.{qn('key')} "
+            f"RETURNING {column_list}"
+        )
+        record = next(iter(IdempotencyRecord.objects.raw(sql, params)))
+        return record, record.id == new_id
+
     def create(self, key: str, payload_hash: str) -> IdempotencyRecord:
         return IdempotencyRecord.objects.create(
             key=key,
@@ -18,7 +87,44 @@ class IdempotencyRepository:
             status=IdempotencyStatus.PROCESSING,
         )
 
+    def create_completed_many(self, entries: list[tuple[str, str, dict]]) -> list[IdempotencyRecord]:
+        """Insere registros já concluídos (key, payload_hash, response_data) em um único INSERT."""
+        records = [
+            IdempotencyRecord(
+                key=key,
+                payload_hash=payload_hash,
+                status=IdempotencyStatus.COMPLETED,
+                **self._response_fields(response_data),
+            )
+            for key, payload_hash, response_data in entries
+        ]
+        return IdempotencyRecord.objects.bulk_create(records)
+
     def mark_completed(self, record: IdempotencyRecord, response_data: dict) -> None:
+        record.save(update_fields=self.apply_completed(record, response_data))
+
+    def apply_completed(self, record: IdempotencyRecord, response_data: dict) -> list[str]:
+        """Marca o registro como concluído só em memória; devolve os campos que precisam ser gravados."""
         record.status = IdempotencyStatus.COMPLETED
-        record.response_data = response_data
-        record.save(update_fields=["status", "response_data"])
+        fields = self._response_fields(response_data)
+        for name, value in fields.items():
+            setattr(record, name, value)
+        return ["status", *fields]
+
+    def delete_expired_batch(self, cutoff: datetime, batch_size: int) -> int:
+        """
+        Apaga até batch_size registros criados antes de cutoff, em uma transação curta.
+        Linhas travadas por uma captura em andamento são puladas (SKIP LOCKED no PostgreSQL).
+        Retorna quantas linhas foram apagadas - 0 quando não há mais nada expirado.
+        """
+        with transaction.atomic():
+            ids = list(
+                IdempotencyRecord.objects.select_for_update(skip_locked=True)
+                .filter(created_at__lt=cutoff)
+                .order_by("created_at")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                return 0
+            deleted, _ = IdempotencyRecord.objects.filter(id__in=ids).delete()
+        return deleted
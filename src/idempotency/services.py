@@ -1,12 +1,14 @@
-import hashlib
-import json
 from dataclasses import dataclass
 from typing import Optional
 
+from django.db import OperationalError, transaction
 from injector import inject, singleton
 
+from src.common.exceptions import ConflictError
+from src.idempotency.cache import ReplayCache
+from src.idempotency.hashing import PayloadHash, PayloadHasher, payload_hash_matches
 from src.idempotency.models import IdempotencyRecord, IdempotencyStatus
-from src.idempotency.repositories import IdempotencyRepository
+from src.idempotency.repositories import IdempotencyRepository, is_lock_timeout
 
 
 @dataclass(frozen=True)
@@ -20,35 +22,81 @@ class IdempotencyResult:
 @singleton
 class IdempotencyService:
     """
-    Controle de idempotência com SHA-256 do payload.
+    Controle de idempotência com hash versionado do payload (ver hashing.py;
+    registros antigos com SHA-256 sem prefixo continuam válidos).
 
     Fluxo:
     - Chave nova: processa normalmente, salva resposta ao final
     - Chave existente + mesmo hash: retorna resposta cacheada
     - Chave existente + hash diferente: conflito
+
+    Respostas concluídas também vão para o ReplayCache após o commit;
+    cached_replay() atende replays sem abrir transação.
     """
 
     @inject
-    def __init__(self, repository: IdempotencyRepository):
+    def __init__(self, repository: IdempotencyRepository, replay_cache: ReplayCache, hasher: PayloadHasher):
         self._repository = repository
+        self._replay_cache = replay_cache
+        self._hasher = hasher
 
-    @staticmethod
-    def hash_payload(data: dict) -> str:
-        canonical = json.dumps(data, sort_keys=True, default=str)
-        return hashlib.sha256(canonical.encode()).hexdigest()
+    def hash_payload(self, data: dict) -> PayloadHash:
+        return self._hasher.hash(data)
+
+    def cached_replay(self, key: str, payload_hash: str) -> Optional[dict]:
+        """Resposta já concluída para (key, payload_hash), sem tocar no banco. None = seguir o fluxo de check()."""
+        return self._replay_cache.get(key, payload_hash)
 
     def check(self, key: str, payload_hash: str) -> IdempotencyResult:
         """
         Verifica idempotência dentro de uma transação com lock.
+        Um único round trip: claim() insere a chave nova ou trava e devolve a existente.
+        Outra transação segurando a mesma chave por mais que o lock_timeout do repositório vira 409.
         Deve ser chamado dentro de transaction.atomic().
         """
-        record = self._repository.get_by_key_for_update(key)
+        try:
+            record, created = self._repository.claim(key, payload_hash)
+        except OperationalError as exc:
+            if is_lock_timeout(exc):
+                raise ConflictError("Idempotency-Key em processamento.") from exc
+            raise
+
+        if created:
+            return IdempotencyResult(is_duplicate=False, is_conflict=False, record=record)
+
+        result = self._evaluate(record, payload_hash)
+        if result.cached_response:
+            self._remember([(key, payload_hash, result.cached_response)])
+        return result
+
+    def check_many(self, payload_hashes: dict[str, str]) -> dict[str, IdempotencyResult]:
+        """
+        Versão em lote de check(): um único SELECT FOR UPDATE para todas as chaves.
+        Chaves novas voltam sem record - o chamador insere tudo de uma vez
+        via save_completed_many(). Deve ser chamado dentro de transaction.atomic().
+        """
+        records = self._repository.get_many_by_keys_for_update(list(payload_hashes))
 
-        if record is None:
-            new_record = self._repository.create(key, payload_hash)
-            return IdempotencyResult(is_duplicate=False, is_conflict=False, record=new_record)
+        results = {}
+        for key, payload_hash in payload_hashes.items():
+            record = records.get(key)
+            if record is None:
+                results[key] = IdempotencyResult(is_duplicate=False, is_conflict=False)
+            else:
+                results[key] = self._evaluate(record, payload_hash)
 
-        if record.payload_hash != payload_hash:
+        self._remember(
+            [
+                (key, payload_hashes[key], result.cached_response)
+                for key, result in results.items()
+                if result.cached_response
+            ]
+        )
+        return results
+
+    @staticmethod
+    def _evaluate(record: IdempotencyRecord, payload_hash: str) -> IdempotencyResult:
+        if not payload_hash_matches(record.payload_hash, payload_hash):
             return IdempotencyResult(is_duplicate=False, is_conflict=True)
 
         # Mesma chave, mesmo payload - retorna resposta cacheada se disponível
@@ -56,7 +104,7 @@ class IdempotencyService:
             return IdempotencyResult(
                 is_duplicate=True,
                 is_conflict=False,
-                cached_response=record.response_data,
+                cached_response=record.response,
             )
 
         # Ainda processando (request concorrente) - trata como duplicata sem cache
@@ -65,3 +113,23 @@ class IdempotencyService:
     def save_response(self, record: IdempotencyRecord, response_data: dict) -> None:
         """Salva a resposta no registro de idempotência já existente (sem query extra)."""
         self._repository.mark_completed(record, response_data)
+        self._remember([(record.key, record.payload_hash, response_data)])
+
+    def stage_response(self, record: IdempotencyRecord, response_data: dict) -> list[str]:
+        """
+        Como save_response(), mas sem gravar: o chamador persiste os campos devolvidos na mesma
+        transação (CaptureRepository, caminho de um statement só).
+        """
+        fields = self._repository.apply_completed(record, response_data)
+        self._remember([(record.key, record.payload_hash, response_data)])
+        return fields
+
+    def save_completed_many(self, entries: list[tuple[str, str, dict]]) -> None:
+        """Registra chaves novas já concluídas (key, payload_hash, response_data) em um único INSERT."""
+        self._repository.create_completed_many(entries)
+        self._remember(entries)
+
+    def _remember(self, entries: list[tuple[str, str, dict]]) -> None:
+        """Alimenta o ReplayCache só depois do commit - um rollback nunca deixa resposta no cache."""
+        if entries:
+            transaction.on_commit(lambda: self._replay_cache.set_many(entries))
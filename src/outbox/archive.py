@@ -0,0 +1,77 @@
+import gzip
+import json
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from src.outbox.models import OutboxEvent, OutboxEventArchive
+from src.outbox.publishers import to_message
+
+
+class OutboxArchive(ABC):
+    """Destino do archive_outbox."""
+
+    @abstractmethod
+    def write(self, events: list[OutboxEvent]) -> None:
+        """
+        Grava o lote. Roda na transação que apaga os eventos de outbox_events: se levantar exceção,
+        nada é apagado e o lote volta no próximo arquivamento.
+        """
+
+
+class TableArchive(OutboxArchive):
+    """outbox_events_archive: uma linha por evento, payload em JSON + zlib."""
+
+    def write(self, events: list[OutboxEvent]) -> None:
+        # ignore_conflicts: reexecutar um lote (crash entre lotes) não duplica nada
+        OutboxEventArchive.objects.bulk_create(
+            [
+                OutboxEventArchive(
+                    id=event.id,
+                    event_type=event.event_type,
+                    partition=event.partition,
+                    payload_blob=zlib.compress(json.dumps(event.payload, separators=(",", ":")).encode()),
+                    created_at=event.created_at,
+                    published_at=event.published_at,
+                )
+                for event in events
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class GzipFileArchive(OutboxArchive):
+    """
+    Arquivo local JSON lines + gzip; cada lote é um membro gzip anexado (gzip/zcat leem o arquivo
+    inteiro). O arquivo é escrito antes do commit: se a transação falhar, o lote reaparece no próximo
+    arquivamento - consumidores do arquivo deduplicam pelo id.
+    """
+
+    def __init__(self, path: Path):
+        self._path = Path(path)
+        self._lock = threading.Lock()
+
+    def write(self, events: list[OutboxEvent]) -> None:
+        lines = "".join(
+            json.dumps(
+                {
+                    **to_message(event),
+                    "partition": event.partition,
+                    "published_at": event.published_at.isoformat() if event.published_at else None,
+                },
+                separators=(",", ":"),
+            )
+            + "\n"
+            for event in events
+        )
+        with self._lock, gzip.open(self._path, "at", encoding="utf-8") as file:
+            file.write(lines)
+
+
+def build_archive(name: str, path: Path) -> OutboxArchive:
+    if name == "table":
+        return TableArchive()
+    if name == "file":
+        return GzipFileArchive(path)
+    raise ValueError(f"Destino de arquivamento desconhecido: {name}. Use: table, file.")
@@ -0,0 +1,57 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from uuid import UUID
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxDispatcher:
+    """
+    Publicação imediata de eventos recém-commitados, sem esperar o polling do relay.
+
+    OutboxRepository registra um transaction.on_commit que chama dispatch() com os ids
+    novos; um pool de threads publica cada grupo via handler (OutboxRelayService.relay_ids).
+    É best effort: fila cheia, falha do publisher ou processo morto deixam o evento
+    pending, e o relay_outbox por polling continua sendo a rede de segurança.
+    """
+
+    def __init__(self, handler: Callable[[list[UUID]], object], max_workers: int = 4, max_pending: int = 1000):
+        self._handler = handler
+        self._max_pending = max_pending
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="outbox-dispatch")
+
+    def dispatch(self, event_ids: list[UUID]) -> bool:
+        """Enfileira os ids; False se a fila estiver cheia (o polling publica depois)."""
+        with self._lock:
+            if self._pending >= self._max_pending:
+                return False
+            self._pending += 1
+
+        try:
+            self._executor.submit(self._run, list(event_ids))
+        except RuntimeError:
+            # Pool já encerrado (shutdown do processo)
+            with self._lock:
+                self._pending -= 1
+            return False
+        return True
+
+    def _run(self, event_ids: list[UUID]) -> None:
+        # Threads do pool mantêm conexão própria; descarta as quebradas/expiradas antes de usar
+        close_old_connections()
+        try:
+            self._handler(event_ids)
+        except Exception:
+            logger.exception("Falha no dispatch imediato do outbox; o relay por polling vai publicar")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,52 @@
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from src.common.batching import BatchRun, run_in_batches
+from src.outbox.archive import build_archive
+from src.outbox.repositories.outbox_repository import OutboxRepository
+
+
+class Command(BaseCommand):
+    help = (
+        "Move eventos published antigos de outbox_events para o arquivo (tabela outbox_events_archive "
+        "ou JSON lines gzip local), em lotes pequenos com pausa entre eles, reportando linhas/s."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=float, default=settings.OUTBOX_ARCHIVE_AFTER_DAYS)
+        parser.add_argument("--to", choices=["table", "file"], default=settings.OUTBOX_ARCHIVE_TARGET)
+        parser.add_argument("--file", type=Path, default=settings.OUTBOX_ARCHIVE_FILE)
+        parser.add_argument("--batch-size", type=int, default=settings.OUTBOX_ARCHIVE_BATCH_SIZE)
+        parser.add_argument("--pause", type=float, default=settings.OUTBOX_ARCHIVE_PAUSE_SECONDS)
+        parser.add_argument("--max-batches", type=int, help="Para depois de N lotes (ex.: janela de manutenção).")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size deve ser maior que zero.")
+
+        cutoff = timezone.now() - timedelta(days=options["older_than_days"])
+        archive = build_archive(options["to"], options["file"])
+        repository = OutboxRepository()
+
+        def report(processed: int, run: BatchRun) -> None:
+            self.stdout.write(
+                f"lote {run.batches}: {processed} eventos ({run.rows} no total, {run.rate:,.0f} linhas/s)"
+            )
+
+        run = run_in_batches(
+            lambda batch_size: repository.archive_published_batch(cutoff, batch_size, archive.write),
+            options["batch_size"],
+            options["pause"],
+            max_batches=options["max_batches"],
+            on_batch=report,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Arquivamento concluído: {run.rows} eventos anteriores a {cutoff:%Y-%m-%d %H:%M} "
+                f"em {run.batches} lotes ({run.elapsed:.1f}s, {run.rate:,.0f} linhas/s)."
+            )
+        )
@@ -0,0 +1,120 @@
+import os
+import signal
+import socket
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from src.outbox.notify import PgNotifyWaker
+from src.outbox.publishers import build_publisher
+from src.outbox.repositories.lease_repository import OutboxLeaseRepository
+from src.outbox.repositories.outbox_repository import OutboxRepository
+from src.outbox.services.partitioned_relay import PartitionedRelay
+from src.outbox.services.relay_service import OutboxRelayService, RelayBatchResult, RelayStats
+
+
+class Command(BaseCommand):
+    help = (
+        "Publica eventos pending do outbox em lotes (SELECT ... FOR UPDATE SKIP LOCKED). "
+        "Vários processos podem rodar em paralelo sem publicar o mesmo evento duas vezes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.OUTBOX_RELAY_BATCH_SIZE)
+        parser.add_argument("--poll-interval", type=float, default=settings.OUTBOX_RELAY_POLL_SECONDS)
+        parser.add_argument("--publisher", choices=["memory", "file"], default=settings.OUTBOX_PUBLISHER)
+        parser.add_argument("--file", type=Path, default=settings.OUTBOX_PUBLISHER_FILE)
+        parser.add_argument("--drain", action="store_true", help="Sai quando não houver mais eventos pending.")
+        parser.add_argument(
+            "--listen", action="store_true", help="PostgreSQL: acorda por LISTEN/NOTIFY em vez de só polling."
+        )
+        parser.add_argument(
+            "--partitioned",
+            action="store_true",
+            help="Ordem por payment: cada partição com um único worker; rode N processos para paralelizar.",
+        )
+        parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}")
+        parser.add_argument("--partitions", type=int, default=settings.OUTBOX_PARTITIONS)
+        parser.add_argument("--lease-seconds", type=float, default=settings.OUTBOX_LEASE_SECONDS)
+        parser.add_argument("--report-every", type=float, default=5.0, help="Segundos entre relatórios de vazão.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size deve ser maior que zero.")
+
+        if options["partitioned"] and (options["partitions"] <= 0 or options["lease_seconds"] <= 0):
+            raise CommandError("--partitions e --lease-seconds devem ser maiores que zero.")
+
+        if options["partitioned"] and settings.OUTBOX_DISPATCH_ON_COMMIT:
+            # O dispatch pós-commit publica por id (relay_ids) sem olhar os leases: um evento novo
+            # sairia antes dos mais antigos da mesma partição que ainda estão com o dono dela
+            raise CommandError(
+                "--partitioned exige OUTBOX_DISPATCH_ON_COMMIT=false (em todos os processos que gravam "
+                "no outbox): o dispatch pós-commit não respeita os leases e quebraria a ordem por payment."
+            )
+
+        waker = None
+        if options["listen"]:
+            if connection.vendor != "postgresql":
+                raise CommandError("--listen exige PostgreSQL.")
+            waker = PgNotifyWaker()
+
+        service = OutboxRelayService(OutboxRepository(), build_publisher(options["publisher"], options["file"]))
+        partitioned = None
+        if options["partitioned"]:
+            partitioned = PartitionedRelay(
+                service,
+                OutboxLeaseRepository(),
+                worker_id=options["worker_id"],
+                partitions=options["partitions"],
+                lease_seconds=options["lease_seconds"],
+            )
+            self.stdout.write(f"Worker {partitioned.worker_id}: partições {partitioned.rebalance()}")
+        stop = threading.Event()
+
+        def shutdown(*_) -> None:
+            stop.set()
+            if waker is not None:
+                waker.interrupt()  # não espera o resto do poll_interval no select do LISTEN
+
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, shutdown)
+
+        last_report = time.perf_counter()
+
+        def report(result: RelayBatchResult, stats: RelayStats) -> None:
+            nonlocal last_report
+            if time.perf_counter() - last_report >= options["report_every"]:
+                last_report = time.perf_counter()
+                self.stdout.write(self._summary(stats, result))
+
+        try:
+            stats = (partitioned or service).run(
+                batch_size=options["batch_size"],
+                poll_interval=options["poll_interval"],
+                stop=stop,
+                drain=options["drain"],
+                on_batch=report,
+                waker=waker,
+            )
+        finally:
+            if partitioned is not None:
+                partitioned.leave()
+            if waker is not None:
+                waker.close()
+        self.stdout.write(self.style.SUCCESS(f"Relay encerrado: {self._summary(stats)}"))
+
+    @staticmethod
+    def _summary(stats: RelayStats, last: RelayBatchResult = None) -> str:
+        line = (
+            f"{stats.published} eventos em {stats.batches} lotes ({stats.throughput:,.0f} eventos/s), "
+            f"lag máximo {stats.max_lag.total_seconds() * 1000:,.0f} ms, falhas {stats.failures}"
+        )
+        if last is not None:
+            line += f", lag do último lote {last.max_lag.total_seconds() * 1000:,.0f} ms"
+        return line
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+# Só PostgreSQL: um NOTIFY por INSERT (statement-level, não por linha) acorda relays em LISTEN
+CREATE_TRIGGER = """
+CREATE OR REPLACE FUNCTION outbox_events_notify() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('outbox_events', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS outbox_events_notify ON outbox_events;
+CREATE TRIGGER outbox_events_notify
+    AFTER INSERT ON outbox_events
+    FOR EACH STATEMENT EXECUTE FUNCTION outbox_events_notify();
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS outbox_events_notify ON outbox_events;
+DROP FUNCTION IF EXISTS outbox_events_notify();
+"""
+
+
+def _run_on_postgresql(sql):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("outbox", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(_run_on_postgresql(CREATE_TRIGGER), _run_on_postgresql(DROP_TRIGGER)),
+    ]
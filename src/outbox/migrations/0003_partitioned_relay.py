@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("outbox", "0002_pending_notify_trigger"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxPartitionLease",
+            fields=[
+                ("partition", models.PositiveSmallIntegerField(primary_key=True, serialize=False)),
+                ("owner", models.CharField(blank=True, max_length=100, null=True)),
+                ("expires_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "outbox_partition_leases",
+                "ordering": ["partition"],
+            },
+        ),
+        migrations.CreateModel(
+            name="OutboxRelayWorker",
+            fields=[
+                ("worker_id", models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ("heartbeat_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "outbox_relay_workers",
+                "ordering": ["worker_id"],
+            },
+        ),
+        migrations.AddField(
+            model_name="outboxevent",
+            name="partition",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="outboxevent",
+            index=models.Index(fields=["status", "partition", "created_at"], name="outbox_status_partition_idx"),
+        ),
+    ]
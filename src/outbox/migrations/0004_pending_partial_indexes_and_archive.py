@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("outbox", "0003_partitioned_relay"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxEventArchive",
+            fields=[
+                ("id", models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ("event_type", models.CharField(max_length=100)),
+                ("partition", models.PositiveSmallIntegerField(default=0)),
+                ("payload_blob", models.BinaryField()),
+                ("created_at", models.DateTimeField()),
+                ("published_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "outbox_events_archive",
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name="outboxevent",
+            name="outbox_status_partition_idx",
+        ),
+        migrations.AddIndex(
+            model_name="outboxevent",
+            index=models.Index(
+                condition=models.Q(("status", "pending")), fields=["created_at", "id"], name="outbox_pending_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="outboxevent",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["partition", "created_at"],
+                name="outbox_pending_partition_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="outboxevent",
+            index=models.Index(
+                condition=models.Q(("status", "published")), fields=["created_at"], name="outbox_published_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="outboxeventarchive",
+            index=models.Index(fields=["created_at"], name="outbox_archive_created_idx"),
+        ),
+    ]
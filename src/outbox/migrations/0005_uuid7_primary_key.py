@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:42
+
+import src.common.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("outbox", "0004_pending_partial_indexes_and_archive"),
+    ]
+
+    # Só o default (gerado no Python) muda: nenhum DDL, nenhuma reescrita de tabela. Linhas existentes
+    # mantêm o UUID v4; as novas entram em ordem de tempo no fim do índice da PK.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name="outboxevent",
+                    name="id",
+                    field=models.UUIDField(
+                        default=src.common.ids.uuid7, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+            ],
+            database_operations=[],
+        ),
+    ]
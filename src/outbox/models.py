@@ -1,3 +1,6 @@
+import json
+import zlib
+
 from django.db import models
 
 from src.common.models import BaseModel
@@ -12,12 +15,89 @@ class OutboxEvent(BaseModel):
     event_type = models.CharField(max_length=100)
     payload = models.JSONField()
     status = models.CharField(max_length=20, choices=OutboxEventStatus, default=OutboxEventStatus.PENDING)
+    # Hash do agregado (payment_id) módulo OUTBOX_PARTITIONS: a ordem só é garantida dentro da partição
+    partition = models.PositiveSmallIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     published_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         db_table = "outbox_events"
         ordering = ["-created_at"]
+        indexes = [
+            # Parciais: a tabela é quase toda published, os índices do relay só cobrem os pending
+            models.Index(
+                fields=["created_at", "id"],
+                name="outbox_pending_idx",
+                condition=models.Q(status=OutboxEventStatus.PENDING),
+            ),
+            models.Index(
+                fields=["partition", "created_at"],
+                name="outbox_pending_partition_idx",
+                condition=models.Q(status=OutboxEventStatus.PENDING),
+            ),
+            # Arquivamento (archive_outbox): published mais antigos primeiro
+            models.Index(
+                fields=["created_at"],
+                name="outbox_published_created_idx",
+                condition=models.Q(status=OutboxEventStatus.PUBLISHED),
+            ),
+        ]
 
     def __str__(self):
         return f"OutboxEvent {self.event_type} - {self.status}"
+
+
+class OutboxEventArchive(models.Model):
+    """
+    Evento publicado arquivado (archive_outbox): mesmo id, payload em JSON comprimido com zlib.
+    Fora de outbox_events para o relay trabalhar só com o conjunto pequeno de pending.
+    """
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    event_type = models.CharField(max_length=100)
+    partition = models.PositiveSmallIntegerField(default=0)
+    payload_blob = models.BinaryField()
+    created_at = models.DateTimeField()
+    published_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "outbox_events_archive"
+        indexes = [
+            models.Index(fields=["created_at"], name="outbox_archive_created_idx"),
+        ]
+
+    @property
+    def payload(self) -> dict:
+        return json.loads(zlib.decompress(self.payload_blob))
+
+    def __str__(self):
+        return f"OutboxEventArchive {self.event_type} - {self.created_at:%Y-%m-%d}"
+
+
+class OutboxPartitionLease(models.Model):
+    """Dono atual de uma partição no relay particionado; vale até expires_at (renovado a cada lote)."""
+
+    partition = models.PositiveSmallIntegerField(primary_key=True)
+    owner = models.CharField(max_length=100, null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "outbox_partition_leases"
+        ordering = ["partition"]
+
+    def __str__(self):
+        return f"OutboxPartitionLease {self.partition} - {self.owner}"
+
+
+class OutboxRelayWorker(models.Model):
+    """Registro de workers vivos - a divisão justa das partições depende de quantos existem."""
+
+    worker_id = models.CharField(max_length=100, primary_key=True)
+    heartbeat_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "outbox_relay_workers"
+        ordering = ["worker_id"]
+
+    def __str__(self):
+        return f"OutboxRelayWorker {self.worker_id}"
@@ -0,0 +1,63 @@
+import os
+import select
+
+from django.db import connections
+
+CHANNEL = "outbox_events"
+
+
+class PgNotifyWaker:
+    """
+    Acorda o relay quando o trigger outbox_events_notify (migration 0002) avisa que houve INSERT,
+    em vez de dormir o poll_interval inteiro. Usa uma conexão própria em LISTEN (autocommit),
+    separada da conexão que faz os claims. Só PostgreSQL (psycopg2).
+
+    O select também escuta um self-pipe: interrupt() (chamado do handler de SIGTERM/SIGINT) acorda
+    a espera na hora, sem esperar o timeout.
+    """
+
+    def __init__(self, alias: str = "default"):
+        wrapper = connections[alias]
+        if wrapper.vendor != "postgresql":
+            raise ValueError("LISTEN/NOTIFY exige PostgreSQL.")
+        self._connection = wrapper.get_new_connection(wrapper.get_connection_params())
+        self._connection.autocommit = True
+        with self._connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        self._open_wakeup_pipe()
+
+    def _open_wakeup_pipe(self) -> None:
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_read, False)
+        os.set_blocking(self._wakeup_write, False)
+
+    def interrupt(self) -> None:
+        """Acorda um wait() em andamento (ou o próximo). Seguro dentro de signal handler: só escreve 1 byte."""
+        try:
+            os.write(self._wakeup_write, b"\0")
+        except BlockingIOError:
+            pass  # pipe cheio: já há um despertar pendente
+
+    def wait(self, timeout: float) -> bool:
+        """Bloqueia até um NOTIFY, interrupt() ou timeout; True se houve notificação."""
+        if not self._connection.notifies:
+            ready, _, _ = select.select([self._connection, self._wakeup_read], [], [], timeout)
+            if self._wakeup_read in ready:
+                self._drain_wakeup_pipe()
+            self._connection.poll()
+        notified = bool(self._connection.notifies)
+        # Vários INSERTs viram um único ciclo do relay - o claim pega tudo que estiver pending
+        self._connection.notifies.clear()
+        return notified
+
+    def _drain_wakeup_pipe(self) -> None:
+        try:
+            while os.read(self._wakeup_read, 512):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self) -> None:
+        self._connection.close()
+        os.close(self._wakeup_read)
+        os.close(self._wakeup_write)
@@ -0,0 +1,18 @@
+import hashlib
+
+
+def partition_for(key: str, partitions: int) -> int:
+    """
+    Partição estável de um agregado (payment_id): igual em qualquer processo e versão do Python,
+    ao contrário de hash(). Mudar o número de partições muda o mapeamento - só com o outbox vazio.
+    """
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % partitions
+
+
+def fair_share(partitions: int, workers: list[str], worker_id: str) -> int:
+    """Quantas partições cabem a worker_id: divisão igual, o resto vai para os primeiros ids em ordem."""
+    if worker_id not in workers:
+        return 0
+    base, extra = divmod(partitions, len(workers))
+    return base + (1 if sorted(workers).index(worker_id) < extra else 0)
@@ -0,0 +1,61 @@
+import json
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from src.outbox.models import OutboxEvent
+
+
+class OutboxPublisher(ABC):
+    """Interface do broker. Implementações reais (Kafka, SNS, ...) entram aqui."""
+
+    @abstractmethod
+    def publish(self, events: list[OutboxEvent]) -> None:
+        """
+        Entrega o lote ao broker. Deve levantar exceção se qualquer evento falhar -
+        o relay não marca nada como publicado e o lote volta para pending.
+        """
+
+
+def to_message(event: OutboxEvent) -> dict:
+    return {
+        "id": str(event.id),
+        "type": event.event_type,
+        "payload": event.payload,
+        "created_at": event.created_at.isoformat(),
+    }
+
+
+class InMemoryPublisher(OutboxPublisher):
+    """Guarda as mensagens em memória - testes e desenvolvimento local."""
+
+    def __init__(self):
+        self.messages: list[dict] = []
+        self._lock = threading.Lock()
+
+    def publish(self, events: list[OutboxEvent]) -> None:
+        messages = [to_message(event) for event in events]
+        with self._lock:
+            self.messages.extend(messages)
+
+
+class FilePublisher(OutboxPublisher):
+    """Anexa uma linha JSON por evento em um arquivo - stand-in local para o broker."""
+
+    def __init__(self, path: Path):
+        self._path = Path(path)
+        self._lock = threading.Lock()
+
+    def publish(self, events: list[OutboxEvent]) -> None:
+        lines = "".join(json.dumps(to_message(event), separators=(",", ":")) + "\n" for event in events)
+        with self._lock, self._path.open("a", encoding="utf-8") as file:
+            file.write(lines)
+            file.flush()
+
+
+def build_publisher(name: str, path: Path) -> OutboxPublisher:
+    if name == "memory":
+        return InMemoryPublisher()
+    if name == "file":
+        return FilePublisher(path)
+    raise ValueError(f"Publisher desconhecido: {name}. Use: memory, file.")
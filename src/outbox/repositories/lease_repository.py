@@ -0,0 +1,76 @@
+from datetime import datetime
+
+from django.db import connection
+from django.db.models import Q
+from injector import singleton
+
+from src.outbox.models import OutboxPartitionLease, OutboxRelayWorker
+
+
+@singleton
+class OutboxLeaseRepository:
+    """Leases de partição e registro de workers do relay particionado."""
+
+    def ensure_partitions(self, partitions: int) -> None:
+        OutboxPartitionLease.objects.bulk_create(
+            [OutboxPartitionLease(partition=partition) for partition in range(partitions)], ignore_conflicts=True
+        )
+
+    def heartbeat(self, worker_id: str, now: datetime, stale_before: datetime) -> list[str]:
+        """Registra o worker como vivo, esquece os que pararam de bater e devolve os vivos."""
+        OutboxRelayWorker.objects.update_or_create(worker_id=worker_id, defaults={"heartbeat_at": now})
+        OutboxRelayWorker.objects.filter(heartbeat_at__lt=stale_before).delete()
+        return list(OutboxRelayWorker.objects.values_list("worker_id", flat=True))
+
+    def remove_worker(self, worker_id: str) -> None:
+        OutboxRelayWorker.objects.filter(worker_id=worker_id).delete()
+
+    def owned(self, worker_id: str, now: datetime) -> list[int]:
+        return list(
+            OutboxPartitionLease.objects.filter(owner=worker_id, expires_at__gt=now).values_list("partition", flat=True)
+        )
+
+    def acquire(self, worker_id: str, count: int, partitions: int, now: datetime, expires_at: datetime) -> list[int]:
+        """
+        Pega até count partições livres ou com lease vencido. Deve rodar dentro de transaction.atomic().
+        SKIP LOCKED: leases sendo renovados por outro worker (lote em andamento) ficam de fora.
+        """
+        if count <= 0:
+            return []
+        self._lock_on_sqlite()
+        free = list(
+            OutboxPartitionLease.objects.select_for_update(skip_locked=True)
+            .filter(Q(owner__isnull=True) | Q(expires_at__lte=now), partition__lt=partitions)
+            .order_by("partition")
+            .values_list("partition", flat=True)[:count]
+        )
+        OutboxPartitionLease.objects.filter(partition__in=free).update(owner=worker_id, expires_at=expires_at)
+        return free
+
+    def renew(self, worker_id: str, now: datetime, expires_at: datetime) -> list[int]:
+        """
+        Estende os leases ainda válidos do worker e devolve essas partições. Chamado na mesma transação
+        do claim: no PostgreSQL o UPDATE trava as linhas até o commit, então ninguém toma a partição
+        (acquire() só vê o lease vencido depois) enquanto o lote está sendo publicado.
+        """
+        OutboxPartitionLease.objects.filter(owner=worker_id, expires_at__gt=now).update(expires_at=expires_at)
+        return list(
+            OutboxPartitionLease.objects.filter(owner=worker_id, expires_at=expires_at).values_list(
+                "partition", flat=True
+            )
+        )
+
+    def release(self, worker_id: str, partitions: list[int]) -> int:
+        return OutboxPartitionLease.objects.filter(owner=worker_id, partition__in=partitions).update(
+            owner=None, expires_at=None
+        )
+
+    def release_all(self, worker_id: str) -> int:
+        return OutboxPartitionLease.objects.filter(owner=worker_id).update(owner=None, expires_at=None)
+
+    @staticmethod
+    def _lock_on_sqlite() -> None:
+        # Mesmo truque de OutboxRepository: sem FOR UPDATE, pega o lock de escrita antes de ler
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute(f"UPDATE {OutboxPartitionLease._meta.db_table} SET owner = owner WHERE 0")
@@ -1,14 +1,107 @@
+from datetime import datetime
+from typing import Callable, Optional
+from uuid import UUID
+
+from django.db import connection, transaction
 from injector import singleton
 
+from src.outbox.dispatcher import OutboxDispatcher
 from src.outbox.models import OutboxEvent, OutboxEventStatus
+from src.outbox.partitioning import partition_for
 
 
 @singleton
 class OutboxRepository:
+    def __init__(self, dispatcher: Optional[OutboxDispatcher] = None, partitions: int = 64):
+        # Sem dispatcher (ex.: comandos, testes) os eventos saem só pelo relay por polling
+        self._dispatcher = dispatcher
+        self._partitions = partitions
+
+    def dispatch_on_commit(self, events: list[OutboxEvent]) -> None:
+        """Agenda o dispatch imediato de eventos gravados - chamado por quem insere fora de create()."""
+        if self._dispatcher is not None and events:
+            event_ids = [event.id for event in events]
+            # robust: falha no dispatch nunca afeta a requisição que já commitou
+            transaction.on_commit(lambda: self._dispatcher.dispatch(event_ids), robust=True)
+
+    def build(self, event_type: str, payload: dict, partition_key: Optional[str] = None) -> OutboxEvent:
+        """Monta o evento sem persistir - usado pelo fluxo em lote."""
+        return OutboxEvent(
+            event_type=event_type,
+            payload=payload,
+            status=OutboxEventStatus.PENDING,
+            partition=self._partition(partition_key),
+        )
 
-    def create(self, event_type: str, payload: dict) -> OutboxEvent:
-        return OutboxEvent.objects.create(
+    def create(self, event_type: str, payload: dict, partition_key: Optional[str] = None) -> OutboxEvent:
+        event = OutboxEvent.objects.create(
             event_type=event_type,
             payload=payload,
             status=OutboxEventStatus.PENDING,
+            partition=self._partition(partition_key),
+        )
+        self.dispatch_on_commit([event])
+        return event
+
+    def bulk_create(self, events: list[OutboxEvent]) -> list[OutboxEvent]:
+        created = OutboxEvent.objects.bulk_create(events)
+        self.dispatch_on_commit(created)
+        return created
+
+    def claim_pending(self, batch_size: int, partitions: Optional[list[int]] = None) -> list[OutboxEvent]:
+        """
+        Trava e devolve até batch_size eventos pending, mais antigos primeiro.
+        PostgreSQL: SELECT ... FOR UPDATE SKIP LOCKED - relays em paralelo pegam lotes disjuntos.
+        SQLite (sem FOR UPDATE): um UPDATE vazio pega o lock de escrita do banco antes da leitura,
+        então relays concorrentes se serializam em vez de lerem o mesmo lote.
+        partitions restringe o claim às partições do worker (relay particionado).
+        Deve ser chamado dentro de transaction.atomic(); os locks valem até o commit.
+        """
+        queryset = self._pending_for_update()
+        if partitions is not None:
+            queryset = queryset.filter(partition__in=partitions)
+        return list(queryset.order_by("created_at", "id")[:batch_size])
+
+    def claim_by_ids(self, event_ids: list[UUID]) -> list[OutboxEvent]:
+        """
+        Como claim_pending(), mas só para os ids informados (dispatch pós-commit).
+        Ids já publicados ou travados por outro relay ficam de fora.
+        """
+        return list(self._pending_for_update().filter(id__in=event_ids).order_by("created_at"))
+
+    def archive_published_batch(
+        self, cutoff: datetime, batch_size: int, archive: Callable[[list[OutboxEvent]], None]
+    ) -> int:
+        """
+        Move até batch_size eventos published criados antes de cutoff: archive() recebe o lote e as
+        linhas saem de outbox_events na mesma transação curta. Linhas travadas são puladas (SKIP LOCKED).
+        Retorna quantos eventos foram arquivados - 0 quando não há mais nada antigo.
+        """
+        with transaction.atomic():
+            events = list(
+                OutboxEvent.objects.select_for_update(skip_locked=True)
+                .filter(status=OutboxEventStatus.PUBLISHED, created_at__lt=cutoff)
+                .order_by("created_at")[:batch_size]
+            )
+            if not events:
+                return 0
+            archive(events)
+            OutboxEvent.objects.filter(id__in=[event.id for event in events]).delete()
+        return len(events)
+
+    def _partition(self, partition_key: Optional[str]) -> int:
+        return 0 if partition_key is None else partition_for(partition_key, self._partitions)
+
+    @staticmethod
+    def _pending_for_update():
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute(f"UPDATE {OutboxEvent._meta.db_table} SET status = status WHERE 0")
+
+        return OutboxEvent.objects.select_for_update(skip_locked=True).filter(status=OutboxEventStatus.PENDING)
+
+    def mark_published(self, events: list[OutboxEvent], published_at: datetime) -> int:
+        """Marca o lote inteiro como publicado em um único UPDATE."""
+        return OutboxEvent.objects.filter(id__in=[event.id for event in events]).update(
+            status=OutboxEventStatus.PUBLISHED, published_at=published_at
         )
@@ -0,0 +1,84 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from src.outbox.partitioning import fair_share
+from src.outbox.repositories.lease_repository import OutboxLeaseRepository
+from src.outbox.services.relay_service import OutboxRelayService, RelayBatchResult, RelayStats
+
+logger = logging.getLogger(__name__)
+
+
+class PartitionedRelay:
+    """
+    Relay com ordem por agregado: cada partição tem um único dono por vez (lease), então os eventos
+    de um mesmo payment são publicados em sequência, enquanto partições diferentes andam em paralelo
+    em vários processos.
+
+    A cada lease_seconds/3 o worker bate o heartbeat e rebalanceia: com W workers vivos, cada um fica
+    com ~partitions/W partições - quem tem demais solta as sobras, quem tem de menos pega as livres ou
+    vencidas. Worker que sai (leave) solta tudo na hora; worker que morre perde os leases quando vencem.
+    Todo lote renova os leases na mesma transação do claim e só publica partições ainda suas.
+    Só garante a ordem se ninguém mais publica: o relay comum e o dispatch pós-commit (relay_ids)
+    ignoram os leases, por isso o relay_outbox --partitioned exige OUTBOX_DISPATCH_ON_COMMIT=false.
+    """
+
+    def __init__(
+        self,
+        relay: OutboxRelayService,
+        leases: OutboxLeaseRepository,
+        worker_id: str,
+        partitions: int,
+        lease_seconds: float = 15.0,
+    ):
+        if lease_seconds <= 0:
+            raise ValueError("lease_seconds deve ser maior que zero.")
+        self._relay = relay
+        self._leases = leases
+        self.worker_id = worker_id
+        self._partitions = partitions
+        self._lease = timedelta(seconds=lease_seconds)
+        self._rebalance_every = lease_seconds / 3
+        self._next_rebalance = 0.0
+        self._leases.ensure_partitions(partitions)
+
+    def rebalance(self) -> list[int]:
+        """Heartbeat + ajuste das partições deste worker à sua fatia justa; devolve as partições atuais."""
+        now = timezone.now()
+        with transaction.atomic():
+            workers = self._leases.heartbeat(self.worker_id, now, stale_before=now - self._lease)
+            share = fair_share(self._partitions, workers, self.worker_id)
+            owned = sorted(self._leases.owned(self.worker_id, now))
+            if len(owned) > share:
+                self._leases.release(self.worker_id, owned[share:])
+                owned = owned[:share]
+            elif len(owned) < share:
+                owned += self._leases.acquire(
+                    self.worker_id, share - len(owned), self._partitions, now, expires_at=now + self._lease
+                )
+
+        self._next_rebalance = time.monotonic() + self._rebalance_every
+        return sorted(owned)
+
+    def relay_batch(self, batch_size: int) -> RelayBatchResult:
+        if time.monotonic() >= self._next_rebalance:
+            self.rebalance()
+        return self._relay.relay_partitions(batch_size, owned=self._renew)
+
+    def run(self, batch_size: int, poll_interval: float, **options) -> RelayStats:
+        """OutboxRelayService.run() com os lotes restritos às partições deste worker."""
+        return self._relay.run(batch_size, poll_interval, step=self.relay_batch, **options)
+
+    def _renew(self) -> list[int]:
+        now = timezone.now()
+        return self._leases.renew(self.worker_id, now, expires_at=now + self._lease)
+
+    def leave(self) -> None:
+        """Saída graciosa: solta as partições para os outros workers sem esperar o lease vencer."""
+        with transaction.atomic():
+            released = self._leases.release_all(self.worker_id)
+            self._leases.remove_worker(self.worker_id)
+        logger.info("Worker %s saiu do relay particionado (%d partições liberadas)", self.worker_id, released)
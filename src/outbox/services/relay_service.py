@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable, Optional
+from uuid import UUID
+
+from django.db import transaction
+from django.utils import timezone
+from injector import inject, singleton
+
+from src.outbox.models import OutboxEvent
+from src.outbox.notify import PgNotifyWaker
+from src.outbox.publishers import OutboxPublisher
+from src.outbox.repositories.outbox_repository import OutboxRepository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RelayBatchResult:
+    published: int
+    max_lag: timedelta = timedelta(0)
+
+
+@dataclass
+class RelayStats:
+    """Acumulado de uma execução do relay: vazão e atraso (created_at -> publicação)."""
+
+    published: int = 0
+    batches: int = 0
+    failures: int = 0
+    max_lag: timedelta = timedelta(0)
+    started_at: float = field(default_factory=time.perf_counter)
+
+    def add(self, result: RelayBatchResult) -> None:
+        self.published += result.published
+        self.batches += 1
+        self.max_lag = max(self.max_lag, result.max_lag)
+
+    @property
+    def throughput(self) -> float:
+        elapsed = time.perf_counter() - self.started_at
+        return self.published / elapsed if elapsed else 0.0
+
+
+@singleton
+class OutboxRelayService:
+    """
+    Publica eventos pending do outbox.
+
+    Cada lote roda em uma transação: claim (SKIP LOCKED) -> publisher -> um UPDATE
+    marcando published. Se o publisher falhar, o rollback devolve o lote para pending.
+    Entrega at-least-once: se o commit falhar depois do publish, o lote é publicado de novo -
+    consumidores deduplicam pelo id do evento.
+    """
+
+    @inject
+    def __init__(self, repository: OutboxRepository, publisher: OutboxPublisher):
+        self._repository = repository
+        self._publisher = publisher
+
+    def relay_batch(self, batch_size: int) -> RelayBatchResult:
+        return self._relay(lambda: self._repository.claim_pending(batch_size))
+
+    def relay_ids(self, event_ids: list[UUID]) -> RelayBatchResult:
+        """Publica eventos específicos logo após o commit (OutboxDispatcher)."""
+        return self._relay(lambda: self._repository.claim_by_ids(event_ids))
+
+    def relay_partitions(self, batch_size: int, owned: Callable[[], list[int]]) -> RelayBatchResult:
+        """Lote restrito às partições que owned() confirma dentro da transação do claim (relay particionado)."""
+        return self._relay(lambda: self._repository.claim_pending(batch_size, partitions=owned()))
+
+    def _relay(self, claim: Callable[[], list[OutboxEvent]]) -> RelayBatchResult:
+        with transaction.atomic():
+            events = claim()
+            if not events:
+                return RelayBatchResult(published=0)
+
+            self._publisher.publish(events)
+            published_at = timezone.now()
+            self._repository.mark_published(events, published_at)
+
+        return RelayBatchResult(
+            published=len(events),
+            max_lag=published_at - min(event.created_at for event in events),
+        )
+
+    def run(
+        self,
+        batch_size: int,
+        poll_interval: float,
+        stop: Optional[threading.Event] = None,
+        drain: bool = False,
+        on_batch: Optional[Callable[[RelayBatchResult, RelayStats], None]] = None,
+        waker: Optional[PgNotifyWaker] = None,
+        step: Optional[Callable[[int], RelayBatchResult]] = None,
+    ) -> RelayStats:
+        """
+        Loop do relay: lotes seguidos enquanto houver eventos; sem eventos, espera poll_interval.
+        drain=True sai quando a fila esvazia (ou na primeira falha). Falhas do publisher são logadas
+        e o lote é tentado de novo após poll_interval. Com waker (LISTEN/NOTIFY), a espera termina
+        assim que chega um INSERT - poll_interval vira só o teto. step substitui relay_batch
+        (PartitionedRelay.relay_batch).
+        """
+        stop = stop or threading.Event()
+        step = step or self.relay_batch
+        stats = RelayStats()
+
+        def idle() -> None:
+            if stop.is_set():
+                return
+            if waker is not None:
+                waker.wait(poll_interval)
+            else:
+                stop.wait(poll_interval)
+
+        while not stop.is_set():
+            try:
+                result = step(batch_size)
+            except Exception:
+                stats.failures += 1
+                logger.exception("Falha ao publicar lote do outbox")
+                if drain:
+                    break
+                stop.wait(poll_interval)
+                continue
+
+            if result.published:
+                stats.add(result)
+                if on_batch:
+                    on_batch(result, stats)
+
+            if result.published < batch_size:
+                if drain:
+                    break
+                idle()
+
+        return stats
@@ -108,6 +108,102 @@ STATIC_URL = "static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"  # Mantive, mas estou usando UUID
 
+# Máximo de recebedores por pagamento: programas de afiliados/coprodução podem precisar de milhares
+MAX_SPLITS = int(os.environ.get("MAX_SPLITS", "5"))
+
+# Fonte das taxas da plataforma: "static" (padrões do código), "db" (tabela platform_rates) ou "file" (JSON).
+# Com "db"/"file" cada worker confere a versão a cada PLATFORM_RATES_RELOAD_SECONDS e troca sem restart.
+PLATFORM_RATES_SOURCE = os.environ.get("PLATFORM_RATES_SOURCE", "static")
+PLATFORM_RATES_FILE = os.environ.get("PLATFORM_RATES_FILE", str(BASE_DIR / "rates.json"))
+PLATFORM_RATES_RELOAD_SECONDS = float(os.environ.get("PLATFORM_RATES_RELOAD_SECONDS", "30"))
+
+# Cache LRU (por processo) do endpoint /quote
+QUOTE_CACHE_MAX_SIZE = int(os.environ.get("QUOTE_CACHE_MAX_SIZE", "4096"))
+
+# Planos de split pré-compilados (por processo). A captura confere a versão no banco a cada uso;
+# este prazo só limita o atraso das cotações (/quote) após um PUT feito em outro worker
+SPLIT_TEMPLATE_CACHE_SECONDS = float(os.environ.get("SPLIT_TEMPLATE_CACHE_SECONDS", "60"))
+
+# PostgreSQL: payment, ledger, outbox e conclusão da idempotência de uma captura em um único statement
+# (CTEs), em vez de um round trip por tabela. Sem efeito no SQLite.
+PAYMENT_CAPTURE_SINGLE_STATEMENT = os.environ.get("PAYMENT_CAPTURE_SINGLE_STATEMENT", "True").lower() in ("true", "1")
+
+# PostgreSQL: payments e ledger_entries particionadas por mês de created_at (UTC). create_partitions cria
+# PARTITION_MONTHS_AHEAD meses à frente (rodar em cron); detach_partitions tira da tabela-mãe as partições
+# com mais de PARTITION_RETENTION_MONTHS meses.
+PARTITION_MONTHS_AHEAD = int(os.environ.get("PARTITION_MONTHS_AHEAD", "3"))
+PARTITION_RETENTION_MONTHS = int(os.environ.get("PARTITION_RETENTION_MONTHS", "24"))
+
+# Rollups de receita (rollup_revenue): só soma linhas com created_at anterior a agora - SETTLE_SECONDS,
+# folga maior que a transação de captura mais longa (created_at é gravado antes do commit).
+# Cada passo cobre no máximo MAX_WINDOW_HOURS. Os buckets diários seguem ROLLUP_TIME_ZONE.
+ROLLUP_SETTLE_SECONDS = float(os.environ.get("ROLLUP_SETTLE_SECONDS", "120"))
+ROLLUP_POLL_SECONDS = float(os.environ.get("ROLLUP_POLL_SECONDS", "30"))
+ROLLUP_MAX_WINDOW_HOURS = float(os.environ.get("ROLLUP_MAX_WINDOW_HOURS", "24"))
+ROLLUP_TIME_ZONE = os.environ.get("ROLLUP_TIME_ZONE", TIME_ZONE)
+
+# Cache de replays de idempotência: "local" (LRU por processo), "django" (backend de CACHES,
+# compartilhado entre workers) ou "none". Só recebe respostas já commitadas.
+IDEMPOTENCY_REPLAY_CACHE = os.environ.get("IDEMPOTENCY_REPLAY_CACHE", "local")
+IDEMPOTENCY_REPLAY_CACHE_ALIAS = os.environ.get("IDEMPOTENCY_REPLAY_CACHE_ALIAS", "default")
+IDEMPOTENCY_REPLAY_CACHE_MAX_SIZE = int(os.environ.get("IDEMPOTENCY_REPLAY_CACHE_MAX_SIZE", "10000"))
+IDEMPOTENCY_REPLAY_CACHE_SECONDS = float(os.environ.get("IDEMPOTENCY_REPLAY_CACHE_SECONDS", "86400"))
+
+# Cache do GET /payments/{id}: "django" (backend de CACHES, read-through) ou "none". Pagamento capturado
+# é imutável - o TTL só limita memória. Sem CACHES configurado o Django usa LocMemCache (por processo): a
+# invalidação de billing/signals.py só alcança os outros workers com um backend compartilhado.
+PAYMENT_DETAIL_CACHE = os.environ.get("PAYMENT_DETAIL_CACHE", "django")
+PAYMENT_DETAIL_CACHE_ALIAS = os.environ.get("PAYMENT_DETAIL_CACHE_ALIAS", "default")
+PAYMENT_DETAIL_CACHE_SECONDS = float(os.environ.get("PAYMENT_DETAIL_CACHE_SECONDS", "86400"))
+
+# Retenção dos registros de idempotência (respostas de replay). Depois do purge, repetir a chave não cria
+# outro pagamento: a resposta é remontada do pagamento gravado (ou 409, se o payload for outro).
+# O purge (python manage.py purge_idempotency) apaga em lotes com pausa entre eles.
+IDEMPOTENCY_RETENTION_HOURS = float(os.environ.get("IDEMPOTENCY_RETENTION_HOURS", "72"))
+IDEMPOTENCY_PURGE_BATCH_SIZE = int(os.environ.get("IDEMPOTENCY_PURGE_BATCH_SIZE", "1000"))
+IDEMPOTENCY_PURGE_PAUSE_SECONDS = float(os.environ.get("IDEMPOTENCY_PURGE_PAUSE_SECONDS", "0.1"))
+
+# Grava a resposta de replay em binário compacto e comprimido (response_blob) em vez do JSON.
+# Leituras entendem os dois formatos; ligar só depois que todos os workers rodarem esta versão.
+IDEMPOTENCY_COMPACT_RESPONSES = os.environ.get("IDEMPOTENCY_COMPACT_RESPONSES", "False").lower() in ("true", "1")
+
+# Algoritmo do hash de payload da idempotência ("blake2b" ou "sha256"). O hash gravado leva o
+# prefixo da versão/algoritmo, então trocar o algoritmo não invalida registros existentes.
+IDEMPOTENCY_HASH_ALGORITHM = os.environ.get("IDEMPOTENCY_HASH_ALGORITHM", "blake2b")
+
+# Duplicatas concorrentes da mesma Idempotency-Key esperam o líder por até IDEMPOTENCY_WAIT_TIMEOUT_SECONDS
+# e depois recebem 409: no mesmo processo pelo Future do líder (IDEMPOTENCY_COALESCING), entre processos no
+# lock da chave durante o claim (lock_timeout da transação no PostgreSQL; no SQLite, o timeout do banco).
+IDEMPOTENCY_COALESCING = os.environ.get("IDEMPOTENCY_COALESCING", "True").lower() in ("true", "1")
+IDEMPOTENCY_WAIT_TIMEOUT_SECONDS = float(os.environ.get("IDEMPOTENCY_WAIT_TIMEOUT_SECONDS", "5"))
+
+# Relay do outbox (python manage.py relay_outbox): publisher "file" (JSON lines, stand-in local
+# do broker) ou "memory"; lotes de OUTBOX_RELAY_BATCH_SIZE e espera de OUTBOX_RELAY_POLL_SECONDS sem eventos.
+OUTBOX_PUBLISHER = os.environ.get("OUTBOX_PUBLISHER", "file")
+OUTBOX_PUBLISHER_FILE = os.environ.get("OUTBOX_PUBLISHER_FILE", str(BASE_DIR / "outbox_events.jsonl"))
+OUTBOX_RELAY_BATCH_SIZE = int(os.environ.get("OUTBOX_RELAY_BATCH_SIZE", "500"))
+OUTBOX_RELAY_POLL_SECONDS = float(os.environ.get("OUTBOX_RELAY_POLL_SECONDS", "1"))
+
+# Publicação imediata: após o commit, os ids novos vão para um pool de OUTBOX_DISPATCH_WORKERS threads
+# (no máximo OUTBOX_DISPATCH_MAX_PENDING lotes na fila). O relay por polling continua como rede de segurança.
+OUTBOX_DISPATCH_ON_COMMIT = os.environ.get("OUTBOX_DISPATCH_ON_COMMIT", "True").lower() in ("true", "1")
+OUTBOX_DISPATCH_WORKERS = int(os.environ.get("OUTBOX_DISPATCH_WORKERS", "4"))
+OUTBOX_DISPATCH_MAX_PENDING = int(os.environ.get("OUTBOX_DISPATCH_MAX_PENDING", "1000"))
+
+# Relay particionado (relay_outbox --partitioned): eventos vão para partition_for(payment_id) entre
+# OUTBOX_PARTITIONS partições, cada uma com um único worker dono por OUTBOX_LEASE_SECONDS (renovado a cada
+# lote). Mudar OUTBOX_PARTITIONS muda o mapeamento - só com o outbox drenado.
+OUTBOX_PARTITIONS = int(os.environ.get("OUTBOX_PARTITIONS", "64"))
+OUTBOX_LEASE_SECONDS = float(os.environ.get("OUTBOX_LEASE_SECONDS", "15"))
+
+# Arquivamento (python manage.py archive_outbox): published com mais de OUTBOX_ARCHIVE_AFTER_DAYS saem de
+# outbox_events para outbox_events_archive ("table") ou para um JSON lines gzip local ("file"), em lotes.
+OUTBOX_ARCHIVE_AFTER_DAYS = float(os.environ.get("OUTBOX_ARCHIVE_AFTER_DAYS", "7"))
+OUTBOX_ARCHIVE_TARGET = os.environ.get("OUTBOX_ARCHIVE_TARGET", "table")
+OUTBOX_ARCHIVE_FILE = os.environ.get("OUTBOX_ARCHIVE_FILE", str(BASE_DIR / "outbox_archive.jsonl.gz"))
+OUTBOX_ARCHIVE_BATCH_SIZE = int(os.environ.get("OUTBOX_ARCHIVE_BATCH_SIZE", "1000"))
+OUTBOX_ARCHIVE_PAUSE_SECONDS = float(os.environ.get("OUTBOX_ARCHIVE_PAUSE_SECONDS", "0.1"))
+
 # Django REST Framework
 REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": [
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _no_outbox_dispatch(settings):
+    # O dispatch pós-commit publicaria de uma thread do pool, fora da transação do teste
+    settings.OUTBOX_DISPATCH_ON_COMMIT = False
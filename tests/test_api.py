@@ -249,3 +249,25 @@ class TestBusinessValidation:
         response = _post(client, _make_payload(splits=[]), key="val-empty-splits")
 
         assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestInstallmentSimulationEndpoint:
+    """GET /api/v1/installments devolve todas as opções de parcelamento."""
+
+    def test_returns_all_options(self, client):
+        response = client.get("/api/v1/installments", {"amount": "297.00"})
+
+        assert response.status_code == 200
+        options = response.json()["options"]
+        assert len(options) == 12
+        assert options[2]["installments"] == 3
+        assert options[2]["platform_fee_amount"] == "26.70"
+        assert options[2]["net_amount"] == "270.30"
+        assert options[2]["installment_amount"] == "99.00"
+
+    def test_invalid_amount_returns_400(self, client):
+        response = client.get("/api/v1/installments", {"amount": "0"})
+
+        assert response.status_code == 400
+        assert "amount" in response.json()
@@ -0,0 +1,145 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from src.billing.constants import CURRENCY_BRL
+from src.billing.models import LedgerEntry, Payment
+from src.idempotency.models import IdempotencyRecord
+from src.idempotency.repositories import IdempotencyRepository
+from src.idempotency.services import IdempotencyService
+from src.outbox.models import OutboxEvent
+
+ENDPOINT = "/api/v1/payments/batch"
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+def _make_item(key, **overrides):
+    """Item base válido para o endpoint em lote."""
+    base = {
+        "idempotency_key": key,
+        "amount": "297.00",
+        "currency": CURRENCY_BRL,
+        "payment_method": "card",
+        "installments": 3,
+        "splits": [
+            {"recipient_id": "producer_1", "role": "producer", "percent": 70},
+            {"recipient_id": "affiliate_9", "role": "affiliate", "percent": 30},
+        ],
+    }
+    base.update(overrides)
+    return base
+
+
+def _post(client, items):
+    return client.post(ENDPOINT, {"payments": items}, format="json")
+
+
+@pytest.mark.django_db
+class TestPaymentBatchEndpoint:
+    """Testes de integração do endpoint POST /api/v1/payments/batch."""
+
+    def test_batch_success(self, client):
+        response = _post(client, [_make_item("batch-1"), _make_item("batch-2", amount="100.00", installments=1)])
+
+        assert response.status_code == 207
+        results = response.json()["results"]
+        assert [r["status"] for r in results] == [201, 201]
+        assert results[0]["payment"]["net_amount"] == "270.30"
+        assert results[1]["payment"]["platform_fee_amount"] == "3.99"
+
+        assert Payment.objects.count() == 2
+        assert LedgerEntry.objects.count() == 4
+        assert OutboxEvent.objects.count() == 2
+        assert IdempotencyRecord.objects.filter(status="completed").count() == 2
+
+    def test_ledger_matches_single_endpoint(self, client):
+        response = _post(client, [_make_item("batch-ledger")])
+        payment_id = response.json()["results"][0]["payment"]["payment_id"]
+
+        amounts = {e.recipient_id: str(e.amount) for e in LedgerEntry.objects.filter(payment_id=payment_id)}
+        assert amounts == {"producer_1": "189.21", "affiliate_9": "81.09"}
+
+    def test_per_item_errors_do_not_abort_batch(self, client):
+        items = [
+            _make_item("batch-ok"),
+            _make_item("batch-business", currency="USD"),
+            _make_item("batch-structure", amount="abc"),
+        ]
+
+        results = _post(client, items).json()["results"]
+
+        assert [r["status"] for r in results] == [201, 400, 400]
+        assert "currency" in results[1]["errors"]
+        assert "amount" in results[2]["errors"]
+        assert Payment.objects.count() == 1
+
+    def test_replay_and_conflict_with_existing_key(self, client):
+        first = _post(client, [_make_item("batch-replay")]).json()["results"][0]
+
+        results = _post(client, [_make_item("batch-replay"), _make_item("batch-replay-2")]).json()["results"]
+        assert results[0]["status"] == 201
+        assert results[0]["payment"]["payment_id"] == first["payment"]["payment_id"]
+
+        conflict = _post(client, [_make_item("batch-replay", amount="1.00")]).json()["results"][0]
+        assert conflict["status"] == 409
+        assert Payment.objects.count() == 2
+
+    def test_replay_of_single_endpoint_key(self, client):
+        item = _make_item("single-then-batch")
+        single = client.post(
+            "/api/v1/payments",
+            {k: v for k, v in item.items() if k != "idempotency_key"},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="single-then-batch",
+        )
+
+        result = _post(client, [item]).json()["results"][0]
+
+        assert result["status"] == 201
+        assert result["payment"]["payment_id"] == single.json()["payment_id"]
+
+    def test_duplicate_key_inside_batch(self, client):
+        items = [_make_item("batch-dup"), _make_item("batch-dup"), _make_item("batch-dup", amount="5.00")]
+
+        results = _post(client, items).json()["results"]
+
+        assert [r["status"] for r in results] == [201, 201, 409]
+        assert results[0]["payment"]["payment_id"] == results[1]["payment"]["payment_id"]
+        assert Payment.objects.count() == 1
+
+    def test_key_inserted_concurrently_is_409_only_for_that_item(self, client, monkeypatch):
+        check_many = IdempotencyService.check_many
+
+        def check_then_race(service, payload_hashes):
+            checks = check_many(service, payload_hashes)
+            # Outra requisição grava a mesma chave entre o SELECT FOR UPDATE e o INSERT do lote
+            IdempotencyRepository().create("batch-race", "other-hash")
+            return checks
+
+        monkeypatch.setattr(IdempotencyService, "check_many", check_then_race)
+
+        results = _post(client, [_make_item("batch-ok"), _make_item("batch-race")]).json()["results"]
+
+        assert [r["status"] for r in results] == [201, 409]
+        assert "concorrente" in results[1]["errors"]["detail"]
+        assert list(Payment.objects.values_list("idempotency_key", flat=True)) == ["batch-ok"]
+        assert LedgerEntry.objects.count() == 2
+        assert OutboxEvent.objects.count() == 1
+
+    def test_query_count_does_not_grow_with_batch_size(self, client):
+        with CaptureQueriesContext(connection) as small:
+            _post(client, [_make_item(f"small-{i}") for i in range(2)])
+        with CaptureQueriesContext(connection) as large:
+            _post(client, [_make_item(f"large-{i}") for i in range(20)])
+
+        assert len(large.captured_queries) == len(small.captured_queries)
+
+    def test_empty_batch_returns_400(self, client):
+        response = _post(client, [])
+
+        assert response.status_code == 400
@@ -0,0 +1,30 @@
+from src.common.batching import run_in_batches
+
+
+class TestRunInBatches:
+    """Loop compartilhado por purge_idempotency e archive_outbox."""
+
+    def test_stops_on_short_batch_and_reports_progress(self):
+        remaining = [5]
+        progress = []
+
+        def process(batch_size: int) -> int:
+            done = min(batch_size, remaining[0])
+            remaining[0] -= done
+            return done
+
+        run = run_in_batches(process, 2, 0, on_batch=lambda n, run: progress.append((n, run.rows, run.batches)))
+
+        assert (run.rows, run.batches) == (5, 3)
+        assert progress == [(2, 2, 1), (2, 4, 2), (1, 5, 3)]
+
+    def test_max_batches_and_empty_first_batch(self):
+        calls = []
+
+        def process(batch_size: int) -> int:
+            calls.append(batch_size)
+            return batch_size
+
+        assert run_in_batches(process, 10, 0, max_batches=2).rows == 20
+        assert len(calls) == 2
+        assert run_in_batches(lambda batch_size: 0, 10, 0).batches == 0
@@ -1,11 +1,14 @@
-from decimal import Decimal
+import random
+from decimal import ROUND_HALF_UP, Decimal
 
 import pytest
 from injector import Injector
 
-from src.billing.constants import PAYMENT_METHOD_CARD, PAYMENT_METHOD_PIX
+from src.billing.constants import MAX_INSTALLMENTS, MIN_INSTALLMENTS, PAYMENT_METHOD_CARD, PAYMENT_METHOD_PIX
 from src.billing.di import BillingModule
+from src.billing.rates import PlatformRates
 from src.billing.services.fee_calculator import FeeCalculator
+from src.common.money import Money
 
 
 @pytest.fixture
@@ -18,11 +21,11 @@ class TestFeeCalculatorPix:
     """PIX deve ter taxa zero independente do valor."""
 
     def test_pix_zero_fee(self, fee_calculator):
-        fee = fee_calculator.calculate(Decimal("150.00"), PAYMENT_METHOD_PIX, 1)
+        fee = fee_calculator.calculate(Money.from_decimal(Decimal("150.00")), PAYMENT_METHOD_PIX, 1)
         assert fee == Decimal("0.00")
 
     def test_pix_high_value_still_zero(self, fee_calculator):
-        fee = fee_calculator.calculate(Decimal("99999.99"), PAYMENT_METHOD_PIX, 1)
+        fee = fee_calculator.calculate(Money.from_decimal(Decimal("99999.99")), PAYMENT_METHOD_PIX, 1)
         assert fee == Decimal("0.00")
 
 
@@ -31,27 +34,65 @@ class TestFeeCalculatorCard:
 
     def test_card_1x(self, fee_calculator):
         # 100.00 * 3.99% = 3.99
-        fee = fee_calculator.calculate(Decimal("100.00"), PAYMENT_METHOD_CARD, 1)
+        fee = fee_calculator.calculate(Money.from_decimal(Decimal("100.00")), PAYMENT_METHOD_CARD, 1)
         assert fee == Decimal("3.99")
 
     def test_card_2x(self, fee_calculator):
         # 100.00 * (4.99% + 2%) = 6.99
-        fee = fee_calculator.calculate(Decimal("100.00"), PAYMENT_METHOD_CARD, 2)
+        fee = fee_calculator.calculate(Money.from_decimal(Decimal("100.00")), PAYMENT_METHOD_CARD, 2)
         assert fee == Decimal("6.99")
 
     def test_card_3x_example_from_spec(self, fee_calculator):
         """Exemplo do PDF: R$297.00 CARD 3x → taxa = R$26.70"""
         # 297.00 * (4.99% + 4%) = 297.00 * 8.99% = 26.7003 → 26.70
-        fee = fee_calculator.calculate(Decimal("297.00"), PAYMENT_METHOD_CARD, 3)
+        fee = fee_calculator.calculate(Money.from_decimal(Decimal("297.00")), PAYMENT_METHOD_CARD, 3)
         assert fee == Decimal("26.70")
 
     def test_card_12x(self, fee_calculator):
         # 100.00 * (4.99% + 22%) = 26.99
-        fee = fee_calculator.calculate(Decimal("100.00"), PAYMENT_METHOD_CARD, 12)
+        fee = fee_calculator.calculate(Money.from_decimal(Decimal("100.00")), PAYMENT_METHOD_CARD, 12)
         assert fee == Decimal("26.99")
 
     def test_card_rounding_half_up(self, fee_calculator):
         """Garante ROUND_HALF_UP: 0.005 arredonda para 0.01, não para 0.00."""
         # 1.00 * 3.99% = 0.0399 → 0.04 (ROUND_HALF_UP)
-        fee = fee_calculator.calculate(Decimal("1.00"), PAYMENT_METHOD_CARD, 1)
+        fee = fee_calculator.calculate(Money.from_decimal(Decimal("1.00")), PAYMENT_METHOD_CARD, 1)
         assert fee == Decimal("0.04")
+
+    def test_matches_decimal_reference(self, fee_calculator):
+        """Aritmética inteira contra a fórmula original: Decimal * taxa, quantize com ROUND_HALF_UP."""
+        rng = random.Random(6)
+        rates = PlatformRates()
+
+        for _ in range(5000):
+            gross = Decimal(rng.randint(1, 10_000_000)) / 100
+            method = rng.choice((PAYMENT_METHOD_PIX, PAYMENT_METHOD_CARD))
+            installments = 1 if method == PAYMENT_METHOD_PIX else rng.randint(MIN_INSTALLMENTS, MAX_INSTALLMENTS)
+
+            expected = (gross * rates.get_rate(method, installments)).quantize(Decimal("0.01"), ROUND_HALF_UP)
+            assert fee_calculator.calculate(Money.from_decimal(gross), method, installments) == expected
+
+
+class TestFeeCalculatorAllInstallments:
+    """Simulação de 1x a 12x em uma passada deve bater com calculate() opção a opção."""
+
+    def test_matches_single_calculation(self, fee_calculator):
+        gross = Money.from_decimal(Decimal("297.00"))
+
+        options = fee_calculator.calculate_all_installments(gross)
+
+        assert [o["installments"] for o in options] == list(range(MIN_INSTALLMENTS, MAX_INSTALLMENTS + 1))
+        for option in options:
+            expected_fee = fee_calculator.calculate(gross, PAYMENT_METHOD_CARD, option["installments"])
+            assert option["platform_fee_amount"] == expected_fee
+            assert option["net_amount"] == gross - expected_fee
+
+    def test_installment_amount(self, fee_calculator):
+        options = {
+            o["installments"]: o
+            for o in fee_calculator.calculate_all_installments(Money.from_decimal(Decimal("100.00")))
+        }
+
+        assert options[1]["installment_amount"] == Decimal("100.00")
+        assert options[3]["installment_amount"] == Decimal("33.33")
+        assert options[12]["platform_fee_amount"] == Decimal("26.99")
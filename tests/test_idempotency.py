@@ -0,0 +1,377 @@
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+from injector import Injector
+
+from src.billing.constants import CURRENCY_BRL
+from src.billing.di import BillingModule
+from src.billing.models import Payment
+from src.billing.services.payment_service import PaymentService
+from src.common.exceptions import ConflictError
+from src.idempotency.cache import DjangoReplayCache, LocalReplayCache, ReplayCache
+from src.idempotency.coalescing import InFlightRequests
+from src.idempotency.hashing import PayloadHasher
+from src.idempotency.models import IdempotencyRecord, IdempotencyStatus
+from src.idempotency.repositories import IdempotencyRepository
+from src.idempotency.services import IdempotencyService
+
+PAYLOAD = {
+    "amount": "297.00",
+    "currency": CURRENCY_BRL,
+    "payment_method": "card",
+    "installments": 3,
+    "splits": [
+        {"recipient_id": "producer_1", "role": "producer", "percent": 70},
+        {"recipient_id": "affiliate_9", "role": "affiliate", "percent": 30},
+    ],
+}
+
+
+@pytest.fixture
+def injector():
+    return Injector([BillingModule])
+
+
+@pytest.fixture
+def payment_service(injector):
+    return injector.get(PaymentService)
+
+
+class TestLocalReplayCache:
+    def test_hit_requires_same_payload_hash(self):
+        cache = LocalReplayCache()
+        cache.set("k1", "hash-a", {"payment_id": "p1"})
+
+        assert cache.get("k1", "hash-a") == {"payment_id": "p1"}
+        assert cache.get("k1", "hash-b") is None
+
+    def test_evicts_least_recently_used(self):
+        cache = LocalReplayCache(max_size=2)
+        cache.set("k1", "h", {"n": 1})
+        cache.set("k2", "h", {"n": 2})
+        cache.get("k1", "h")
+        cache.set("k3", "h", {"n": 3})
+
+        assert cache.get("k2", "h") is None
+        assert cache.get("k1", "h") == {"n": 1}
+
+    def test_expired_entry_is_a_miss(self):
+        cache = LocalReplayCache(ttl=0)
+        cache.set("k1", "h", {"n": 1})
+
+        assert cache.get("k1", "h") is None
+
+    def test_disabled_cache_never_hits(self):
+        cache = ReplayCache()
+        cache.set("k1", "h", {"n": 1})
+
+        assert cache.get("k1", "h") is None
+
+
+class TestDjangoReplayCache:
+    def test_round_trip_through_django_cache(self):
+        cache = DjangoReplayCache(alias="default")
+        try:
+            cache.set_many([("chave com espaços" * 20, "h", {"n": 1})])
+
+            assert cache.get("chave com espaços" * 20, "h") == {"n": 1}
+            assert cache.get("chave com espaços" * 20, "outro") is None
+        finally:
+            caches["default"].clear()
+
+
+@pytest.mark.django_db
+class TestIdempotencyClaim:
+    def test_new_key_is_claimed_in_one_query(self, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            record, created = IdempotencyRepository().claim("claim-1", "hash-a")
+
+        assert created is True
+        assert record.key == "claim-1"
+        assert record.status == IdempotencyStatus.PROCESSING
+
+    def test_existing_key_returns_stored_row_in_one_query(self, django_assert_num_queries):
+        repository = IdempotencyRepository()
+        first, _ = repository.claim("claim-2", "hash-a")
+        repository.mark_completed(first, {"payment_id": "p1"})
+
+        with django_assert_num_queries(1):
+            record, created = repository.claim("claim-2", "hash-b")
+
+        assert created is False
+        assert record.id == first.id
+        assert record.payload_hash == "hash-a"
+        assert record.status == IdempotencyStatus.COMPLETED
+        assert record.response_data == {"payment_id": "p1"}
+
+    def test_check_uses_claim(self, injector):
+        service = injector.get(IdempotencyService)
+        service.save_response(service.check("claim-3", "hash-a").record, {"payment_id": "p1"})
+
+        assert service.check("claim-3", "hash-a").cached_response == {"payment_id": "p1"}
+        assert service.check("claim-3", "hash-b").is_conflict is True
+
+
+@pytest.mark.django_db
+class TestReplayCacheInPaymentService:
+    def test_replay_after_commit_skips_database(
+        self, payment_service, django_capture_on_commit_callbacks, django_assert_num_queries
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            first = payment_service.process(PAYLOAD, "replay-1")
+
+        with django_assert_num_queries(0):
+            replay = payment_service.process(PAYLOAD, "replay-1")
+
+        assert replay["payment_id"] == first["payment_id"]
+        assert replay["net_amount"] == "270.30"
+
+    def test_cache_is_not_filled_before_commit(self, payment_service, injector, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=False):
+            payment_service.process(PAYLOAD, "replay-2")
+
+        assert injector.get(ReplayCache).get("replay-2", injector.get(IdempotencyService).hash_payload(PAYLOAD)) is None
+
+    def test_db_replay_warms_cache(self, payment_service, injector, django_capture_on_commit_callbacks):
+        payment_service.process(PAYLOAD, "replay-3")  # sem commit: só o banco tem a resposta
+
+        with django_capture_on_commit_callbacks(execute=True):
+            payment_service.process(PAYLOAD, "replay-3")
+
+        assert (
+            injector.get(ReplayCache).get("replay-3", injector.get(IdempotencyService).hash_payload(PAYLOAD))
+            is not None
+        )
+
+    def test_different_payload_still_conflicts(self, payment_service, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            payment_service.process(PAYLOAD, "replay-4")
+
+        with pytest.raises(ConflictError):
+            payment_service.process({**PAYLOAD, "amount": "100.00"}, "replay-4")
+
+    def test_batch_replay_skips_database(
+        self, payment_service, django_capture_on_commit_callbacks, django_assert_num_queries
+    ):
+        items = [("batch-1", PAYLOAD), ("batch-2", {**PAYLOAD, "amount": "100.00"})]
+        with django_capture_on_commit_callbacks(execute=True):
+            first = payment_service.process_many(items)
+
+        with django_assert_num_queries(0):
+            replay = payment_service.process_many(items)
+
+        assert [r["response"]["payment_id"] for r in replay] == [r["response"]["payment_id"] for r in first]
+
+
+class TestInFlightRequests:
+    def _run_concurrently(self, in_flight, compute, followers=3, payload_hash="h"):
+        """Líder bloqueado em compute; seguidores entram enquanto ele está em andamento."""
+        started, release = threading.Event(), threading.Event()
+        outcomes = []
+
+        def leader_compute():
+            started.set()
+            release.wait(2)
+            return compute()
+
+        def call(fn, hash_):
+            try:
+                outcomes.append(in_flight.run("k1", hash_, fn))
+            except Exception as exc:
+                outcomes.append(exc)
+
+        leader = threading.Thread(target=call, args=(leader_compute, "h"))
+        leader.start()
+        started.wait(2)
+        threads = [threading.Thread(target=call, args=(compute, payload_hash)) for _ in range(followers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)  # seguidores já bloqueados no Future do líder (ou já expirados)
+        release.set()
+        for thread in [leader, *threads]:
+            thread.join(3)
+        return outcomes
+
+    def test_followers_share_leader_response(self):
+        calls = []
+        outcomes = self._run_concurrently(InFlightRequests(), lambda: calls.append(1) or {"payment_id": "p1"})
+
+        assert outcomes == [{"payment_id": "p1"}] * 4
+        assert len(calls) == 1
+
+    def test_followers_receive_leader_exception(self):
+        def failing():
+            raise ConflictError("boom")
+
+        outcomes = self._run_concurrently(InFlightRequests(), failing)
+
+        assert len(outcomes) == 4
+        assert all(isinstance(outcome, ConflictError) for outcome in outcomes)
+
+    def test_follower_times_out_with_conflict(self):
+        in_flight = InFlightRequests(wait_timeout=0.01)
+        outcomes = self._run_concurrently(in_flight, lambda: {"payment_id": "p1"}, followers=1)
+
+        assert isinstance(outcomes[0], ConflictError)
+        assert outcomes[1] == {"payment_id": "p1"}
+        assert len(in_flight) == 0
+
+    def test_different_payload_does_not_coalesce(self):
+        calls = []
+        outcomes = self._run_concurrently(
+            InFlightRequests(), lambda: calls.append(1) or {"n": len(calls)}, followers=1, payload_hash="outro"
+        )
+
+        assert len(outcomes) == 2
+        assert len(calls) == 2
+
+    def test_disabled_always_computes(self):
+        in_flight = InFlightRequests(enabled=False)
+
+        assert in_flight.run("k1", "h", lambda: {"n": 1}) == {"n": 1}
+        assert len(in_flight) == 0
+
+
+@pytest.mark.django_db
+class TestInProgressKey:
+    def test_process_returns_409_instead_of_recomputing(self, injector, payment_service):
+        IdempotencyRepository().create("wait-2", injector.get(IdempotencyService).hash_payload(PAYLOAD))
+
+        with pytest.raises(ConflictError, match="em processamento"):
+            payment_service.process(PAYLOAD, "wait-2")
+
+        assert not Payment.objects.filter(idempotency_key="wait-2").exists()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="lock_timeout é do PostgreSQL")
+class TestClaimLockTimeout:
+    def test_uncommitted_claim_is_409_after_lock_timeout(self, injector):
+        claimed, release = threading.Event(), threading.Event()
+
+        def leader():
+            with transaction.atomic():
+                IdempotencyRepository().claim("locked-1", "hash-a")
+                claimed.set()
+                release.wait(5)
+            connection.close()
+
+        thread = threading.Thread(target=leader)
+        thread.start()
+        claimed.wait(5)
+        service = IdempotencyService(
+            IdempotencyRepository(lock_timeout=0.05), injector.get(ReplayCache), injector.get(PayloadHasher)
+        )
+        try:
+            started = time.perf_counter()
+            with pytest.raises(ConflictError, match="em processamento"):
+                with transaction.atomic():
+                    service.check("locked-1", "hash-a")
+            elapsed = time.perf_counter() - started
+        finally:
+            release.set()
+            thread.join()
+
+        assert elapsed < 1
+
+
+@pytest.mark.django_db
+class TestPurgeIdempotency:
+    def _seed(self, expired: int, recent: int) -> None:
+        repository = IdempotencyRepository()
+        for i in range(expired + recent):
+            repository.create(f"purge-{i}", "hash")
+        old = IdempotencyRecord.objects.order_by("key").values_list("id", flat=True)[:expired]
+        IdempotencyRecord.objects.filter(id__in=list(old)).update(created_at=timezone.now() - timedelta(days=10))
+
+    def test_deletes_only_expired_rows_in_batches(self):
+        self._seed(expired=5, recent=3)
+        out = StringIO()
+
+        call_command("purge_idempotency", "--retention-hours", "72", "--batch-size", "2", "--pause", "0", stdout=out)
+
+        assert IdempotencyRecord.objects.count() == 3
+        assert "lote 3: 1 linhas" in out.getvalue()
+        assert "5 registros" in out.getvalue()
+        assert "linhas/s" in out.getvalue()
+
+    def test_max_batches_stops_early(self):
+        self._seed(expired=5, recent=0)
+
+        call_command("purge_idempotency", "--batch-size", "2", "--pause", "0", "--max-batches", "1", stdout=StringIO())
+
+        assert IdempotencyRecord.objects.count() == 3
+
+    def test_batch_returns_zero_when_nothing_expired(self):
+        self._seed(expired=0, recent=2)
+
+        assert IdempotencyRepository().delete_expired_batch(timezone.now() - timedelta(hours=1), 100) == 0
+
+
+@pytest.mark.django_db
+class TestRetryAfterPurge:
+    """Registro apagado pela retenção: a chave repetida não cria outro pagamento."""
+
+    @staticmethod
+    def _capture_and_purge(key: str) -> dict:
+        response = Injector([BillingModule]).get(PaymentService).process(PAYLOAD, key)
+        call_command("purge_idempotency", "--retention-hours", "0", "--pause", "0", stdout=StringIO())
+        assert not IdempotencyRecord.objects.filter(key=key).exists()
+        return response
+
+    def test_same_payload_replays_stored_payment(self):
+        original = self._capture_and_purge("purged-1")
+
+        # Injector novo: sem ReplayCache nem InFlightRequests do primeiro processo
+        replay = Injector([BillingModule]).get(PaymentService).process(PAYLOAD, "purged-1")
+
+        assert replay == original
+        assert Payment.objects.filter(idempotency_key="purged-1").count() == 1
+        assert IdempotencyRecord.objects.get(key="purged-1").status == IdempotencyStatus.COMPLETED
+
+    def test_different_payload_is_conflict(self):
+        self._capture_and_purge("purged-2")
+
+        with pytest.raises(ConflictError, match="payload diferente"):
+            Injector([BillingModule]).get(PaymentService).process({**PAYLOAD, "amount": "10.00"}, "purged-2")
+
+        assert not IdempotencyRecord.objects.filter(key="purged-2").exists()
+
+    def test_batch_replays_and_flags_conflicts(self):
+        original = self._capture_and_purge("purged-3")
+
+        results = (
+            Injector([BillingModule])
+            .get(PaymentService)
+            .process_many([("purged-3", PAYLOAD), ("purged-4", {**PAYLOAD, "installments": 2})])
+        )
+        self._capture_and_purge("purged-5")
+        conflict = (
+            Injector([BillingModule]).get(PaymentService).process_many([("purged-5", {**PAYLOAD, "installments": 2})])
+        )
+
+        assert results[0] == {"idempotency_key": "purged-3", "status_code": 201, "response": original}
+        assert results[1]["status_code"] == 201
+        assert conflict[0]["status_code"] == 409
+        assert Payment.objects.filter(idempotency_key="purged-3").count() == 1
+
+    def test_payments_key_is_indexed_but_not_unique_on_any_backend(self):
+        # Mesmo esquema nos dois bancos: o PostgreSQL particionado não aceita UNIQUE só da chave
+        tables = ["payments", "payments_legacy"] if connection.vendor == "postgresql" else ["payments"]
+        with connection.cursor() as cursor:
+            constraints = [
+                constraint
+                for table in tables
+                for constraint in connection.introspection.get_constraints(cursor, table).values()
+                if constraint["columns"] == ["idempotency_key"]
+            ]
+
+        assert constraints
+        assert not any(constraint["unique"] or constraint["primary_key"] for constraint in constraints)
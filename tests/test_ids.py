@@ -0,0 +1,54 @@
+import time
+
+import pytest
+
+from src.billing.models import Payment
+from src.common.ids import uuid7, uuid7_timestamp_ms
+from src.idempotency.repositories import IdempotencyRepository
+
+
+class TestUuid7:
+    """Layout da RFC 9562 e ordem crescente dentro do processo."""
+
+    def test_version_and_variant(self):
+        value = uuid7()
+
+        assert value.version == 7
+        assert value.variant == "specified in RFC 4122"
+
+    def test_timestamp_is_now(self):
+        before = time.time_ns() // 1_000_000
+        value = uuid7()
+        after = time.time_ns() // 1_000_000
+
+        assert before <= uuid7_timestamp_ms(value) <= after
+
+    def test_strictly_increasing_within_same_millisecond(self, monkeypatch):
+        monkeypatch.setattr("src.common.ids.time.time_ns", lambda: 1_700_000_000_000 * 1_000_000)
+
+        values = [uuid7() for _ in range(10_000)]
+
+        assert values == sorted(values)
+        assert len(set(values)) == len(values)
+        # Mais de 4096 ids no mesmo ms: o contador estoura e o timestamp avança
+        assert uuid7_timestamp_ms(values[-1]) > 1_700_000_000_000
+
+    def test_clock_going_back_keeps_order(self, monkeypatch):
+        now = [1_700_000_000_500]
+        monkeypatch.setattr("src.common.ids.time.time_ns", lambda: now[0] * 1_000_000)
+        first = uuid7()
+        now[0] -= 100
+
+        assert uuid7() > first
+
+
+@pytest.mark.django_db
+class TestUuid7Keys:
+    def test_models_default_to_uuid7(self):
+        assert Payment().id.version == 7
+
+    def test_claim_generates_uuid7(self):
+        record, created = IdempotencyRepository().claim("uuid7-key", "hash")
+
+        assert created
+        assert record.id.version == 7
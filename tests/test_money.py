@@ -0,0 +1,53 @@
+from decimal import Decimal
+
+import pytest
+
+from src.common.money import ZERO, Money
+
+
+class TestMoneyConversion:
+    """Conversão nas bordas (serializer/ORM) e formatação."""
+
+    def test_from_decimal(self):
+        assert Money.from_decimal(Decimal("297.00")).cents == 29700
+        assert Money.from_decimal(Decimal("297")).cents == 29700
+        assert Money.from_decimal("0.01").cents == 1
+        assert Money.from_decimal(150).cents == 15000
+
+    def test_from_decimal_rounds_half_up(self):
+        assert Money.from_decimal(Decimal("0.005")).cents == 1
+        assert Money.from_decimal(Decimal("0.0049")).cents == 0
+
+    def test_round_trip(self):
+        assert Money(29700).to_decimal() == Decimal("297.00")
+        assert str(Money(29700).to_decimal()) == "297.00"
+
+    def test_str(self):
+        assert str(Money(29700)) == "297.00"
+        assert str(Money(5)) == "0.05"
+        assert str(Money(-105)) == "-1.05"
+
+
+class TestMoneyArithmetic:
+    def test_add_sub_sum(self):
+        assert Money(100) + Money(50) == Money(150)
+        assert Money(100) - Money(50) == Money(50)
+        assert sum([Money(1), Money(2), Money(3)]) == Money(6)
+
+    def test_scale_matches_decimal_round_half_up(self):
+        # 297.00 * 8.99% = 26.7003 -> 26.70 ; 1.00 * 3.99% = 0.0399 -> 0.04
+        assert Money(29700).scale(899, 10000) == Money(2670)
+        assert Money(100).scale(399, 10000) == Money(4)
+        # Empate exato: 0.05 * 10% = 0.005 -> 0.01
+        assert Money(5).scale(1, 10) == Money(1)
+        assert Money(-5).scale(1, 10) == Money(-1)
+
+    def test_compares_with_decimal(self):
+        assert Money(29700) == Decimal("297.00")
+        assert Money(100) < Decimal("1.01")
+        assert hash(Money(29700)) == hash(Decimal("297.00"))
+        assert ZERO == Decimal("0.00")
+
+    def test_is_immutable(self):
+        with pytest.raises(AttributeError):
+            Money(1).cents = 2
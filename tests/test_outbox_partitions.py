@@ -0,0 +1,177 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+from injector import Injector
+
+from src.billing.constants import CURRENCY_BRL
+from src.billing.di import BillingModule
+from src.billing.services.payment_service import PaymentService
+from src.outbox.models import OutboxEvent, OutboxEventStatus, OutboxPartitionLease, OutboxRelayWorker
+from src.outbox.partitioning import fair_share, partition_for
+from src.outbox.publishers import InMemoryPublisher
+from src.outbox.repositories.lease_repository import OutboxLeaseRepository
+from src.outbox.repositories.outbox_repository import OutboxRepository
+from src.outbox.services.partitioned_relay import PartitionedRelay
+from src.outbox.services.relay_service import OutboxRelayService
+
+PARTITIONS = 8
+
+
+def _relay(worker_id: str, publisher=None) -> PartitionedRelay:
+    service = OutboxRelayService(OutboxRepository(partitions=PARTITIONS), publisher or InMemoryPublisher())
+    return PartitionedRelay(service, OutboxLeaseRepository(), worker_id=worker_id, partitions=PARTITIONS)
+
+
+def _seed(keys: list[str], rounds: int = 1) -> None:
+    repository = OutboxRepository(partitions=PARTITIONS)
+    base = timezone.now() - timedelta(minutes=1)
+    tick = 0
+    for seq in range(rounds):
+        for key in keys:
+            event = repository.create("payment_captured", {"key": key, "seq": seq}, partition_key=key)
+            OutboxEvent.objects.filter(id=event.id).update(created_at=base + timedelta(milliseconds=tick))
+            tick += 1
+
+
+class TestPartitioning:
+    def test_partition_is_stable_and_in_range(self):
+        assert partition_for("payment-1", 64) == partition_for("payment-1", 64)
+        assert {partition_for(f"payment-{i}", 8) for i in range(200)} == set(range(8))
+
+    def test_fair_share_covers_all_partitions(self):
+        workers = ["c", "a", "b"]
+
+        shares = [fair_share(8, workers, worker) for worker in sorted(workers)]
+
+        assert shares == [3, 3, 2]
+        assert fair_share(8, workers, "unknown") == 0
+
+
+@pytest.mark.django_db
+class TestPartitionKey:
+    def test_build_and_create_hash_partition_key(self):
+        repository = OutboxRepository(partitions=PARTITIONS)
+
+        built = repository.build("payment_captured", {}, partition_key="payment-1")
+        created = repository.create("payment_captured", {}, partition_key="payment-1")
+
+        assert built.partition == created.partition == partition_for("payment-1", PARTITIONS)
+        assert repository.build("payment_captured", {}).partition == 0
+
+    def test_capture_partitions_by_payment_id(self):
+        service = Injector([BillingModule]).get(PaymentService)
+
+        response = service.process(
+            {
+                "amount": "100.00",
+                "currency": CURRENCY_BRL,
+                "payment_method": "pix",
+                "installments": 1,
+                "splits": [{"recipient_id": "producer_1", "role": "producer", "percent": 100}],
+            },
+            "partition-key",
+        )
+
+        event = OutboxEvent.objects.get()
+        assert event.partition == partition_for(response["payment_id"], settings.OUTBOX_PARTITIONS)
+
+
+@pytest.mark.django_db
+class TestPartitionedRelay:
+    def test_single_worker_owns_everything(self):
+        assert _relay("w1").rebalance() == list(range(PARTITIONS))
+
+    def test_joining_worker_gets_half_after_rebalance(self):
+        first, second = _relay("w1"), _relay("w2")
+        first.rebalance()
+
+        # Tudo ainda é do w1: o w2 só pega o que o w1 soltar no próximo rebalance
+        assert second.rebalance() == []
+        assert first.rebalance() == [0, 1, 2, 3]
+        assert second.rebalance() == [4, 5, 6, 7]
+
+    def test_leaving_worker_hands_partitions_over(self):
+        first, second = _relay("w1"), _relay("w2")
+        first.rebalance()
+        second.rebalance()
+        first.rebalance()
+        second.rebalance()
+
+        second.leave()
+
+        assert first.rebalance() == list(range(PARTITIONS))
+        assert not OutboxRelayWorker.objects.filter(worker_id="w2").exists()
+
+    def test_dead_worker_leases_expire(self):
+        dead, alive = _relay("dead"), _relay("alive")
+        dead.rebalance()
+        past = timezone.now() - timedelta(minutes=1)
+        OutboxPartitionLease.objects.update(expires_at=past)
+        OutboxRelayWorker.objects.filter(worker_id="dead").update(heartbeat_at=past)
+
+        assert alive.rebalance() == list(range(PARTITIONS))
+        assert not OutboxRelayWorker.objects.filter(worker_id="dead").exists()
+
+    def test_batch_only_publishes_owned_partitions_in_order(self):
+        keys = [f"payment-{i}" for i in range(20)]
+        _seed(keys, rounds=3)
+        publisher = InMemoryPublisher()
+        first, second = _relay("w1", publisher), _relay("w2")
+        first.rebalance()
+        second.rebalance()
+        owned = first.rebalance()
+
+        first.relay_batch(batch_size=1000)
+
+        published = [(m["payload"]["key"], m["payload"]["seq"]) for m in publisher.messages]
+        mine = [key for key in keys if partition_for(key, PARTITIONS) in owned]
+        assert sorted(published) == sorted((key, seq) for key in mine for seq in range(3))
+        for key in mine:
+            assert [seq for k, seq in published if k == key] == [0, 1, 2]
+        assert OutboxEvent.objects.filter(status=OutboxEventStatus.PENDING).count() == 3 * (len(keys) - len(mine))
+
+    def test_lost_lease_publishes_nothing(self):
+        _seed(["payment-1"])
+        publisher = InMemoryPublisher()
+        relay = _relay("w1", publisher)
+        relay.rebalance()
+        OutboxPartitionLease.objects.update(owner="w2")
+
+        result = relay.relay_batch(batch_size=10)
+
+        assert result.published == 0
+        assert publisher.messages == []
+
+    def test_command_partitioned_drain(self, tmp_path):
+        _seed([f"payment-{i}" for i in range(5)], rounds=2)
+        out = StringIO()
+
+        call_command(
+            "relay_outbox",
+            "--partitioned",
+            "--drain",
+            "--worker-id",
+            "cmd",
+            "--publisher",
+            "file",
+            "--file",
+            str(tmp_path / "events.jsonl"),
+            stdout=out,
+        )
+
+        assert "Worker cmd: partições" in out.getvalue()
+        assert "10 eventos" in out.getvalue()
+        assert not OutboxPartitionLease.objects.filter(owner="cmd").exists()
+
+    def test_command_partitioned_refuses_dispatch_on_commit(self, settings):
+        settings.OUTBOX_DISPATCH_ON_COMMIT = True
+
+        with pytest.raises(CommandError, match="OUTBOX_DISPATCH_ON_COMMIT=false"):
+            call_command("relay_outbox", "--partitioned", "--drain", stdout=StringIO())
+
+        assert not OutboxPartitionLease.objects.exists()
@@ -0,0 +1,371 @@
+import gzip
+import json
+import socket
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from injector import Injector
+
+from src.billing.di import BillingModule
+from src.outbox.archive import OutboxArchive
+from src.outbox.dispatcher import OutboxDispatcher
+from src.outbox.models import OutboxEvent, OutboxEventArchive, OutboxEventStatus
+from src.outbox.notify import PgNotifyWaker
+from src.outbox.publishers import InMemoryPublisher, OutboxPublisher
+from src.outbox.repositories.outbox_repository import OutboxRepository
+from src.outbox.services.relay_service import OutboxRelayService
+
+
+class FailingPublisher(OutboxPublisher):
+    def publish(self, events):
+        raise ConnectionError("broker indisponível")
+
+
+def _seed(count: int) -> list[OutboxEvent]:
+    repository = OutboxRepository()
+    events = repository.bulk_create([repository.build("payment_captured", {"n": i}) for i in range(count)])
+    # created_at crescente para a ordem de publicação ser determinística
+    base = timezone.now() - timedelta(minutes=1)
+    for i, event in enumerate(events):
+        OutboxEvent.objects.filter(id=event.id).update(created_at=base + timedelta(milliseconds=i))
+    return events
+
+
+@pytest.mark.django_db
+class TestOutboxRelay:
+    def test_batch_is_published_and_marked_in_one_update(self, django_assert_num_queries):
+        _seed(3)
+        publisher = InMemoryPublisher()
+        service = OutboxRelayService(OutboxRepository(), publisher)
+
+        # SQLite: UPDATE de lock + SELECT + UPDATE em lote; PostgreSQL: SELECT ... FOR UPDATE SKIP LOCKED
+        # + UPDATE em lote (+ savepoint/release da transação aninhada nos dois)
+        with django_assert_num_queries(5 if connection.vendor == "sqlite" else 4):
+            result = service.relay_batch(batch_size=10)
+
+        assert result.published == 3
+        assert result.max_lag >= timedelta(minutes=1)
+        assert [m["payload"]["n"] for m in publisher.messages] == [0, 1, 2]
+        assert not OutboxEvent.objects.filter(status=OutboxEventStatus.PENDING).exists()
+        assert not OutboxEvent.objects.filter(published_at__isnull=True).exists()
+
+    def test_publisher_without_publish_fails_on_construction(self):
+        class IncompletePublisher(OutboxPublisher):
+            pass
+
+        with pytest.raises(TypeError):
+            IncompletePublisher()
+
+    @pytest.mark.skipif(connection.vendor != "sqlite", reason="fallback específico do SQLite")
+    def test_sqlite_claim_takes_write_lock_before_reading(self):
+        with CaptureQueriesContext(connection) as queries, transaction.atomic():
+            OutboxRepository().claim_pending(batch_size=10)
+
+        statements = [q["sql"] for q in queries.captured_queries if not q["sql"].startswith(("SAVEPOINT", "RELEASE"))]
+        assert statements[0].startswith("UPDATE")
+        assert statements[1].startswith("SELECT")
+
+    def test_batches_respect_size_and_age(self):
+        _seed(5)
+        publisher = InMemoryPublisher()
+        service = OutboxRelayService(OutboxRepository(), publisher)
+
+        service.relay_batch(batch_size=2)
+
+        assert [m["payload"]["n"] for m in publisher.messages] == [0, 1]
+        assert OutboxEvent.objects.filter(status=OutboxEventStatus.PENDING).count() == 3
+
+    def test_publisher_failure_keeps_events_pending(self):
+        _seed(2)
+        service = OutboxRelayService(OutboxRepository(), FailingPublisher())
+
+        with pytest.raises(ConnectionError):
+            service.relay_batch(batch_size=10)
+
+        assert OutboxEvent.objects.filter(status=OutboxEventStatus.PENDING).count() == 2
+
+    def test_run_drains_queue_and_reports_stats(self):
+        _seed(7)
+        publisher = InMemoryPublisher()
+
+        stats = OutboxRelayService(OutboxRepository(), publisher).run(batch_size=3, poll_interval=0, drain=True)
+
+        assert stats.published == 7
+        assert stats.batches == 3
+        assert stats.throughput > 0
+        assert len(publisher.messages) == 7
+
+    def test_drain_stops_on_failure(self):
+        _seed(1)
+
+        stats = OutboxRelayService(OutboxRepository(), FailingPublisher()).run(
+            batch_size=10, poll_interval=0, drain=True
+        )
+
+        assert stats.failures == 1
+        assert stats.published == 0
+
+    def test_command_with_file_publisher(self, tmp_path):
+        _seed(4)
+        target = tmp_path / "events.jsonl"
+        out = StringIO()
+
+        call_command(
+            "relay_outbox", "--drain", "--publisher", "file", "--file", str(target), "--batch-size", "3", stdout=out
+        )
+
+        lines = [json.loads(line) for line in target.read_text().splitlines()]
+        assert [line["payload"]["n"] for line in lines] == [0, 1, 2, 3]
+        assert "4 eventos em 2 lotes" in out.getvalue()
+        assert "eventos/s" in out.getvalue()
+        assert "lag máximo" in out.getvalue()
+
+
+def _age(events: list[OutboxEvent], days: int, status=OutboxEventStatus.PUBLISHED) -> None:
+    OutboxEvent.objects.filter(id__in=[e.id for e in events]).update(
+        status=status, created_at=timezone.now() - timedelta(days=days), published_at=timezone.now()
+    )
+
+
+@pytest.mark.django_db
+class TestOutboxArchive:
+    @pytest.mark.skipif(connection.vendor != "sqlite", reason="EXPLAIN QUERY PLAN do SQLite")
+    def test_claim_uses_partial_pending_indexes(self):
+        plans = []
+        with CaptureQueriesContext(connection) as queries, transaction.atomic():
+            OutboxRepository().claim_pending(batch_size=10)
+            OutboxRepository().claim_pending(batch_size=10, partitions=[1, 2])
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                if query["sql"].startswith("SELECT"):
+                    cursor.execute("EXPLAIN QUERY PLAN " + query["sql"])
+                    plans.append(" ".join(row[-1] for row in cursor.fetchall()))
+
+        assert "outbox_pending_idx" in plans[0]
+        assert "outbox_pending_partition_idx" in plans[1]
+
+    def test_archives_only_old_published_events_to_table(self):
+        old, recent, stuck = _seed(3), _seed(2), _seed(1)
+        _age(old, days=10)
+        _age(recent, days=1)
+        _age(stuck, days=10, status=OutboxEventStatus.PENDING)
+        out = StringIO()
+
+        call_command("archive_outbox", "--older-than-days", "7", "--batch-size", "2", "--pause", "0", stdout=out)
+
+        assert set(OutboxEventArchive.objects.values_list("id", flat=True)) == {e.id for e in old}
+        assert OutboxEvent.objects.count() == 3
+        archived = OutboxEventArchive.objects.get(id=old[0].id)
+        assert archived.payload == {"n": 0}
+        assert archived.published_at is not None
+        assert "lote 2: 1 eventos (3 no total" in out.getvalue()
+        assert "Arquivamento concluído: 3 eventos" in out.getvalue()
+
+    def test_archives_to_gzip_file_in_batches(self, tmp_path):
+        _age(_seed(5), days=30)
+        target = tmp_path / "archive.jsonl.gz"
+
+        call_command(
+            "archive_outbox",
+            "--to",
+            "file",
+            "--file",
+            str(target),
+            "--batch-size",
+            "2",
+            "--pause",
+            "0",
+            stdout=StringIO(),
+        )
+
+        with gzip.open(target, "rt", encoding="utf-8") as file:
+            lines = [json.loads(line) for line in file]
+        assert sorted(line["payload"]["n"] for line in lines) == [0, 1, 2, 3, 4]
+        assert not OutboxEvent.objects.exists()
+        assert not OutboxEventArchive.objects.exists()
+
+    def test_max_batches_bounds_the_run(self):
+        _age(_seed(5), days=30)
+
+        call_command("archive_outbox", "--batch-size", "2", "--max-batches", "1", "--pause", "0", stdout=StringIO())
+
+        assert OutboxEventArchive.objects.count() == 2
+        assert OutboxEvent.objects.count() == 3
+
+    def test_rejects_invalid_batch_size(self):
+        with pytest.raises(CommandError):
+            call_command("archive_outbox", "--batch-size", "0")
+
+    def test_archive_without_write_fails_on_construction(self):
+        class IncompleteArchive(OutboxArchive):
+            pass
+
+        with pytest.raises(TypeError):
+            IncompleteArchive()
+
+
+@pytest.mark.django_db
+class TestOutboxDispatch:
+    def test_create_dispatches_ids_after_commit(self, django_capture_on_commit_callbacks):
+        dispatched = []
+        dispatcher = OutboxDispatcher(handler=dispatched.append, max_workers=1)
+        repository = OutboxRepository(dispatcher=dispatcher)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            event = repository.create("payment_captured", {"n": 0})
+            events = repository.bulk_create([repository.build("payment_captured", {"n": i}) for i in (1, 2)])
+            assert dispatched == []
+        dispatcher.shutdown()
+
+        assert dispatched == [[event.id], [e.id for e in events]]
+
+    def test_rollback_does_not_dispatch(self, django_capture_on_commit_callbacks):
+        dispatched = []
+        dispatcher = OutboxDispatcher(handler=dispatched.append, max_workers=1)
+
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            OutboxRepository(dispatcher=dispatcher).create("payment_captured", {})
+        dispatcher.shutdown()
+
+        assert len(callbacks) == 1
+        assert dispatched == []
+
+    def test_relay_ids_publishes_only_given_pending_events(self):
+        events = _seed(3)
+        publisher = InMemoryPublisher()
+        service = OutboxRelayService(OutboxRepository(), publisher)
+
+        first = service.relay_ids([events[0].id, events[2].id])
+        again = service.relay_ids([events[0].id])
+
+        assert first.published == 2
+        assert again.published == 0
+        assert [m["payload"]["n"] for m in publisher.messages] == [0, 2]
+        assert list(OutboxEvent.objects.filter(status=OutboxEventStatus.PENDING).values_list("id", flat=True)) == [
+            events[1].id
+        ]
+
+    def test_full_queue_falls_back_to_polling(self):
+        release = threading.Event()
+        dispatcher = OutboxDispatcher(handler=lambda ids: release.wait(5), max_workers=1, max_pending=2)
+
+        accepted = [dispatcher.dispatch([i]) for i in range(3)]
+        release.set()
+        dispatcher.shutdown()
+
+        assert accepted == [True, True, False]
+        assert dispatcher.dispatch([3]) is False  # pool encerrado: fica para o polling
+
+    def test_handler_failure_is_logged_and_frees_slot(self, caplog):
+        def fail(ids):
+            raise ConnectionError("broker indisponível")
+
+        dispatcher = OutboxDispatcher(handler=fail, max_workers=1, max_pending=1)
+
+        dispatcher.dispatch([1])
+        dispatcher.shutdown()
+
+        assert "polling vai publicar" in caplog.text
+        assert dispatcher._pending == 0
+
+    def test_injector_wires_dispatcher_when_enabled(self, settings):
+        settings.OUTBOX_DISPATCH_ON_COMMIT = True
+        injector = Injector([BillingModule])
+
+        repository = injector.get(OutboxRepository)
+
+        assert isinstance(repository._dispatcher, OutboxDispatcher)
+        assert injector.get(OutboxRepository) is repository
+        repository._dispatcher.shutdown()
+
+    def test_injector_skips_dispatcher_when_disabled(self):
+        assert Injector([BillingModule]).get(OutboxRepository)._dispatcher is None
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="SQLite em memória do pytest não suporta escritores concorrentes"
+)
+class TestParallelRelays:
+    def test_parallel_relays_never_publish_twice(self):
+        _seed(200)
+        publisher = InMemoryPublisher()
+        stop = threading.Event()
+
+        def relay():
+            OutboxRelayService(OutboxRepository(), publisher).run(batch_size=7, poll_interval=0.01, stop=stop)
+            connection.close()
+
+        threads = [threading.Thread(target=relay) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        deadline = timezone.now() + timedelta(seconds=10)
+        while OutboxEvent.objects.filter(status=OutboxEventStatus.PENDING).exists() and timezone.now() < deadline:
+            stop.wait(0.02)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        ids = [m["id"] for m in publisher.messages]
+        assert len(ids) == 200
+        assert len(set(ids)) == 200
+
+
+class _IdleListenConnection:
+    """Conexão em LISTEN sem NOTIFY nenhum: um socket que nunca fica legível."""
+
+    def __init__(self):
+        self._socket, self._peer = socket.socketpair()
+        self.notifies = []
+
+    def fileno(self) -> int:
+        return self._socket.fileno()
+
+    def poll(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self._socket.close()
+        self._peer.close()
+
+
+class TestPgNotifyWaker:
+    @staticmethod
+    def _waker() -> PgNotifyWaker:
+        waker = PgNotifyWaker.__new__(PgNotifyWaker)
+        waker._connection = _IdleListenConnection()
+        waker._open_wakeup_pipe()
+        return waker
+
+    def test_interrupt_wakes_wait_before_timeout(self):
+        waker = self._waker()
+        threading.Timer(0.05, waker.interrupt).start()
+
+        started = time.monotonic()
+        notified = waker.wait(timeout=10)
+
+        assert time.monotonic() - started < 2
+        assert notified is False
+        waker.close()
+
+    def test_interrupt_before_wait_is_not_lost(self):
+        waker = self._waker()
+        waker.interrupt()
+        waker.interrupt()
+
+        started = time.monotonic()
+        waker.wait(timeout=10)
+        assert time.monotonic() - started < 2
+
+        # O pipe foi drenado: a próxima espera volta a respeitar o timeout
+        started = time.monotonic()
+        waker.wait(timeout=0.05)
+        assert time.monotonic() - started >= 0.04
+        waker.close()
@@ -0,0 +1,126 @@
+from datetime import date, datetime, timedelta, timezone
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from src.billing.repositories.partition_repository import (
+    Partition,
+    PartitionRepository,
+    add_months,
+    lower_bound,
+    month_start,
+    partition_name,
+    upper_bound,
+)
+
+
+class TestPartitionHelpers:
+    def test_month_start_uses_utc(self):
+        # 31/10 22h em São Paulo já é novembro em UTC
+        local = datetime(2026, 10, 31, 22, 0, tzinfo=timezone(timedelta(hours=-3)))
+
+        assert month_start(local) == date(2026, 11, 1)
+
+    def test_add_months_crosses_years(self):
+        assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+        assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+    def test_partition_name(self):
+        assert partition_name("ledger_entries", date(2026, 3, 1)) == "ledger_entries_p2026_03"
+
+    def test_upper_bound_parses_range_and_ignores_default(self):
+        bound = upper_bound("FOR VALUES FROM ('2026-10-01 00:00:00+00') TO ('2026-11-01 00:00:00+00')")
+        legacy = upper_bound("FOR VALUES FROM (MINVALUE) TO ('2026-11-01 00:00:00+00')")
+
+        assert bound == legacy == datetime(2026, 11, 1, tzinfo=timezone.utc)
+        assert upper_bound("DEFAULT") is None
+
+    def test_overlaps_uses_both_bounds_and_ignores_default(self):
+        legacy_bound = "FOR VALUES FROM (MINVALUE) TO ('2026-11-01 00:00:00+00')"
+        legacy = Partition("payments", "payments_legacy", upper_bound(legacy_bound), lower_bound(legacy_bound))
+        october = datetime(2026, 10, 1, tzinfo=timezone.utc)
+        november = datetime(2026, 11, 1, tzinfo=timezone.utc)
+
+        assert legacy.lower_bound is None
+        assert legacy.overlaps(october, november)
+        assert not legacy.overlaps(november, datetime(2026, 12, 1, tzinfo=timezone.utc))
+        assert not Partition("payments", "payments_default", None, default=True).overlaps(october, november)
+
+
+@pytest.mark.django_db
+class TestPartitionCommands:
+    @pytest.mark.skipif(connection.vendor == "postgresql", reason="no-op só no SQLite")
+    def test_sqlite_is_noop(self):
+        out = StringIO()
+
+        call_command("create_partitions", stdout=out)
+        call_command("detach_partitions", "--dry-run", stdout=out)
+
+        assert not PartitionRepository().enabled
+        assert out.getvalue().count("nada a fazer") == 2
+
+    def test_rejects_invalid_arguments(self, tmp_path):
+        with pytest.raises(CommandError):
+            call_command("create_partitions", "--months-ahead", "-1")
+        with pytest.raises(CommandError):
+            call_command("detach_partitions", "--older-than-months", "0")
+        with pytest.raises(CommandError):
+            call_command("detach_partitions", "--export-dir", str(tmp_path / "missing"))
+
+    @pytest.mark.skipif(connection.vendor != "postgresql", reason="particionamento só no PostgreSQL")
+    def test_create_is_idempotent_and_listed(self):
+        repository = PartitionRepository()
+        month = add_months(month_start(datetime.now(timezone.utc)), 6)
+
+        assert repository.create_month("payments", month) is True
+        assert repository.create_month("payments", month) is False
+        names = [partition.name for partition in repository.list_partitions("payments")]
+        assert partition_name("payments", month) in names
+        assert "payments_default" in names
+
+    @pytest.mark.skipif(connection.vendor != "postgresql", reason="particionamento só no PostgreSQL")
+    def test_legacy_partitions_share_parent_primary_key(self):
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT rel.relname, array_agg(att.attname::text ORDER BY att.attnum)
+                FROM pg_constraint con
+                JOIN pg_class rel ON rel.oid = con.conrelid
+                JOIN pg_attribute att ON att.attrelid = con.conrelid AND att.attnum = ANY (con.conkey)
+                WHERE con.contype = 'p' AND rel.relname IN ('payments', 'payments_legacy', 'ledger_entries_legacy')
+                GROUP BY rel.relname
+                """)
+            keys = dict(cursor.fetchall())
+
+        assert keys == {name: ["id", "created_at"] for name in ("payments", "payments_legacy", "ledger_entries_legacy")}
+
+    @pytest.mark.skipif(connection.vendor != "postgresql", reason="particionamento só no PostgreSQL")
+    def test_create_skips_months_covered_by_legacy(self):
+        # A migration deixa a legacy até o início do mês seguinte: o mês corrente já está coberto
+        current = month_start(datetime.now(timezone.utc))
+
+        call_command("create_partitions", "--months-ahead", "1", stdout=StringIO())
+
+        names = [partition.name for partition in PartitionRepository().list_partitions("payments")]
+        assert partition_name("payments", current) not in names
+        assert partition_name("payments", add_months(current, 1)) in names
+
+    @pytest.mark.skipif(connection.vendor != "postgresql", reason="particionamento só no PostgreSQL")
+    def test_detach_keeps_table_and_export_drops_it(self, tmp_path):
+        # Com a partição DEFAULT da 0005 o DETACH precisa ser o comum (CONCURRENTLY é recusado)
+        repository = PartitionRepository()
+        month = add_months(month_start(datetime.now(timezone.utc)), 7)
+        repository.create_month("payments", month)
+        name = partition_name("payments", month)
+        partition = next(p for p in repository.list_partitions("payments") if p.name == name)
+
+        repository.detach(partition)
+
+        assert name not in [p.name for p in repository.list_partitions("payments")]
+        assert "payments_default" in [p.name for p in repository.list_partitions("payments")]
+        target = repository.export_and_drop(name, tmp_path)
+        assert target.exists()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", [name])
+            assert cursor.fetchone()[0] is None
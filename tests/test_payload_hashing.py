@@ -0,0 +1,94 @@
+import uuid
+from decimal import Decimal
+
+import pytest
+
+from src.billing.constants import CURRENCY_BRL
+from src.idempotency.cache import ReplayCache
+from src.idempotency.hashing import PayloadHasher, encode_payment_payload, legacy_hash, payload_hash_matches
+from src.idempotency.repositories import IdempotencyRepository
+from src.idempotency.services import IdempotencyService
+
+PAYLOAD = {
+    "amount": Decimal("297.00"),
+    "currency": CURRENCY_BRL,
+    "payment_method": "card",
+    "installments": 3,
+    "splits": [
+        {"recipient_id": "producer_1", "role": "producer", "percent": Decimal("70.00")},
+        {"recipient_id": "affiliate_9", "role": "affiliate", "percent": Decimal("30.00")},
+    ],
+}
+
+
+class TestCanonicalEncoding:
+    def test_key_order_does_not_matter(self):
+        reordered = dict(reversed(list(PAYLOAD.items())))
+        reordered["splits"] = [dict(reversed(list(s.items()))) for s in PAYLOAD["splits"]]
+
+        assert encode_payment_payload(reordered) == encode_payment_payload(PAYLOAD)
+
+    def test_split_order_matters(self):
+        swapped = {**PAYLOAD, "splits": list(reversed(PAYLOAD["splits"]))}
+
+        assert encode_payment_payload(swapped) != encode_payment_payload(PAYLOAD)
+
+    def test_separator_inside_a_value_cannot_shift_fields(self):
+        a = {**PAYLOAD, "splits": [{"recipient_id": "a\x1fproducer", "role": "x", "percent": Decimal("100")}]}
+        b = {**PAYLOAD, "splits": [{"recipient_id": "a", "role": "producer\x1fx", "percent": Decimal("100")}]}
+
+        assert encode_payment_payload(a) != encode_payment_payload(b)
+
+    def test_splits_and_extra_keys_do_not_collide(self):
+        one_split = {**PAYLOAD, "splits": [{"recipient_id": "a", "role": "b", "percent": "c"}]}
+        extra_key = {**PAYLOAD, "splits": [], "a": "b"}
+
+        assert encode_payment_payload(one_split) != encode_payment_payload(extra_key)
+
+    def test_template_and_unknown_keys_are_encoded(self):
+        template = {**PAYLOAD, "splits": None, "split_template_id": uuid.uuid4()}
+
+        assert encode_payment_payload(template) != encode_payment_payload({**template, "split_template_id": None})
+        assert encode_payment_payload({**PAYLOAD, "extra": 1}) != encode_payment_payload(PAYLOAD)
+
+
+class TestPayloadHasher:
+    @pytest.mark.parametrize("algorithm,length", [("blake2b", 32), ("sha256", 64)])
+    def test_hash_is_prefixed_with_version_and_algorithm(self, algorithm, length):
+        payload_hash = PayloadHasher(algorithm).hash(PAYLOAD)
+
+        prefix, _, digest = payload_hash.partition(":")
+        assert prefix == f"c1.{algorithm}"
+        assert len(digest) == length
+
+    def test_unknown_algorithm_is_rejected(self):
+        with pytest.raises(ValueError):
+            PayloadHasher("md5")
+
+    def test_matches_legacy_unprefixed_sha256(self):
+        payload_hash = PayloadHasher().hash(PAYLOAD)
+
+        assert payload_hash_matches(legacy_hash(PAYLOAD), payload_hash)
+        assert not payload_hash_matches(legacy_hash({**PAYLOAD, "amount": Decimal("1.00")}), payload_hash)
+
+    def test_matches_hash_stored_with_another_algorithm(self):
+        stored = PayloadHasher("sha256").hash(PAYLOAD)
+        payload_hash = PayloadHasher("blake2b").hash(PAYLOAD)
+
+        assert payload_hash_matches(stored, payload_hash)
+        assert not payload_hash_matches(stored, PayloadHasher("blake2b").hash({**PAYLOAD, "installments": 2}))
+
+
+@pytest.mark.django_db
+class TestLegacyRecords:
+    def test_legacy_record_replays_instead_of_conflicting(self):
+        repository = IdempotencyRepository()
+        record = repository.create("legacy-1", legacy_hash(PAYLOAD))
+        repository.mark_completed(record, {"payment_id": "p1"})
+        service = IdempotencyService(repository, replay_cache=ReplayCache(), hasher=PayloadHasher())
+
+        result = service.check("legacy-1", service.hash_payload(PAYLOAD))
+        conflict = service.check("legacy-1", service.hash_payload({**PAYLOAD, "amount": Decimal("1.00")}))
+
+        assert result.cached_response == {"payment_id": "p1"}
+        assert conflict.is_conflict is True
@@ -0,0 +1,160 @@
+from decimal import Decimal
+
+import pytest
+from django.apps import apps
+from django.core.cache import cache
+from injector import Injector
+from rest_framework.test import APIClient
+
+from src.billing.cache import PaymentDetailCache
+from src.billing.constants import CURRENCY_BRL
+from src.billing.di import BillingModule
+from src.billing.models import LedgerEntry, Payment
+from src.billing.selectors import PaymentSelector
+from src.billing.services.payment_query_service import PaymentQueryService
+from src.billing.services.payment_service import PaymentService
+from src.common.ids import uuid7
+
+CAPTURE = {
+    "amount": "297.00",
+    "currency": CURRENCY_BRL,
+    "payment_method": "card",
+    "installments": 3,
+    "splits": [
+        {"recipient_id": "producer_1", "role": "producer", "percent": 70},
+        {"recipient_id": "affiliate_9", "role": "affiliate", "percent": 30},
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+@pytest.fixture
+def payment_id():
+    return Injector([BillingModule]).get(PaymentService).process(CAPTURE, "detail-key")["payment_id"]
+
+
+def _url(payment_id) -> str:
+    return f"/api/v1/payments/{payment_id}"
+
+
+@pytest.mark.django_db
+class TestPaymentDetailEndpoint:
+    def test_returns_payment_and_ledger_entries(self, client, payment_id):
+        response = client.get(_url(payment_id))
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["payment_id"] == payment_id
+        assert body["gross_amount"] == "297.00"
+        assert body["installments"] == 3
+        assert {(e["recipient_id"], e["role"]) for e in body["ledger_entries"]} == {
+            ("producer_1", "producer"),
+            ("affiliate_9", "affiliate"),
+        }
+        assert sum(Decimal(e["amount"]) for e in body["ledger_entries"]) == Decimal(body["net_amount"])
+        assert response["ETag"].startswith('"') and response["Cache-Control"] == "private, no-cache"
+
+    def test_cold_read_is_two_queries_and_warm_read_none(self, client, payment_id, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            cold = client.get(_url(payment_id))
+        with django_assert_num_queries(0):
+            warm = client.get(_url(payment_id))
+
+        assert warm.json() == cold.json()
+        assert warm["ETag"] == cold["ETag"]
+
+    def test_matching_etag_is_304_without_database(self, client, payment_id, django_assert_num_queries):
+        etag = client.get(_url(payment_id))["ETag"]
+
+        with django_assert_num_queries(0):
+            strong = client.get(_url(payment_id), HTTP_IF_NONE_MATCH=etag)
+            weak = client.get(_url(payment_id), HTTP_IF_NONE_MATCH=f'"other", W/{etag}')
+        stale = client.get(_url(payment_id), HTTP_IF_NONE_MATCH='"other"')
+
+        assert strong.status_code == weak.status_code == 304
+        assert strong.content == b""
+        assert strong["ETag"] == etag
+        assert stale.status_code == 200
+
+    def test_unknown_payment_is_404_and_not_cached(self, client):
+        missing = uuid7()
+
+        assert client.get(_url(missing)).status_code == 404
+        assert PaymentDetailCache().get(missing) is None
+        assert cache.get(f"payment-detail:{missing.hex}") is None
+
+    def test_orm_write_invalidates_on_commit(self, client, payment_id, django_capture_on_commit_callbacks):
+        before = client.get(_url(payment_id))
+        entry = LedgerEntry.objects.filter(payment_id=payment_id).first()
+        entry.recipient_id = "coproducer_2"
+
+        with django_capture_on_commit_callbacks(execute=True):
+            entry.save()
+        after = client.get(_url(payment_id), HTTP_IF_NONE_MATCH=before["ETag"])
+
+        assert after.status_code == 200
+        assert after["ETag"] != before["ETag"]
+        assert "coproducer_2" in {e["recipient_id"] for e in after.json()["ledger_entries"]}
+
+    def test_new_ledger_entry_does_not_schedule_invalidation(self, payment_id, django_capture_on_commit_callbacks):
+        payment = Payment.objects.get(id=payment_id)
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            LedgerEntry.objects.create(payment=payment, recipient_id="coproducer_2", role="coproducer", amount=1)
+
+        assert not [c for c in callbacks if c.__qualname__.startswith("_invalidate_on_commit")]
+
+    def test_invalidates_cache_bound_in_application_injector(self, payment_id, django_capture_on_commit_callbacks):
+        class RecordingCache(PaymentDetailCache):
+            def __init__(self):
+                self.invalidated = []
+
+            def invalidate(self, payment_ids):
+                self.invalidated += [str(payment_id) for payment_id in payment_ids]
+
+        injector = apps.get_app_config("django_injector").injector
+        original = injector.get(PaymentDetailCache)
+        recording = RecordingCache()
+        injector.binder.bind(PaymentDetailCache, to=recording)
+        try:
+            with django_capture_on_commit_callbacks(execute=True):
+                Payment.objects.get(id=payment_id).save()
+        finally:
+            injector.binder.bind(PaymentDetailCache, to=original)
+
+        assert recording.invalidated == [payment_id]
+
+    def test_new_payment_does_not_schedule_invalidation(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks() as callbacks:
+            Injector([BillingModule]).get(PaymentService).process(CAPTURE, "no-invalidation")
+
+        assert not [c for c in callbacks if c.__qualname__.startswith("_invalidate_on_commit")]
+
+
+@pytest.mark.django_db
+class TestPaymentQueryService:
+    def test_disabled_cache_always_reads_database(self, payment_id, django_assert_num_queries):
+        service = PaymentQueryService(PaymentSelector(), PaymentDetailCache())
+
+        with django_assert_num_queries(4):
+            first = service.get(payment_id)
+            second = service.get(payment_id)
+
+        assert first == second
+
+    def test_etag_depends_on_every_field(self):
+        data = {"payment_id": "1", "ledger_entries": [{"amount": "1.00"}]}
+
+        assert PaymentQueryService.etag(data) == PaymentQueryService.etag(dict(reversed(list(data.items()))))
+        assert PaymentQueryService.etag(data) != PaymentQueryService.etag({**data, "ledger_entries": []})
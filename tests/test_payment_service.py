@@ -1,11 +1,24 @@
 from decimal import Decimal
 
 import pytest
+from django.conf import settings
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from injector import Injector
 
-from src.billing.constants import CURRENCY_BRL
+from src.billing.constants import CURRENCY_BRL, LEDGER_WRITE_CHUNK_SIZE
 from src.billing.di import BillingModule
+from src.billing.models import LedgerEntry, Payment, RecipientBalance
+from src.billing.repositories.capture_repository import CaptureRepository
+from src.billing.repositories.payment_repository import PaymentRepository
 from src.billing.services.payment_service import PaymentService
+from src.common.exceptions import BusinessValidationError
+from src.idempotency.models import IdempotencyRecord, IdempotencyStatus
+from src.idempotency.repositories import IdempotencyRepository
+from src.outbox.models import OutboxEvent
+from src.outbox.partitioning import partition_for
+from src.outbox.repositories.outbox_repository import OutboxRepository
 
 
 @pytest.fixture
@@ -79,3 +92,151 @@ class TestPaymentServiceCard:
 
         total = sum(r["amount"] for r in result["receivables"])
         assert total == result["net_amount"]
+
+
+@pytest.mark.django_db
+class TestPaymentServiceLargeSplits:
+    """MAX_SPLITS configurável e ledger gravado em blocos."""
+
+    @override_settings(MAX_SPLITS=2000)
+    def test_thousand_recipients(self, payment_service, monkeypatch):
+        monkeypatch.setattr("src.billing.repositories.payment_repository.LEDGER_WRITE_CHUNK_SIZE", 100)
+        splits = [{"recipient_id": f"aff_{i}", "role": "affiliate", "percent": Decimal("0.08")} for i in range(1250)]
+
+        with CaptureQueriesContext(connection) as queries:
+            result = payment_service.process(
+                {
+                    "amount": "1000.00",
+                    "currency": CURRENCY_BRL,
+                    "payment_method": "pix",
+                    "installments": 1,
+                    "splits": splits,
+                },
+                "large-split-key",
+            )
+
+        ledger_inserts = [q for q in queries.captured_queries if q["sql"].startswith('INSERT INTO "ledger_entries"')]
+        assert len(ledger_inserts) == 13  # 1250 linhas em blocos de 100
+        assert LedgerEntry.objects.filter(payment_id=result["payment_id"]).count() == 1250
+        assert sum(r["amount"] for r in result["receivables"]) == Decimal("1000.00")
+
+    @override_settings(MAX_SPLITS=1)
+    def test_rejects_more_recipients_than_max_splits(self, payment_service):
+        with pytest.raises(BusinessValidationError) as exc_info:
+            payment_service.process(CAPTURE, "too-many-splits")
+
+        assert exc_info.value.errors == {"splits": "Informe entre 1 e 1 recebedores."}
+
+
+CAPTURE = {
+    "amount": "297.00",
+    "currency": CURRENCY_BRL,
+    "payment_method": "card",
+    "installments": 3,
+    "splits": [
+        {"recipient_id": "producer_1", "role": "producer", "percent": 70},
+        {"recipient_id": "affiliate_9", "role": "affiliate", "percent": 30},
+    ],
+}
+
+
+@pytest.mark.django_db
+class TestCaptureWrites:
+    """
+    Round trips de uma captura nova: lock_timeout + claim + busca da chave em payments + um statement
+    no PostgreSQL, claim + busca + 5 escritas no ORM.
+    """
+
+    def test_round_trip_budget(self, payment_service):
+        expected = 4 if connection.vendor == "postgresql" else 7
+
+        with CaptureQueriesContext(connection) as queries:
+            result = payment_service.process(CAPTURE, "budget-key")
+
+        statements = [q["sql"] for q in queries.captured_queries if not q["sql"].startswith(("SAVEPOINT", "RELEASE"))]
+        assert len(statements) == expected, statements
+        payment = Payment.objects.get(id=result["payment_id"])
+        assert payment.idempotency_key == "budget-key"
+        assert LedgerEntry.objects.filter(payment=payment).count() == 2
+        assert OutboxEvent.objects.get().payload["payment_id"] == result["payment_id"]
+        record = IdempotencyRecord.objects.get(key="budget-key")
+        assert record.status == IdempotencyStatus.COMPLETED
+        assert record.response["payment_id"] == result["payment_id"]
+
+    def test_single_statement_sql_covers_all_tables(self, payment_service):
+        payment_repo = PaymentRepository()
+        result = payment_service.calculate(CAPTURE)
+        payment = payment_repo.build(
+            result["gross_amount"], result["platform_fee_amount"], result["net_amount"], "card", 3, "sql-key"
+        )
+        entries = list(payment_repo.build_ledger_entries(payment, result["receivables"]))
+        event = OutboxRepository().build("payment_captured", {"payment_id": str(payment.id)})
+        record = IdempotencyRecord(key="sql-key", payload_hash="h")
+        fields = IdempotencyRepository().apply_completed(record, {"payment_id": str(payment.id)})
+
+        sql, params = CaptureRepository.build_sql(payment, entries, event, record, fields)
+
+        assert sql.startswith("WITH payment AS (INSERT INTO")
+        assert "ledger AS (INSERT INTO" in sql and "outbox AS (INSERT INTO" in sql
+        assert 'balances AS (INSERT INTO "recipient_balances"' in sql
+        assert 'UPDATE "idempotency_records" SET' in sql
+        assert sql.count("%s") == len(params)
+        assert payment.created_at is not None
+
+    def test_fast_path_only_on_postgresql_and_small_splits(self, monkeypatch):
+        monkeypatch.setattr(connection, "vendor", "postgresql")
+
+        assert CaptureRepository().supports(2)
+        assert not CaptureRepository().supports(LEDGER_WRITE_CHUNK_SIZE + 1)
+        assert not CaptureRepository(enabled=False).supports(2)
+
+    @pytest.mark.skipif(connection.vendor != "postgresql", reason="o statement único só existe no PostgreSQL")
+    def test_single_statement_writes_same_rows_as_orm(self):
+        def capture(single_statement: bool, key: str) -> dict:
+            injector = Injector([BillingModule])
+            injector.binder.bind(CaptureRepository, to=CaptureRepository(enabled=single_statement))
+            balances_before = {b.recipient_id: (b.balance_cents, b.entries) for b in RecipientBalance.objects.all()}
+            with CaptureQueriesContext(connection) as queries:
+                payment_id = injector.get(PaymentService).process(CAPTURE, key)["payment_id"]
+
+            payment = Payment.objects.get(id=payment_id)
+            event = OutboxEvent.objects.get(payload__payment_id=payment_id)
+            return {
+                "statements": len(queries.captured_queries),
+                "payment": (
+                    payment.status,
+                    payment.gross_amount,
+                    payment.platform_fee_amount,
+                    payment.net_amount,
+                    payment.payment_method,
+                    payment.installments,
+                    payment.idempotency_key == key,
+                    payment.created_at is not None,
+                ),
+                "ledger": list(
+                    LedgerEntry.objects.filter(payment_id=payment_id)
+                    .order_by("recipient_id")
+                    .values_list("recipient_id", "role", "amount")
+                ),
+                "event": (
+                    event.event_type,
+                    event.status,
+                    event.partition == partition_for(payment_id, settings.OUTBOX_PARTITIONS),
+                    {k: v for k, v in event.payload.items() if k != "payment_id"},
+                ),
+                "balances": {
+                    b.recipient_id: (
+                        b.balance_cents - balances_before.get(b.recipient_id, (0, 0))[0],
+                        b.entries - balances_before.get(b.recipient_id, (0, 0))[1],
+                    )
+                    for b in RecipientBalance.objects.all()
+                },
+                "record": IdempotencyRecord.objects.get(key=key).response["payment_id"] == payment_id,
+            }
+
+        orm = capture(single_statement=False, key="orm-key")
+        single = capture(single_statement=True, key="cte-key")
+
+        assert single.pop("statements") < orm.pop("statements")
+        assert single == orm
+        assert orm["balances"] == {"affiliate_9": (8109, 1), "producer_1": (18921, 1)}
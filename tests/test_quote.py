@@ -0,0 +1,144 @@
+from decimal import Decimal
+
+import pytest
+from injector import Injector
+from rest_framework.test import APIClient
+
+from src.billing.constants import CURRENCY_BRL
+from src.billing.di import BillingModule
+from src.billing.rates import CardRates, PlatformRates, RatesProvider, RateTable
+from src.billing.services.quote_service import QuoteCache, QuoteService
+from src.common.exceptions import BusinessValidationError
+
+ENDPOINT = "/api/v1/quote"
+
+
+@pytest.fixture
+def quote_service():
+    injector = Injector([BillingModule])
+    return injector.get(QuoteService)
+
+
+def _make_payload(**overrides):
+    base = {
+        "amount": Decimal("297.00"),
+        "currency": CURRENCY_BRL,
+        "payment_method": "card",
+        "installments": 3,
+        "splits": [
+            {"recipient_id": "producer_1", "role": "producer", "percent": Decimal("70")},
+            {"recipient_id": "affiliate_9", "role": "affiliate", "percent": Decimal("30")},
+        ],
+    }
+    base.update(overrides)
+    return base
+
+
+class TestQuoteService:
+    """Cache LRU na frente de PaymentService.calculate."""
+
+    def test_second_call_is_cache_hit(self, quote_service):
+        first = quote_service.quote(_make_payload())
+        second = quote_service.quote(_make_payload())
+
+        assert first is second
+        assert first["platform_fee_amount"] == Decimal("26.70")
+        assert quote_service.stats()["hits"] == 1
+        assert quote_service.stats()["misses"] == 1
+
+    def test_key_is_normalized(self, quote_service):
+        quote_service.quote(_make_payload(amount=Decimal("297.00")))
+        quote_service.quote(_make_payload(amount="297", currency="brl"))
+
+        assert quote_service.stats()["hits"] == 1
+
+    def test_different_installments_is_miss(self, quote_service):
+        quote_service.quote(_make_payload(installments=3))
+        result = quote_service.quote(_make_payload(installments=4))
+
+        assert result["platform_fee_amount"] == Decimal("32.64")
+        assert quote_service.stats()["misses"] == 2
+
+    def test_rates_changed_without_version_bump_is_miss(self):
+        injector = Injector([BillingModule])
+        service = injector.get(QuoteService)
+        first = service.quote(_make_payload())
+
+        # Mesmo "version", taxas diferentes (arquivo republicado sem bump)
+        rates = PlatformRates(card=CardRates(installment_base=Decimal("0.10")))
+        injector.get(RatesProvider).swap(RateTable.compile(rates, version=0))
+        second = service.quote(_make_payload())
+
+        assert second is not first
+        assert second["platform_fee_amount"] != first["platform_fee_amount"]
+
+    def test_validation_errors_are_not_cached(self, quote_service):
+        for _ in range(2):
+            with pytest.raises(BusinessValidationError):
+                quote_service.quote(_make_payload(currency="USD"))
+
+        assert quote_service.stats()["size"] == 0
+
+
+class TestQuoteCache:
+    def test_lru_eviction(self):
+        cache = QuoteCache(max_size=2)
+        cache.get("a", "v1")
+        cache.set("a", {"v": 1}, "v1")
+        cache.set("b", {"v": 2}, "v1")
+        cache.get("a", "v1")
+        cache.set("c", {"v": 3}, "v1")
+
+        assert cache.get("b", "v1") is None
+        assert cache.get("a", "v1") == {"v": 1}
+        assert cache.stats()["size"] == 2
+
+    def test_rates_change_invalidates_entries(self):
+        cache = QuoteCache()
+        cache.get("a", "v1")
+        cache.set("a", {"v": 1}, "v1")
+
+        assert cache.get("a", "v2") is None
+        assert cache.stats()["size"] == 0
+
+    def test_set_with_stale_rates_is_ignored(self):
+        cache = QuoteCache()
+        cache.get("a", "v2")
+        cache.set("a", {"v": 1}, "v1")
+
+        assert cache.get("a", "v2") is None
+
+
+@pytest.mark.django_db
+class TestQuoteEndpoint:
+    """POST /api/v1/quote não acessa o banco."""
+
+    def test_quote_success_without_queries(self, django_assert_num_queries):
+        client = APIClient()
+        payload = {**_make_payload(), "amount": "297.00"}
+
+        with django_assert_num_queries(0):
+            response = client.post(ENDPOINT, payload, format="json")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["net_amount"] == "270.30"
+        assert {r["recipient_id"]: r["amount"] for r in data["receivables"]} == {
+            "producer_1": "189.21",
+            "affiliate_9": "81.09",
+        }
+
+    def test_quote_validation_error(self):
+        response = APIClient().post(ENDPOINT, {**_make_payload(), "amount": "-1.00"}, format="json")
+
+        assert response.status_code == 400
+        assert "amount" in response.json()
+
+    def test_stats_endpoint(self):
+        client = APIClient()
+        client.post(ENDPOINT, {**_make_payload(), "amount": "10.00"}, format="json")
+
+        response = client.get(f"{ENDPOINT}/stats")
+
+        assert response.status_code == 200
+        assert set(response.json()) == {"hits", "misses", "size", "max_size", "hit_rate"}
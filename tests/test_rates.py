@@ -0,0 +1,107 @@
+import json
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+
+from src.billing.constants import MAX_INSTALLMENTS, MIN_INSTALLMENTS, PAYMENT_METHOD_CARD, PAYMENT_METHOD_PIX
+from src.billing.rates import CardRates, FileRatesLoader, PlatformRates, RatesProvider, RateTable
+from src.billing.repositories.rates_repository import PlatformRatesRepository
+from src.billing.services.fee_calculator import FeeCalculator
+from src.common.money import Money
+
+
+class TestRateTable:
+    """Tabela compilada deve devolver exatamente as mesmas taxas da fórmula."""
+
+    def test_matches_platform_rates(self):
+        rates = PlatformRates()
+        table = RateTable.compile(rates)
+
+        for installments in range(MIN_INSTALLMENTS, MAX_INSTALLMENTS + 1):
+            for method in (PAYMENT_METHOD_PIX, PAYMENT_METHOD_CARD):
+                assert table.get_rate(method, installments) == rates.get_rate(method, installments)
+
+    def test_out_of_range_falls_back_to_formula(self):
+        table = RateTable.compile(PlatformRates())
+
+        assert table.get_rate(PAYMENT_METHOD_CARD, 13) == PlatformRates().get_rate(PAYMENT_METHOD_CARD, 13)
+
+    def test_content_hash_tracks_rates_not_version(self):
+        table = RateTable.compile(PlatformRates(), version=1)
+
+        assert RateTable.compile(PlatformRates(), version=2).content_hash == table.content_hash
+        changed = PlatformRates(card=CardRates(base=Decimal("0.05")))
+        assert RateTable.compile(changed, version=1).content_hash != table.content_hash
+
+    def test_table_is_immutable(self):
+        table = RateTable.compile(PlatformRates())
+
+        with pytest.raises(TypeError):
+            table.rates[(PAYMENT_METHOD_CARD, 1)] = Decimal("0")
+
+
+class TestRatesProvider:
+    def test_in_flight_table_survives_swap(self):
+        provider = RatesProvider()
+        in_flight = provider.current()
+
+        provider.swap(RateTable.compile(PlatformRates(card=CardRates(base=Decimal("0.05"))), version=2))
+
+        assert in_flight.get_rate(PAYMENT_METHOD_CARD, 1) == Decimal("0.0399")
+        assert provider.current().version == 2
+        assert provider.current().get_rate(PAYMENT_METHOD_CARD, 1) == Decimal("0.05")
+
+    def test_fee_calculator_uses_pinned_table(self):
+        provider = RatesProvider()
+        calculator = FeeCalculator(provider)
+        pinned = calculator.current_table()
+
+        provider.swap(RateTable.compile(PlatformRates(card=CardRates(base=Decimal("0.10"))), version=2))
+
+        assert calculator.calculate(
+            Money.from_decimal(Decimal("100.00")), PAYMENT_METHOD_CARD, 1, rate_table=pinned
+        ) == Decimal("3.99")
+        assert calculator.calculate(Money.from_decimal(Decimal("100.00")), PAYMENT_METHOD_CARD, 1) == Decimal("10.00")
+
+    def test_file_hot_reload(self, tmp_path):
+        path = tmp_path / "rates.json"
+        path.write_text(json.dumps({"version": 1, "card": {"base": "0.05"}}))
+        provider = RatesProvider(loader=FileRatesLoader(path), reload_interval=0)
+
+        assert provider.current().version == 1
+        assert provider.current().get_rate(PAYMENT_METHOD_CARD, 1) == Decimal("0.05")
+        assert provider.current().get_rate(PAYMENT_METHOD_CARD, 2) == Decimal("0.0699")
+
+        path.write_text(json.dumps({"version": 2, "pix_rate": "0.01", "card": {"base": "0.06"}}))
+        provider.refresh(force=True)
+
+        assert provider.current().version == 2
+        assert provider.current().get_rate(PAYMENT_METHOD_PIX, 1) == Decimal("0.01")
+
+    def test_missing_or_broken_source_keeps_current_table(self, tmp_path):
+        path = tmp_path / "rates.json"
+        provider = RatesProvider(loader=FileRatesLoader(path), reload_interval=0)
+        assert provider.current().version == 0
+
+        path.write_text("{not json")
+        provider.refresh(force=True)
+
+        assert provider.current().version == 0
+        assert provider.current().get_rate(PAYMENT_METHOD_CARD, 1) == Decimal("0.0399")
+
+
+@pytest.mark.django_db
+class TestDatabaseRates:
+    def test_publish_and_reload(self):
+        repository = PlatformRatesRepository()
+        provider = RatesProvider(loader=repository, reload_interval=0)
+        assert provider.current().version == 0
+
+        call_command("publish_rates", "--card-base", "0.0450")
+        assert provider.current().version == 1
+        assert provider.current().get_rate(PAYMENT_METHOD_CARD, 1) == Decimal("0.0450")
+
+        repository.publish(PlatformRates(pix_rate=Decimal("0.0100")))
+        assert provider.current().version == 2
+        assert provider.current().get_rate(PAYMENT_METHOD_PIX, 1) == Decimal("0.0100")
@@ -0,0 +1,106 @@
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from injector import Injector
+from rest_framework.test import APIClient
+
+from src.billing.constants import CURRENCY_BRL
+from src.billing.di import BillingModule
+from src.billing.models import LedgerEntry, RecipientBalance
+from src.billing.repositories.balance_repository import RecipientBalanceRepository, totals_for
+from src.billing.services.payment_service import PaymentService
+
+CAPTURE = {
+    "amount": "100.00",
+    "currency": CURRENCY_BRL,
+    "payment_method": "pix",
+    "installments": 1,
+    "splits": [
+        {"recipient_id": "producer_1", "role": "producer", "percent": 70},
+        {"recipient_id": "affiliate_9", "role": "affiliate", "percent": 30},
+    ],
+}
+
+
+@pytest.fixture
+def payment_service():
+    return Injector([BillingModule]).get(PaymentService)
+
+
+def _ledger_balances() -> dict[str, tuple[int, int]]:
+    totals = totals_for(LedgerEntry.objects.all())
+    return {recipient_id: totals[recipient_id] for recipient_id in sorted(totals)}
+
+
+def _read_model() -> dict[str, tuple[int, int]]:
+    return {b.recipient_id: (b.balance_cents, b.entries) for b in RecipientBalance.objects.order_by("recipient_id")}
+
+
+class TestTotals:
+    def test_same_recipient_twice_is_one_row(self):
+        entries = [
+            LedgerEntry(recipient_id="producer_1", amount=Decimal("10.50")),
+            LedgerEntry(recipient_id="producer_1", amount=Decimal("0.25")),
+            LedgerEntry(recipient_id="affiliate_9", amount=Decimal("1.00")),
+        ]
+
+        assert totals_for(entries) == {"producer_1": (1075, 2), "affiliate_9": (100, 1)}
+        assert totals_for(entries[:1], {"producer_1": (5, 1)}) == {"producer_1": (1055, 2)}
+
+
+@pytest.mark.django_db
+class TestRecipientBalances:
+    def test_capture_updates_balances(self, payment_service):
+        payment_service.process(CAPTURE, "balance-1")
+        payment_service.process(CAPTURE, "balance-2")
+
+        assert _read_model() == _ledger_balances()
+        assert RecipientBalance.objects.get(recipient_id="producer_1").entries == 2
+
+    def test_replay_does_not_count_twice(self, payment_service):
+        payment_service.process(CAPTURE, "balance-replay")
+        payment_service.process(CAPTURE, "balance-replay")
+
+        assert RecipientBalance.objects.get(recipient_id="affiliate_9").entries == 1
+
+    def test_batch_updates_balances_once_per_recipient(self, payment_service):
+        results = payment_service.process_many([(f"batch-{i}", CAPTURE) for i in range(3)])
+
+        assert [r["status_code"] for r in results] == [201, 201, 201]
+        assert _read_model() == _ledger_balances()
+        assert RecipientBalance.objects.get(recipient_id="producer_1").entries == 3
+
+    def test_rebuild_recomputes_from_ledger(self, payment_service):
+        payment_service.process(CAPTURE, "rebuild-1")
+        payment_service.process({**CAPTURE, "amount": "33.33"}, "rebuild-2")
+        expected = _ledger_balances()
+        RecipientBalance.objects.filter(recipient_id="producer_1").update(balance_cents=1, entries=99)
+        RecipientBalance.objects.filter(recipient_id="affiliate_9").delete()
+        out = StringIO()
+
+        # Uma thread só: no PostgreSQL as threads do pool abririam outras conexões e esperariam os
+        # locks da transação do teste
+        call_command("rebuild_balances", "--chunk-size", "1", "--workers", "1", stdout=out)
+
+        assert _read_model() == expected
+        assert "2 saldos recalculados" in out.getvalue()
+
+    def test_upsert_adds_to_existing_row(self):
+        RecipientBalanceRepository.add({"producer_1": (500, 1)})
+        RecipientBalanceRepository.add({"producer_1": (250, 2), "producer_2": (1, 1)})
+        RecipientBalanceRepository.add({})
+
+        assert _read_model() == {"producer_1": (750, 3), "producer_2": (1, 1)}
+
+    def test_balance_endpoint(self, payment_service):
+        payment_service.process(CAPTURE, "balance-api")
+        client = APIClient()
+
+        body = client.get("/api/v1/recipients/producer_1/balance").json()
+        unknown = client.get("/api/v1/recipients/nobody/balance").json()
+
+        expected_cents = _ledger_balances()["producer_1"][0]
+        assert body == {"recipient_id": "producer_1", "balance": f"{expected_cents / 100:.2f}", "entries": 1}
+        assert unknown == {"recipient_id": "nobody", "balance": "0.00", "entries": 0}
@@ -0,0 +1,120 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from src.billing.models import LedgerEntry, Payment
+from src.billing.selectors import LedgerSelector, decode_cursor, encode_cursor
+from src.common.exceptions import BusinessValidationError
+from src.common.ids import uuid7
+
+
+def _endpoint(recipient_id: str) -> str:
+    return f"/api/v1/recipients/{recipient_id}/ledger"
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+def _seed(recipient_id: str, count: int, same_instant: bool = False) -> list[LedgerEntry]:
+    """count entries do recebedor, um por segundo (ou todos no mesmo instante, para testar o desempate)."""
+    payment = Payment.objects.create(
+        gross_amount=Decimal("100.00"),
+        platform_fee_amount=Decimal("3.99"),
+        net_amount=Decimal("96.01"),
+        payment_method="pix",
+        idempotency_key=f"ledger-{recipient_id}-{count}",
+    )
+    base = timezone.now() - timedelta(days=1)
+    entries = []
+    for i in range(count):
+        entry = LedgerEntry.objects.create(payment=payment, recipient_id=recipient_id, role="producer", amount=i)
+        created_at = base if same_instant else base + timedelta(seconds=i)
+        LedgerEntry.objects.filter(id=entry.id).update(created_at=created_at)
+        entry.created_at = created_at
+        entries.append(entry)
+    return entries
+
+
+def _walk(client, recipient_id: str, limit: int) -> list[list[str]]:
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        body = client.get(_endpoint(recipient_id), params).json()
+        pages.append([entry["id"] for entry in body["entries"]])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+class TestCursor:
+    def test_round_trip(self):
+        created_at, entry_id = timezone.now(), uuid7()
+
+        assert decode_cursor(encode_cursor(created_at, entry_id)) == (created_at, entry_id)
+
+    @pytest.mark.parametrize("cursor", ["%%%", "bm9wZQ", encode_cursor(timezone.now(), uuid7())[:-4]])
+    def test_rejects_garbage(self, cursor):
+        with pytest.raises(BusinessValidationError):
+            decode_cursor(cursor)
+
+
+@pytest.mark.django_db
+class TestRecipientLedgerEndpoint:
+    def test_pages_newest_first_without_gaps_or_repeats(self, client):
+        entries = _seed("producer_1", 7)
+        _seed("other", 3)
+
+        pages = _walk(client, "producer_1", limit=3)
+
+        assert [len(page) for page in pages] == [3, 3, 1]
+        expected = [str(entry.id) for entry in sorted(entries, key=lambda e: e.created_at, reverse=True)]
+        assert sum(pages, []) == expected
+
+    def test_ties_on_created_at_are_broken_by_id(self, client):
+        entries = _seed("producer_1", 5, same_instant=True)
+
+        pages = _walk(client, "producer_1", limit=2)
+
+        assert sum(pages, []) == [str(entry.id) for entry in sorted(entries, key=lambda e: e.id, reverse=True)]
+
+    def test_entry_shape_and_last_page(self, client):
+        _seed("producer_1", 1)
+
+        body = client.get(_endpoint("producer_1")).json()
+
+        assert body["recipient_id"] == "producer_1"
+        assert body["next_cursor"] is None
+        assert set(body["entries"][0]) == {"id", "payment_id", "role", "amount", "created_at"}
+        assert body["entries"][0]["amount"] == "0.00"
+
+    def test_unknown_recipient_is_empty_page(self, client):
+        body = client.get(_endpoint("nobody")).json()
+
+        assert body == {"recipient_id": "nobody", "entries": [], "next_cursor": None}
+
+    def test_invalid_cursor_and_limit_return_400(self, client):
+        assert client.get(_endpoint("producer_1"), {"cursor": "%%%"}).status_code == 400
+        assert client.get(_endpoint("producer_1"), {"limit": 0}).status_code == 400
+        assert client.get(_endpoint("producer_1"), {"limit": 1000}).status_code == 400
+
+    @pytest.mark.skipif(connection.vendor != "sqlite", reason="EXPLAIN QUERY PLAN do SQLite")
+    def test_deep_page_seeks_through_recipient_index(self):
+        entries = _seed("producer_1", 3)
+        cursor = encode_cursor(entries[1].created_at, entries[1].id)
+
+        with CaptureQueriesContext(connection) as queries:
+            page = LedgerSelector().recipient_statement("producer_1", limit=10, cursor=cursor)
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + queries.captured_queries[0]["sql"])
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+
+        assert [entry["id"] for entry in page.entries] == [entries[0].id]
+        assert "ledger_recipient_created_idx (recipient_id=? AND created_at<?)" in plan
+        assert "TEMP B-TREE" not in plan
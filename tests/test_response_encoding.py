@@ -0,0 +1,110 @@
+import json
+import uuid
+
+import pytest
+from injector import Injector
+
+from src.billing.constants import CURRENCY_BRL
+from src.billing.di import BillingModule
+from src.billing.services.payment_service import PaymentService
+from src.idempotency.encoding import FORMAT_CAPTURE_V1, FORMAT_JSON, decode_response, encode_response
+from src.idempotency.models import IdempotencyRecord
+from src.idempotency.repositories import IdempotencyRepository
+
+
+def _capture_response(receivables: int = 2) -> dict:
+    return {
+        "payment_id": str(uuid.uuid4()),
+        "status": "captured",
+        "gross_amount": "297.00",
+        "platform_fee_amount": "26.70",
+        "net_amount": "270.30",
+        "receivables": [
+            {"recipient_id": f"recipient_{i}", "role": "affiliate", "amount": "1.23"} for i in range(receivables)
+        ],
+        "outbox_event": {"type": "payment_captured", "status": "pending"},
+    }
+
+
+class TestResponseEncoding:
+    def test_capture_shape_round_trips_in_compact_format(self):
+        data = _capture_response()
+
+        blob = encode_response(data)
+
+        assert blob[0] == FORMAT_CAPTURE_V1
+        assert decode_response(blob) == data
+
+    def test_large_split_response_is_much_smaller_than_json(self):
+        data = _capture_response(receivables=1000)
+
+        assert len(encode_response(data)) * 10 < len(json.dumps(data))
+
+    def test_unicode_recipients_round_trip(self):
+        data = _capture_response()
+        data["receivables"][0]["recipient_id"] = "produtor_ção_😀"
+
+        assert decode_response(encode_response(data)) == data
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            {"net_amount": "270.3"},
+            {"net_amount": "0270.30"},
+            {"payment_id": "não-é-uuid"},
+            {"extra": 1},
+        ],
+    )
+    def test_other_shapes_fall_back_to_json(self, change):
+        data = {**_capture_response(), **change}
+
+        blob = encode_response(data)
+
+        assert blob[0] == FORMAT_JSON
+        assert decode_response(blob) == data
+
+    def test_negative_amount_round_trips(self):
+        data = {**_capture_response(), "platform_fee_amount": "-0.05"}
+
+        assert decode_response(encode_response(data)) == data
+
+
+@pytest.mark.django_db
+class TestCompactStorage:
+    def test_compact_repository_stores_blob(self):
+        repository = IdempotencyRepository(compact_responses=True)
+        data = _capture_response()
+        record, _ = repository.claim("compact-1", "hash")
+        repository.mark_completed(record, data)
+
+        stored = IdempotencyRecord.objects.get(key="compact-1")
+
+        assert stored.response_data is None
+        assert stored.response == data
+
+    def test_legacy_json_rows_stay_readable(self):
+        data = _capture_response()
+        IdempotencyRepository(compact_responses=False).create_completed_many([("legacy-json", "hash", data)])
+
+        record, created = IdempotencyRepository(compact_responses=True).claim("legacy-json", "hash")
+
+        assert created is False
+        assert record.response == data
+
+    def test_replay_through_payment_service(self, settings):
+        settings.IDEMPOTENCY_COMPACT_RESPONSES = True
+        service = Injector([BillingModule]).get(PaymentService)
+        payload = {
+            "amount": "297.00",
+            "currency": CURRENCY_BRL,
+            "payment_method": "card",
+            "installments": 3,
+            "splits": [{"recipient_id": "producer_1", "role": "producer", "percent": 100}],
+        }
+
+        first = service.process(payload, "compact-replay")
+        replay = service.process(payload, "compact-replay")
+
+        assert IdempotencyRecord.objects.get(key="compact-replay").response_blob is not None
+        assert replay["payment_id"] == first["payment_id"]
+        assert replay["receivables"] == [{"recipient_id": "producer_1", "role": "producer", "amount": "270.30"}]
@@ -0,0 +1,197 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from io import StringIO
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone as django_timezone
+from rest_framework.test import APIClient
+
+from src.billing.models import LedgerEntry, LedgerRollup, Payment, PaymentRollup, RollupGranularity
+from src.billing.repositories.rollup_repository import RollupRepository
+from src.billing.selectors import RevenueSelector
+
+SAO_PAULO = ZoneInfo("America/Sao_Paulo")
+ENDPOINT = "/api/v1/reports/revenue"
+
+
+def _hour(days_ago: int) -> datetime:
+    return (
+        (django_timezone.now() - timedelta(days=days_ago))
+        .astimezone(timezone.utc)
+        .replace(minute=0, second=0, microsecond=0)
+    )
+
+
+def _payment(created_at: datetime, method="pix", installments=1, gross="100.00", roles=("producer", "affiliate")):
+    payment = Payment.objects.create(
+        gross_amount=Decimal(gross),
+        platform_fee_amount=Decimal("3.99"),
+        net_amount=Decimal(gross) - Decimal("3.99"),
+        payment_method=method,
+        installments=installments,
+        idempotency_key=f"rollup-{Payment.objects.count()}",
+    )
+    share = (Decimal(gross) - Decimal("3.99")) / len(roles)
+    for role in roles:
+        LedgerEntry.objects.create(
+            payment=payment, recipient_id=f"{role}_1", role=role, amount=share.quantize(Decimal("0.01"))
+        )
+    Payment.objects.filter(id=payment.id).update(created_at=created_at)
+    LedgerEntry.objects.filter(payment=payment).update(created_at=created_at)
+    return payment
+
+
+def _seed() -> datetime:
+    """Pagamentos espalhados por 3 dias, com horas quebradas; devolve a hora do primeiro."""
+    base = _hour(5)
+    for offset, method, installments in [
+        (timedelta(minutes=5), "pix", 1),
+        (timedelta(minutes=59), "card", 3),
+        (timedelta(hours=1, minutes=1), "card", 3),
+        (timedelta(hours=7), "pix", 1),
+        (timedelta(days=1, hours=2), "card", 12),
+        (timedelta(days=2, hours=5, minutes=30), "pix", 1),
+    ]:
+        _payment(base + offset, method, installments, gross=f"{100 + installments}.00")
+    return base
+
+
+def _raw(start: datetime, end: datetime) -> dict:
+    payments, ledger = {}, {}
+    for p in Payment.objects.filter(created_at__gte=start, created_at__lt=end):
+        count, gross = payments.get((p.payment_method, p.installments), (0, Decimal(0)))
+        payments[(p.payment_method, p.installments)] = (count + 1, gross + p.gross_amount)
+    for e in LedgerEntry.objects.filter(created_at__gte=start, created_at__lt=end):
+        count, amount = ledger.get(e.role, (0, Decimal(0)))
+        ledger[e.role] = (count + 1, amount + e.amount)
+    return {"payments": payments, "ledger": ledger}
+
+
+def _from_totals(totals: dict) -> dict:
+    return {
+        "payments": {
+            (r["payment_method"], r["installments"]): (r["payments"], r["gross_amount"].to_decimal())
+            for r in totals["payments"]
+        },
+        "ledger": {r["role"]: (r["entries"], r["amount"].to_decimal()) for r in totals["ledger"]},
+    }
+
+
+def _drain(max_window_hours: str = "6") -> str:
+    out = StringIO()
+    call_command("rollup_revenue", "--drain", "--max-window-hours", max_window_hours, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+class TestRollupWorker:
+    def test_hourly_and_daily_rollups_match_raw_tables(self):
+        _seed()
+
+        _drain()
+
+        for granularity in RollupGranularity:
+            rollups = PaymentRollup.objects.filter(granularity=granularity)
+            assert sum(r.payments for r in rollups) == Payment.objects.count()
+            assert sum(r.gross_cents for r in rollups) == sum(int(p.gross_amount * 100) for p in Payment.objects.all())
+            ledger = LedgerRollup.objects.filter(granularity=granularity)
+            assert sum(r.entries for r in ledger) == LedgerEntry.objects.count()
+
+    def test_buckets_are_utc_hours_and_local_days(self):
+        # 01:30 UTC ainda é o dia anterior em São Paulo (UTC-3)
+        created_at = _hour(3).replace(hour=1, minute=30)
+        _payment(created_at)
+
+        _drain()
+
+        hour = PaymentRollup.objects.get(granularity=RollupGranularity.HOUR)
+        day = PaymentRollup.objects.get(granularity=RollupGranularity.DAY)
+        assert hour.bucket_start == created_at.replace(minute=0)
+        assert day.bucket_start == datetime.combine(
+            created_at.astimezone(SAO_PAULO).date(), datetime.min.time(), tzinfo=SAO_PAULO
+        )
+
+    def test_windows_are_counted_once(self):
+        _seed()
+        repository = RollupRepository(time_zone="America/Sao_Paulo")
+        _drain()
+        snapshot = list(PaymentRollup.objects.values_list("bucket_start", "payments").order_by("bucket_start"))
+
+        # Só os segundos decorridos desde o primeiro drain, sem nada novo
+        assert "1 payments" not in _drain() and "0 payments" in _drain()
+        assert repository.advance(repository.watermark(), timedelta(hours=6)) is None
+        assert list(PaymentRollup.objects.values_list("bucket_start", "payments").order_by("bucket_start")) == snapshot
+
+    def test_stale_watermark_loses_the_race(self, monkeypatch):
+        _seed()
+        repository = RollupRepository()
+        first_start = repository.advance(django_timezone.now(), timedelta(hours=1)).start
+
+        # Outro worker leu o watermark antigo: o compare-and-set não avança nada
+        monkeypatch.setattr(repository, "watermark", lambda: first_start)
+
+        assert repository.advance(django_timezone.now(), timedelta(hours=1)) is None
+
+    def test_no_data_is_noop(self):
+        assert "0 janelas" in _drain()
+        assert RollupRepository.watermark() is None
+
+
+@pytest.mark.django_db
+class TestRevenueQuery:
+    def test_range_combines_days_hours_and_open_tail(self):
+        base = _seed()
+        _drain()
+        # Depois do watermark (dentro do settle): só aparece pela leitura direta
+        _payment(django_timezone.now() - timedelta(seconds=30), "card", 2)
+        start, end = base + timedelta(hours=1), _hour(0) + timedelta(hours=1)
+        selector = RevenueSelector(RollupRepository(time_zone="America/Sao_Paulo"))
+
+        totals = selector.totals(start, end)
+
+        assert _from_totals(totals) == _raw(start, end)
+        assert ("card", 2) in _from_totals(totals)["payments"]
+        assert totals["rolled_up_until"] == RollupRepository.watermark()
+
+    def test_partial_days_only_use_hourly_rollups(self):
+        base = _seed()
+        _drain()
+        start, end = base, base + timedelta(hours=2)
+
+        totals = RevenueSelector(RollupRepository(time_zone="America/Sao_Paulo")).totals(start, end)
+
+        assert _from_totals(totals) == _raw(start, end)
+        assert sum(row["payments"] for row in totals["payments"]) == 3
+
+    def test_without_worker_falls_back_to_raw_tables(self):
+        base = _seed()
+
+        totals = RevenueSelector(RollupRepository()).totals(base, base + timedelta(days=3))
+
+        assert totals["rolled_up_until"] is None
+        assert _from_totals(totals) == _raw(base, base + timedelta(days=3))
+
+    def test_endpoint(self):
+        base = _seed()
+        _drain()
+
+        response = APIClient().get(ENDPOINT, {"start": base.isoformat(), "end": (base + timedelta(days=3)).isoformat()})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert {(row["payment_method"], row["installments"]) for row in body["payments"]} == {
+            ("pix", 1),
+            ("card", 3),
+            ("card", 12),
+        }
+        assert {row["role"] for row in body["ledger"]} == {"producer", "affiliate"}
+        assert body["payments"][0]["gross_amount"].endswith(".00")
+
+    def test_endpoint_rejects_unaligned_or_empty_ranges(self):
+        client = APIClient()
+
+        assert client.get(ENDPOINT, {"start": "2026-10-01T00:30:00Z", "end": "2026-10-02T00:00:00Z"}).status_code == 400
+        assert client.get(ENDPOINT, {"start": "2026-10-02T00:00:00Z", "end": "2026-10-01T00:00:00Z"}).status_code == 400
+        assert client.get(ENDPOINT, {"start": "2026-10-01T00:00:00Z"}).status_code == 400
@@ -1,10 +1,12 @@
+import random
 from decimal import Decimal
 
 import pytest
 from injector import Injector
 
 from src.billing.di import BillingModule
-from src.billing.services.split_calculator import SplitCalculator
+from src.billing.services.split_calculator import SMALL_SPLIT_SIZE, SplitCalculator
+from src.common.money import Money
 
 
 @pytest.fixture
@@ -19,7 +21,7 @@ class TestSplitCalculatorBasic:
     def test_single_recipient_100_percent(self, split_calculator):
         """Split 100% para um único recebedor - valor integral."""
         result = split_calculator.calculate(
-            Decimal("150.00"),
+            Money.from_decimal(Decimal("150.00")),
             [{"recipient_id": "producer_1", "role": "producer", "percent": 100}],
         )
         assert len(result) == 1
@@ -28,7 +30,7 @@ class TestSplitCalculatorBasic:
     def test_two_recipients_70_30(self, split_calculator):
         """Exemplo do PDF: net R$270.30, split 70/30."""
         result = split_calculator.calculate(
-            Decimal("270.30"),
+            Money.from_decimal(Decimal("270.30")),
             [
                 {"recipient_id": "producer_1", "role": "producer", "percent": 70},
                 {"recipient_id": "affiliate_9", "role": "affiliate", "percent": 30},
@@ -42,7 +44,7 @@ class TestSplitCalculatorBasic:
         """A soma dos receivables deve ser exatamente igual ao net_amount."""
         net = Decimal("270.30")
         result = split_calculator.calculate(
-            net,
+            Money.from_decimal(net),
             [
                 {"recipient_id": "p1", "role": "producer", "percent": 70},
                 {"recipient_id": "a1", "role": "affiliate", "percent": 30},
@@ -58,7 +60,7 @@ class TestSplitCalculatorRounding:
     def test_three_equal_parts(self, split_calculator):
         """R$100.00 / 3 partes iguais: 33.34 + 33.33 + 33.33 = 100.00"""
         result = split_calculator.calculate(
-            Decimal("100.00"),
+            Money.from_decimal(Decimal("100.00")),
             [
                 {"recipient_id": "a", "role": "r", "percent": Decimal("33.34")},
                 {"recipient_id": "b", "role": "r", "percent": Decimal("33.33")},
@@ -75,7 +77,7 @@ class TestSplitCalculatorRounding:
         O centavo extra vai para quem teve maior resto fracionário.
         """
         result = split_calculator.calculate(
-            Decimal("10.00"),
+            Money.from_decimal(Decimal("10.00")),
             [
                 {"recipient_id": "a", "role": "r", "percent": Decimal("33.33")},
                 {"recipient_id": "b", "role": "r", "percent": Decimal("33.33")},
@@ -89,7 +91,7 @@ class TestSplitCalculatorRounding:
         """5 recebedores com percentuais ímpares - soma deve bater."""
         net = Decimal("999.99")
         result = split_calculator.calculate(
-            net,
+            Money.from_decimal(net),
             [
                 {"recipient_id": "a", "role": "r", "percent": Decimal("10")},
                 {"recipient_id": "b", "role": "r", "percent": Decimal("15")},
@@ -104,7 +106,7 @@ class TestSplitCalculatorRounding:
     def test_small_amount_extreme_split(self, split_calculator):
         """R$0.01 (1 centavo) split 50/50 - impossível dividir igualmente."""
         result = split_calculator.calculate(
-            Decimal("0.01"),
+            Money.from_decimal(Decimal("0.01")),
             [
                 {"recipient_id": "a", "role": "r", "percent": 50},
                 {"recipient_id": "b", "role": "r", "percent": 50},
@@ -115,3 +117,91 @@ class TestSplitCalculatorRounding:
         # Um recebe 0.01, outro recebe 0.00
         amounts = sorted([r["amount"] for r in result])
         assert amounts == [Decimal("0.00"), Decimal("0.01")]
+
+
+class TestSplitCalculatorBatch:
+    """calculate_many (colunar, inteiro) deve bater centavo a centavo com calculate()."""
+
+    @staticmethod
+    def _random_splits(rng, count):
+        # Percentuais com 2 casas somando exatamente 100.00
+        cuts = sorted(rng.sample(range(1, 10000), count - 1))
+        bounds = [0, *cuts, 10000]
+        return [Decimal(bounds[i + 1] - bounds[i]) / 100 for i in range(count)]
+
+    def test_matches_decimal_reference(self, split_calculator):
+        """calculate() e calculate_many() contra o algoritmo original em Decimal, não um contra o outro."""
+        rng = random.Random(42)
+        net_cents, offsets, scaled, expected = [], [0], [], []
+
+        for _ in range(2000):
+            cents = rng.randint(1, 10_000_000)
+            percents = self._random_splits(rng, rng.randint(1, 5))
+            splits = [{"recipient_id": str(j), "role": "r", "percent": p} for j, p in enumerate(percents)]
+
+            reference = _reference_largest_remainder(Decimal(cents) / 100, splits)
+            scalar = split_calculator.calculate(Money(cents), splits)
+            assert [r["amount"].cents for r in scalar] == [reference[str(j)] for j in range(len(percents))]
+            expected.extend(reference[str(j)] for j in range(len(percents)))
+
+            net_cents.append(cents)
+            scaled.extend(split_calculator.to_scaled_percent(p) for p in percents)
+            offsets.append(len(scaled))
+
+        assert split_calculator.calculate_many(net_cents, offsets, scaled) == expected
+
+    def test_penny_goes_to_first_on_tie(self, split_calculator):
+        # 0.01 split 50/50: o centavo vai para o primeiro (mesmo critério do caminho escalar)
+        assert split_calculator.calculate_many([1], [0, 2], [5000, 5000]) == [1, 0]
+
+    def test_rejects_percents_not_summing_100(self, split_calculator):
+        with pytest.raises(ValueError):
+            split_calculator.calculate_many([100], [0, 2], [5000, 4000])
+
+    def test_to_scaled_percent(self, split_calculator):
+        assert split_calculator.to_scaled_percent(Decimal("33.33")) == 3333
+        assert split_calculator.to_scaled_percent(70) == 7000
+        with pytest.raises(ValueError):
+            split_calculator.to_scaled_percent("33.333")
+
+
+def _reference_largest_remainder(net_amount, splits):
+    """Algoritmo original (Decimal + ordenação completa), usado como oráculo."""
+    total_cents = int(net_amount * 100)
+    allocations = []
+    for split in splits:
+        exact = total_cents * Decimal(str(split["percent"])) / Decimal("100")
+        allocations.append(
+            {"recipient_id": split["recipient_id"], "floored": int(exact), "remainder": exact - int(exact)}
+        )
+    leftover = total_cents - sum(a["floored"] for a in allocations)
+    allocations.sort(key=lambda a: a["remainder"], reverse=True)
+    for i in range(leftover):
+        allocations[i]["floored"] += 1
+    return {a["recipient_id"]: a["floored"] for a in allocations}
+
+
+class TestSplitCalculatorLargeSplits:
+    """Milhares de recebedores: mesmo resultado do algoritmo original."""
+
+    @pytest.mark.parametrize("recipients", [SMALL_SPLIT_SIZE, SMALL_SPLIT_SIZE + 1, 50, 1000, 5000])
+    def test_matches_reference(self, split_calculator, recipients):
+        rng = random.Random(recipients)
+        splits = [
+            {"recipient_id": f"r{j}", "role": "affiliate", "percent": p}
+            for j, p in enumerate(TestSplitCalculatorBatch._random_splits(rng, recipients))
+        ]
+        net = Decimal(rng.randint(1, 10_000_000)) / 100
+
+        result = split_calculator.calculate(Money.from_decimal(net), splits)
+
+        assert {r["recipient_id"]: r["amount"].cents for r in result} == _reference_largest_remainder(net, splits)
+        assert sum(r["amount"] for r in result) == net
+
+    def test_result_keeps_input_order(self, split_calculator):
+        splits = [{"recipient_id": f"r{j}", "role": "r", "percent": Decimal("12.5")} for j in range(8)]
+
+        result = split_calculator.calculate(Money.from_decimal(Decimal("0.07")), splits)
+
+        assert [r["recipient_id"] for r in result] == [f"r{j}" for j in range(8)]
+        assert [r["amount"].cents for r in result] == [1, 1, 1, 1, 1, 1, 1, 0]
@@ -0,0 +1,171 @@
+import uuid
+from decimal import Decimal
+
+import pytest
+from injector import Injector
+from rest_framework.test import APIClient
+
+from src.billing.constants import CURRENCY_BRL
+from src.billing.di import BillingModule
+from src.billing.services.payment_service import PaymentService
+from src.billing.services.quote_service import QuoteService
+from src.billing.services.split_template_service import SplitTemplateService
+
+SPLITS = [
+    {"recipient_id": "producer_1", "role": "producer", "percent": "70.00"},
+    {"recipient_id": "affiliate_9", "role": "affiliate", "percent": "30.00"},
+]
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+@pytest.fixture
+def injector():
+    return Injector([BillingModule])
+
+
+def _create_template(client, splits=None):
+    return client.post("/api/v1/split-templates", {"name": "padrão 70/30", "splits": splits or SPLITS}, format="json")
+
+
+def _payment(template_id, **overrides):
+    base = {
+        "amount": "297.00",
+        "currency": CURRENCY_BRL,
+        "payment_method": "card",
+        "installments": 3,
+        "split_template_id": template_id,
+    }
+    base.update(overrides)
+    return base
+
+
+@pytest.mark.django_db
+class TestSplitTemplateEndpoint:
+    def test_create_template(self, client):
+        response = _create_template(client)
+
+        assert response.status_code == 201
+        data = response.json()
+        assert data["version"] == 1
+        assert [s["percent"] for s in data["splits"]] == ["70.00", "30.00"]
+
+    def test_invalid_template_returns_400(self, client):
+        response = _create_template(client, splits=[{"recipient_id": "a", "role": "producer", "percent": "50"}])
+
+        assert response.status_code == 400
+        assert "splits" in response.json()
+
+    def test_unknown_template_returns_404(self, client):
+        response = client.get(f"/api/v1/split-templates/{uuid.uuid4()}")
+
+        assert response.status_code == 404
+
+    def test_capture_with_template_matches_inline_splits(self, client):
+        template_id = _create_template(client).json()["id"]
+
+        response = client.post("/api/v1/payments", _payment(template_id), format="json", HTTP_IDEMPOTENCY_KEY="tpl-1")
+
+        assert response.status_code == 201
+        amounts = {r["recipient_id"]: r["amount"] for r in response.json()["receivables"]}
+        assert amounts == {"producer_1": "189.21", "affiliate_9": "81.09"}
+
+    def test_capture_with_unknown_template_returns_400(self, client):
+        response = client.post(
+            "/api/v1/payments", _payment(str(uuid.uuid4())), format="json", HTTP_IDEMPOTENCY_KEY="tpl-unknown"
+        )
+
+        assert response.status_code == 400
+        assert "split_template_id" in response.json()
+
+    def test_splits_and_template_together_returns_400(self, client):
+        template_id = _create_template(client).json()["id"]
+
+        response = client.post(
+            "/api/v1/payments", _payment(template_id, splits=SPLITS), format="json", HTTP_IDEMPOTENCY_KEY="tpl-both"
+        )
+
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestSplitPlanCache:
+    def test_capture_with_cached_plan_only_reads_version(self, injector, django_assert_num_queries):
+        templates = injector.get(SplitTemplateService)
+        payments = injector.get(PaymentService)
+        template = templates.create("70/30", [{**s, "percent": Decimal(s["percent"])} for s in SPLITS])
+
+        with django_assert_num_queries(1):
+            result = payments.calculate(_payment(template.id))
+
+        assert result["net_amount"] == Decimal("270.30")
+
+    def test_update_in_other_process_reaches_capture(self, injector):
+        templates = injector.get(SplitTemplateService)
+        payments = injector.get(PaymentService)
+        template = templates.create("70/30", [{**s, "percent": Decimal(s["percent"])} for s in SPLITS])
+        payments.calculate(_payment(template.id))
+
+        # Outro worker (outro injector) altera o template; o cache deste processo não fica sabendo
+        Injector([BillingModule]).get(SplitTemplateService).update(
+            str(template.id), "100", [{"recipient_id": "producer_1", "role": "producer", "percent": Decimal("100")}]
+        )
+        result = payments.calculate(_payment(template.id))
+
+        assert [(r["recipient_id"], r["amount"]) for r in result["receivables"]] == [("producer_1", Decimal("270.30"))]
+
+    def test_batch_reads_template_versions_once(self, injector, django_assert_num_queries):
+        templates = injector.get(SplitTemplateService)
+        first = templates.create("70/30", [{**s, "percent": Decimal(s["percent"])} for s in SPLITS])
+        second = templates.create(
+            "100", [{"recipient_id": "producer_1", "role": "producer", "percent": Decimal("100")}]
+        )
+
+        with django_assert_num_queries(1):
+            plans = templates.get_plans([first.id, second.id, first.id, uuid.uuid4()])
+
+        assert {plan.template_id: plan.scaled_percents for plan in plans.values()} == {
+            str(first.id): (7000, 3000),
+            str(second.id): (10000,),
+        }
+
+    def test_quote_resolves_cached_plan_without_queries(self, injector, django_assert_num_queries):
+        template = injector.get(SplitTemplateService).create(
+            "70/30", [{**s, "percent": Decimal(s["percent"])} for s in SPLITS]
+        )
+        quotes = injector.get(QuoteService)
+
+        with django_assert_num_queries(0):
+            result = quotes.quote({**_payment(template.id), "amount": Decimal("297.00")})
+
+        assert [r["amount"] for r in result["receivables"]] == [Decimal("189.21"), Decimal("81.09")]
+
+    def test_update_invalidates_plan(self, injector):
+        templates = injector.get(SplitTemplateService)
+        payments = injector.get(PaymentService)
+        template = templates.create("70/30", [{**s, "percent": Decimal(s["percent"])} for s in SPLITS])
+        payments.calculate(_payment(template.id))
+
+        templates.update(
+            str(template.id),
+            "100",
+            [{"recipient_id": "producer_1", "role": "producer", "percent": Decimal("100")}],
+        )
+        result = payments.calculate(_payment(template.id))
+
+        assert templates.get_plan(template.id).version == 2
+        assert [r["amount"] for r in result["receivables"]] == [Decimal("270.30")]
+
+    def test_other_process_loads_plan_from_db(self, injector):
+        template = injector.get(SplitTemplateService).create(
+            "70/30", [{**s, "percent": Decimal(s["percent"])} for s in SPLITS]
+        )
+
+        # Outro processo = outro injector, com cache vazio
+        plan = Injector([BillingModule]).get(SplitTemplateService).get_plan(template.id)
+
+        assert plan.scaled_percents == (7000, 3000)
+        assert plan.recipients == (("producer_1", "producer"), ("affiliate_9", "affiliate"))